@@ -0,0 +1,213 @@
+#!/usr/bin/env python3
+"""
+Audit Trigger Mode Benchmark
+Compares bulk-write throughput of the SPEC-031 audit modes: row-level
+triggers (audit.log_table_changes per row) against statement-level triggers
+with transition tables (audit.log_statement_changes, one batched INSERT per
+statement into the partitioned security_audit_log).
+
+Usage:
+    python benchmark_audit_triggers.py
+    python benchmark_audit_triggers.py --rows 500000 --batch-size 5000
+    python benchmark_audit_triggers.py --keep          # keep the scratch schema
+
+What it does:
+    1. Loads the SPEC-031 audit log table and functions into a scratch schema
+       (the audit schema renamed), next to an attendance-shaped table. The
+       auth.* and utils.* helpers they call must exist: apply the schema
+       bundle first (python build_schema_bundle.py --apply).
+    2. For each mode (no audit, row, statement) bulk inserts --rows rows in
+       INSERT statements of --batch-size rows, then updates all of them the
+       same way, and times both passes.
+    3. Reports rows/s per pass and the slowdown against no audit, and checks
+       both modes wrote the same audit records. Exits 1 when they differ or
+       when the statement mode inserts slower than the row mode.
+"""
+
+import argparse
+import os
+import re
+import time
+
+from build_schema_bundle import leading_keywords, read_text, split_statements, sql_fences
+from local_db import psql, query_json, query_value, bench_database_url
+from spec_generators import SPECS_ROOT
+
+SCRATCH_SCHEMA = "perf_audit"
+AUDIT_SPEC = SPECS_ROOT / "PHASE-01-FOUNDATION" / "04-DATABASE-FUNCTIONS" / "SPEC-031-audit-triggers.sql"
+MODES = ["none", "row", "statement"]
+
+# Helpers of other specs the audit functions call at runtime
+REQUIRED_FUNCTIONS = [
+    ("auth", "get_current_user_id"),
+    ("auth", "get_current_tenant_id"),
+    ("utils", "mask_sensitive_data"),
+]
+
+BENCH_TABLE_SQL = """
+CREATE TABLE attendance (
+  id UUID PRIMARY KEY,
+  seq INTEGER NOT NULL,
+  tenant_id UUID NOT NULL,
+  student_id UUID NOT NULL,
+  class_id UUID NOT NULL,
+  attendance_date DATE NOT NULL,
+  status VARCHAR(20) NOT NULL,
+  remarks TEXT,
+  created_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+);
+CREATE INDEX attendance_seq ON attendance(seq);
+"""
+
+def missing_functions():
+    """Required helper functions not defined in the benchmark database"""
+    wanted = ", ".join(f"('{schema}', '{name}')" for schema, name in REQUIRED_FUNCTIONS)
+    present = {(row['nspname'], row['proname']) for row in query_json(f"""
+        SELECT DISTINCT n.nspname, p.proname
+        FROM pg_proc p
+        JOIN pg_namespace n ON n.oid = p.pronamespace
+        WHERE (n.nspname, p.proname) IN ({wanted})
+    """)}
+    return [f"{schema}.{name}" for schema, name in REQUIRED_FUNCTIONS if (schema, name) not in present]
+
+def audit_definitions():
+    """SPEC-031 table, function and partition statements, moved to the scratch schema
+
+    Triggers on the application tables, grants and the validation block are
+    left out: the benchmark installs its own triggers via set_audit_mode().
+    """
+    kept = []
+    for _, sql in sql_fences(read_text(AUDIT_SPEC)):
+        for _, text in split_statements(sql):
+            head = leading_keywords(text)
+            if head.startswith("CREATE") and not head.startswith("CREATE TRIGGER"):
+                kept.append(text)
+            elif head.startswith("DO") and "ensure_log_partitions" in text:
+                kept.append(text)
+    return re.sub(r"\baudit\.", f"{SCRATCH_SCHEMA}.", "\n\n".join(kept))
+
+def create_scratch_schema():
+    """Scratch schema with the audit log, the audit functions and the bench table"""
+    psql(f"""
+        DROP SCHEMA IF EXISTS {SCRATCH_SCHEMA} CASCADE;
+        CREATE SCHEMA {SCRATCH_SCHEMA};
+        SET search_path TO {SCRATCH_SCHEMA}, public;
+        {audit_definitions()}
+        {BENCH_TABLE_SQL}
+    """)
+
+def set_mode(mode):
+    """Empty the bench table and the audit log, and install the mode's triggers"""
+    statements = ["TRUNCATE attendance, security_audit_log;"]
+    if mode == "none":
+        statements.append(f"SELECT {SCRATCH_SCHEMA}.set_audit_mode('attendance', 'row');")
+        statements.append("DROP TRIGGER trigger_audit_attendance ON attendance;")
+    else:
+        statements.append(f"SELECT {SCRATCH_SCHEMA}.set_audit_mode('attendance', '{mode}');")
+    statements.append("VACUUM ANALYZE attendance;")
+    psql("\n".join(statements))
+
+def batches(rows, batch_size):
+    """(first, last) seq of each statement's rows"""
+    return [(first, min(first + batch_size - 1, rows)) for first in range(1, rows + 1, batch_size)]
+
+def insert_script(rows, batch_size):
+    """One multi-row INSERT per batch, deterministic across modes"""
+    return "\n".join(f"""
+        INSERT INTO attendance (id, seq, tenant_id, student_id, class_id, attendance_date, status, remarks)
+        SELECT md5('row' || g)::uuid, g, md5('tenant' || (g % 20))::uuid, md5('student' || (g % 5000))::uuid,
+               md5('class' || (g % 200))::uuid, DATE '2025-01-01' + (g / 5000),
+               CASE WHEN g % 10 = 0 THEN 'absent' ELSE 'present' END, NULL
+        FROM generate_series({first}, {last}) g;""" for first, last in batches(rows, batch_size))
+
+def update_script(rows, batch_size):
+    """One UPDATE per batch touching two columns of every row"""
+    return "\n".join(f"""
+        UPDATE attendance SET status = 'late', remarks = 'bench update ' || seq
+        WHERE seq BETWEEN {first} AND {last};""" for first, last in batches(rows, batch_size))
+
+def timed(sql):
+    """Seconds psql takes to run the script"""
+    started = time.perf_counter()
+    psql(sql)
+    return time.perf_counter() - started
+
+def audit_digest():
+    """Audit records per action with a digest of what they hold"""
+    return {row['action']: (row['records'], row['digest']) for row in query_json("""
+        SELECT action, COUNT(*) AS records,
+               md5(string_agg(resource_id || ':' || severity || ':' || changed_fields::text, ','
+                              ORDER BY resource_id)) AS digest
+        FROM security_audit_log
+        GROUP BY action
+    """)}
+
+def main():
+    """Main benchmark function"""
+    parser = argparse.ArgumentParser(description="Benchmark row-level against statement-level audit triggers")
+    parser.add_argument("--rows", type=int, default=100000, help="rows inserted and then updated per mode")
+    parser.add_argument("--batch-size", type=int, default=1000, help="rows per INSERT/UPDATE statement")
+    parser.add_argument("--keep", action="store_true", help=f"keep the {SCRATCH_SCHEMA} schema afterwards")
+    args = parser.parse_args()
+
+    print("\n" + "="*70)
+    print("  AUDIT TRIGGERS: ROW-LEVEL VS STATEMENT-LEVEL")
+    print(f"  Database: {bench_database_url()}")
+    print("="*70 + "\n")
+
+    missing = missing_functions()
+    if missing:
+        print(f"❌ Missing {', '.join(missing)}: run python build_schema_bundle.py --apply first")
+        raise SystemExit(1)
+
+    # The audit functions resolve security_audit_log through the search path
+    os.environ["PGOPTIONS"] = f"-c search_path={SCRATCH_SCHEMA},public"
+    create_scratch_schema()
+    partitions = query_value(f"""
+        SELECT COUNT(*) FROM pg_inherits WHERE inhparent = '{SCRATCH_SCHEMA}.security_audit_log'::regclass
+    """)
+    print(f"Loaded {AUDIT_SPEC.name} into {SCRATCH_SCHEMA} ({partitions} audit log partitions)")
+    print(f"  {args.rows:,} rows per pass in statements of {args.batch_size:,} rows\n")
+
+    inserts = insert_script(args.rows, args.batch_size)
+    updates = update_script(args.rows, args.batch_size)
+    results = {}
+    for mode in MODES:
+        set_mode(mode)
+        insert_seconds = timed(inserts)
+        update_seconds = timed(updates)
+        results[mode] = {
+            "insert": args.rows / insert_seconds,
+            "update": args.rows / update_seconds,
+            "records": int(query_value("SELECT COUNT(*) FROM security_audit_log")),
+            "digest": audit_digest(),
+        }
+        print(f"  {mode:10} insert {insert_seconds:7.2f}s   update {update_seconds:7.2f}s")
+
+    baseline = results["none"]
+    print(f"\n{'mode':10} {'insert rows/s':>14} {'slowdown':>9} {'update rows/s':>14} {'slowdown':>9} {'audit rows':>11}")
+    print("-" * 72)
+    for mode in MODES:
+        result = results[mode]
+        print(f"{mode:10} {result['insert']:>14,.0f} {baseline['insert'] / result['insert']:>8.2f}x "
+              f"{result['update']:>14,.0f} {baseline['update'] / result['update']:>8.2f}x {result['records']:>11,}")
+
+    row, statement = results["row"], results["statement"]
+    same_records = row["digest"] == statement["digest"]
+    faster = statement["insert"] >= row["insert"]
+    print(f"\n{'✅' if same_records else '❌'} Both modes wrote "
+          f"{'the same' if same_records else 'different'} audit records")
+    for action in sorted(set(row["digest"]) | set(statement["digest"])):
+        if row["digest"].get(action) != statement["digest"].get(action):
+            print(f"    {action}: row {row['digest'].get(action, (0, None))[0]:,} records, "
+                  f"statement {statement['digest'].get(action, (0, None))[0]:,} records")
+    print(f"{'✅' if faster else '❌'} Statement mode inserts {statement['insert'] / row['insert']:.1f}x "
+          f"the rows/s of row mode (updates {statement['update'] / row['update']:.1f}x)")
+
+    if not args.keep:
+        psql(f"DROP SCHEMA IF EXISTS {SCRATCH_SCHEMA} CASCADE;")
+    print("\n" + "="*70 + "\n")
+    raise SystemExit(0 if same_records and faster else 1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""
+Notification Outbox Throughput Benchmark
+Drains 100k queued notifications through the dispatcher pool into the fake
+SMTP/SMS sink and checks the pool sustains 100k notifications per minute
+within the channel rate limits.
+
+Usage:
+    python benchmark_notifications.py
+    python benchmark_notifications.py --notifications 500000 --workers 8 --batch 1000
+    python benchmark_notifications.py --recipients 100000       # less coalescing
+    python benchmark_notifications.py --email-rate 30000        # watch the limiter defer
+    python benchmark_notifications.py --keep                    # keep the scratch schema
+
+What it does:
+    1. Creates the outbox exactly as the Phase 8 generator emits it
+       (NOTIFICATION_OUTBOX_SQL) in a scratch schema, and queues
+       --notifications rows for --recipients addresses, one in five by SMS.
+    2. Starts notification_sink.py in-process and a dispatcher pool
+       (notification_dispatcher.py) against the scratch schema, and runs it
+       until no row is pending, deferred rows included.
+    3. Reports notifications/min, messages after coalescing, the per-channel
+       send rate against its limit and claim latency. Exits 1 below
+       --target-per-minute or when a channel went over its limit.
+"""
+
+import argparse
+import os
+import threading
+import time
+
+from local_db import psql, query_json, query_value, percentile, bench_database_url
+from notification_dispatcher import SENDERS, new_bucket, new_stats, start_pool
+from notification_sink import start_sink
+from spec_generators import load_generator
+
+SCRATCH_SCHEMA = "perf_notifications"
+
+# Slack for the one-second token bucket burst when checking rate limits
+RATE_TOLERANCE = 1.05
+
+def create_outbox(notifications, recipients, limits):
+    """Create the generated outbox in the scratch schema and queue the notifications"""
+    generator = load_generator("PHASE-08-SUPPORT-STAFF")
+    psql(f"""
+        DROP SCHEMA IF EXISTS {SCRATCH_SCHEMA} CASCADE;
+        CREATE SCHEMA {SCRATCH_SCHEMA};
+        SET search_path TO {SCRATCH_SCHEMA}, public;
+        {generator.NOTIFICATION_OUTBOX_SQL}
+        UPDATE notification_channel_limits SET per_minute = {limits['email']} WHERE channel = 'email';
+        UPDATE notification_channel_limits SET per_minute = {limits['sms']} WHERE channel = 'sms';
+        INSERT INTO notification_outbox (channel, address, event_type, subject, body)
+        SELECT
+          CASE WHEN g % 5 = 0 THEN 'sms' ELSE 'email' END,
+          CASE WHEN g % 5 = 0
+            THEN '+1555' || lpad((g % {recipients})::text, 7, '0')
+            ELSE 'user' || (g % {recipients}) || '@example.test'
+          END,
+          'bench.status_changed',
+          'Mail Tracking: delivered',
+          'Parcel ' || g || ' is now delivered (was received)'
+        FROM generate_series(1, {notifications}) g;
+        ANALYZE notification_outbox;
+    """)
+
+def wait_until_sent(stop, interval=0.5):
+    """Stop the pool once no row is pending or sending; returns seconds waited"""
+    started = time.perf_counter()
+    while True:
+        left = int(query_value("SELECT COUNT(*) FROM notification_outbox WHERE status IN ('pending', 'sending')"))
+        if left == 0:
+            stop.set()
+            return time.perf_counter() - started
+        time.sleep(interval)
+
+def main():
+    """Main benchmark function"""
+    parser = argparse.ArgumentParser(description="Benchmark the notification outbox dispatchers")
+    parser.add_argument("--notifications", type=int, default=100000, help="notifications queued")
+    parser.add_argument("--recipients", type=int, default=25000, help="distinct addresses they go to")
+    parser.add_argument("--workers", type=int, default=8, help="concurrent dispatchers")
+    parser.add_argument("--batch", type=int, default=500, help="ready rows claimed per batch")
+    parser.add_argument("--email-rate", type=int, default=120000, help="email messages per minute")
+    parser.add_argument("--sms-rate", type=int, default=30000, help="SMS messages per minute")
+    parser.add_argument("--fail-rate", type=float, default=0.0, help="share of messages the sink rejects")
+    parser.add_argument("--target-per-minute", type=int, default=100000, help="required notifications per minute")
+    parser.add_argument("--keep", action="store_true", help=f"keep the {SCRATCH_SCHEMA} schema afterwards")
+    args = parser.parse_args()
+    args.drain = False
+    limits = {"email": args.email_rate, "sms": args.sms_rate}
+
+    print("\n" + "="*70)
+    print("  NOTIFICATION OUTBOX: DISPATCH THROUGHPUT")
+    print(f"  Database: {bench_database_url()}")
+    print("="*70 + "\n")
+
+    # Every psql the tools start (dispatchers included) resolves the outbox
+    # and its functions in the scratch schema
+    os.environ["PGOPTIONS"] = f"-c search_path={SCRATCH_SCHEMA},public"
+    print(f"Queueing {args.notifications:,} notifications for {args.recipients:,} addresses...")
+    create_outbox(args.notifications, args.recipients, limits)
+
+    sink, (smtp_port, sms_port), stop_sink = start_sink(0, 0, args.fail_rate)
+    os.environ["BENCH_SMTP_HOST"] = "127.0.0.1"
+    os.environ["BENCH_SMTP_PORT"] = str(smtp_port)
+    os.environ["BENCH_SMS_URL"] = f"http://127.0.0.1:{sms_port}/sms"
+    print(f"  Sink: SMTP :{smtp_port}, SMS :{sms_port}")
+    print(f"  {args.workers} dispatchers, batches of {args.batch}, "
+          f"limits email {args.email_rate:,}/min, sms {args.sms_rate:,}/min\n")
+
+    senders = {"email": SENDERS["smtp"], "sms": SENDERS["sms-http"]}
+    buckets = {channel: new_bucket(per_minute) for channel, per_minute in limits.items()}
+    stop = threading.Event()
+    lock = threading.Lock()
+    stats = new_stats()
+    threads = start_pool(args, senders, buckets, stats, lock, stop)
+    elapsed = wait_until_sent(stop)
+    for thread in threads:
+        thread.join()
+    stop_sink()
+
+    outcome = {row['status']: row['count'] for row in query_json(
+        "SELECT status, COUNT(*) AS count FROM notification_outbox GROUP BY status"
+    )}
+    minutes = elapsed / 60.0
+    per_minute = outcome.get('sent', 0) / max(minutes, 1e-9)
+
+    print(f"{outcome.get('sent', 0):,} sent, {outcome.get('failed', 0):,} failed in {elapsed:.1f}s")
+    print(f"  {per_minute:,.0f} notifications/min as {stats['messages']:,} messages "
+          f"({outcome.get('sent', 0) / max(stats['messages'], 1):.1f} notifications per message after coalescing)")
+    print(f"  {stats['batches']:,} batches, claim p50 {percentile(stats['claim_ms'], 50):.1f} ms, "
+          f"p95 {percentile(stats['claim_ms'], 95):.1f} ms; {stats['deferred']:,} rows deferred by the rate limits")
+
+    within_limits = True
+    print(f"\n{'channel':8} {'messages':>10} {'per minute':>12} {'limit':>10}")
+    print("-" * 44)
+    for channel, limit in limits.items():
+        channel_rate = sink[channel] / max(minutes, 1e-9)
+        over = channel_rate > limit * RATE_TOLERANCE and minutes >= 1 / 60.0
+        within_limits = within_limits and not over
+        print(f"{channel:8} {sink[channel]:>10,} {channel_rate:>12,.0f} {limit:>10,}{'  ❌ over' if over else ''}")
+
+    passed = per_minute >= args.target_per_minute and within_limits
+    print(f"\n{'✅' if passed else '❌'} {per_minute:,.0f}/min against a target of {args.target_per_minute:,}/min"
+          f"{'' if within_limits else ' (rate limit exceeded)'}")
+
+    if not args.keep:
+        psql(f"DROP SCHEMA IF EXISTS {SCRATCH_SCHEMA} CASCADE;")
+    print("\n" + "="*70 + "\n")
+    raise SystemExit(0 if passed else 1)
+
+if __name__ == "__main__":
+    main()
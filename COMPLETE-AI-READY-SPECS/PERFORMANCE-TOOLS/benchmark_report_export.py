@@ -0,0 +1,281 @@
+#!/usr/bin/env python3
+"""
+Streaming Report Export Benchmark
+Exports a 1M-row attendance report through the report worker's COPY path and
+checks that memory stays flat while it streams.
+
+Usage:
+    python benchmark_report_export.py
+    python benchmark_report_export.py --rows 5000000 --max-growth-mb 8
+    python benchmark_report_export.py --compare-rows 5000,10000,20000,40000
+    python benchmark_report_export.py --keep          # keep the scratch schema
+
+What it does:
+    1. Seeds a scratch copy of the attendance, students, users and classes
+       tables SPEC-033 reports on, with --rows attendance records.
+    2. Streams the 'attendance_export' query (reports.report_query) with
+       COPY ... TO STDOUT WITH CSV through report_worker.py's copy_blocks, into
+       a temporary file, sampling the resident memory of psql and of this
+       process as the rows go by. Exits 1 when psql grew by more than
+       --max-growth-mb after the first 10% of the rows.
+    3. Times the old PL/pgSQL row-by-row TEXT concatenation against the
+       set-based csv_field/string_agg export now in export_report_data at
+       doubling sizes: the first grows quadratically, the second linearly.
+
+Memory is read from /proc and is only sampled on Linux; elsewhere the
+export still runs and only the timings are reported.
+"""
+
+import argparse
+import os
+import resource
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from local_db import psql, query_value, format_bytes, bench_database_url
+from report_worker import ROW_COUNT_PREFIX, copy_blocks, finish_psql, start_psql, stop_psql
+
+SCRATCH_SCHEMA = "perf_report_export"
+CHECKPOINTS = [0.10, 0.25, 0.50, 0.75, 1.00]
+STATUSES = ["present", "present", "present", "present", "late", "absent", "excused"]
+
+# The 'attendance_export' query of reports.report_query(), on the scratch tables
+EXPORT_QUERY = f"""SELECT a.attendance_date, s.student_id AS student_number, u.full_name AS student_name,
+  c.name AS class_name, a.status
+FROM {SCRATCH_SCHEMA}.attendance a
+JOIN {SCRATCH_SCHEMA}.students s ON a.student_id = s.id
+JOIN {SCRATCH_SCHEMA}.users u ON s.user_id = u.id
+JOIN {SCRATCH_SCHEMA}.classes c ON s.class_id = c.id
+WHERE a.tenant_id = '00000000-0000-0000-0000-000000000001'
+ORDER BY a.attendance_date, s.student_id"""
+
+def seed_scratch_tables(rows, students, classes):
+    """Create the scratch tables and fill attendance with rows records"""
+    days = -(-rows // students)
+    statuses = "ARRAY[" + ", ".join(f"'{status}'" for status in STATUSES) + "]"
+    psql(f"""
+        DROP SCHEMA IF EXISTS {SCRATCH_SCHEMA} CASCADE;
+        CREATE SCHEMA {SCRATCH_SCHEMA};
+        CREATE TABLE {SCRATCH_SCHEMA}.classes (id UUID PRIMARY KEY, name VARCHAR(100));
+        CREATE TABLE {SCRATCH_SCHEMA}.users (id UUID PRIMARY KEY, full_name VARCHAR(255));
+        CREATE TABLE {SCRATCH_SCHEMA}.students (
+          id UUID PRIMARY KEY,
+          student_id VARCHAR(50),
+          user_id UUID,
+          class_id UUID,
+          tenant_id UUID
+        );
+        CREATE TABLE {SCRATCH_SCHEMA}.attendance (
+          id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+          tenant_id UUID NOT NULL,
+          student_id UUID NOT NULL,
+          attendance_date DATE NOT NULL,
+          status VARCHAR(20) NOT NULL
+        );
+
+        INSERT INTO {SCRATCH_SCHEMA}.classes
+        SELECT ('00000000-0000-0000-0002-' || lpad(g::text, 12, '0'))::uuid, 'Grade ' || (g % 12 + 1) || ', Section ' || g
+        FROM generate_series(1, {classes}) g;
+        INSERT INTO {SCRATCH_SCHEMA}.users
+        SELECT ('00000000-0000-0000-0003-' || lpad(g::text, 12, '0'))::uuid, 'Student "' || g || '", ' || md5(g::text)
+        FROM generate_series(1, {students}) g;
+        INSERT INTO {SCRATCH_SCHEMA}.students
+        SELECT
+          ('00000000-0000-0000-0004-' || lpad(g::text, 12, '0'))::uuid,
+          'STU' || lpad(g::text, 6, '0'),
+          ('00000000-0000-0000-0003-' || lpad(g::text, 12, '0'))::uuid,
+          ('00000000-0000-0000-0002-' || lpad((g % {classes} + 1)::text, 12, '0'))::uuid,
+          '00000000-0000-0000-0000-000000000001'
+        FROM generate_series(1, {students}) g;
+        INSERT INTO {SCRATCH_SCHEMA}.attendance (tenant_id, student_id, attendance_date, status)
+        SELECT
+          '00000000-0000-0000-0000-000000000001',
+          ('00000000-0000-0000-0004-' || lpad((g % {students} + 1)::text, 12, '0'))::uuid,
+          DATE '2024-09-01' + g / {students},
+          ({statuses})[g % {len(STATUSES)} + 1]
+        FROM generate_series(0, {rows - 1}) g;
+        CREATE INDEX ON {SCRATCH_SCHEMA}.attendance (tenant_id, attendance_date);
+        VACUUM ANALYZE {SCRATCH_SCHEMA}.attendance;
+    """)
+    return days
+
+def rss_bytes(pid):
+    """Resident memory of a process from /proc, or None where unavailable"""
+    try:
+        with open(f"/proc/{pid}/status", 'r', encoding='utf-8') as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        return None
+    return None
+
+def stream_export(rows, output_path):
+    """COPY the export into output_path, sampling memory at each checkpoint"""
+    process = start_psql(f"COPY ({EXPORT_QUERY}) TO STDOUT WITH (FORMAT csv, HEADER);\n\\warn {ROW_COUNT_PREFIX} :ROW_COUNT\n")
+    samples, peak = [], 0
+    pending = list(CHECKPOINTS)
+    lines, byte_size = 0, 0
+    started = time.perf_counter()
+    first_block = None
+    try:
+        with open(output_path, 'wb') as out:
+            for block in copy_blocks(process):
+                if first_block is None:
+                    first_block = time.perf_counter() - started
+                out.write(block)
+                lines += block.count(b"\n")
+                byte_size += len(block)
+                psql_rss = rss_bytes(process.pid)
+                if psql_rss is not None:
+                    peak = max(peak, psql_rss)
+                while pending and lines - 1 >= pending[0] * rows:
+                    samples.append((pending.pop(0), lines - 1, psql_rss, rss_bytes(os.getpid())))
+        messages = finish_psql(process)
+    finally:
+        stop_psql(process)
+    elapsed = time.perf_counter() - started
+
+    exported = max(lines - 1, 0)
+    for line in messages.splitlines():
+        if line.startswith(ROW_COUNT_PREFIX + " "):
+            exported = int(line.split()[1])
+    return {
+        "rows": exported,
+        "bytes": byte_size,
+        "seconds": elapsed,
+        "first_block_seconds": first_block or elapsed,
+        "samples": samples,
+        "psql_peak": peak,
+    }
+
+def create_concat_functions():
+    """The replaced row-by-row concatenation and the set-based export, on scratch rows"""
+    psql(f"""
+        CREATE OR REPLACE FUNCTION {SCRATCH_SCHEMA}.csv_field(p_value TEXT)
+        RETURNS TEXT AS $$
+          SELECT CASE
+            WHEN p_value IS NULL THEN ''
+            WHEN p_value ~ '[",\\r\\n]' THEN '"' || replace(p_value, '"', '""') || '"'
+            ELSE p_value
+          END;
+        $$ LANGUAGE sql IMMUTABLE;
+
+        CREATE OR REPLACE FUNCTION {SCRATCH_SCHEMA}.report_data(p_rows INTEGER)
+        RETURNS JSONB AS $$
+          SELECT jsonb_agg(to_jsonb(q)) FROM ({EXPORT_QUERY} LIMIT p_rows) q;
+        $$ LANGUAGE sql;
+
+        -- The loop export_report_data used to run
+        CREATE OR REPLACE FUNCTION {SCRATCH_SCHEMA}.concat_csv(p_rows INTEGER)
+        RETURNS TEXT AS $$
+        DECLARE
+          csv_output TEXT := '';
+          header_row TEXT;
+          data_row TEXT;
+          record_item JSONB;
+        BEGIN
+          FOR record_item IN SELECT * FROM jsonb_array_elements({SCRATCH_SCHEMA}.report_data(p_rows))
+          LOOP
+            IF csv_output = '' THEN
+              SELECT string_agg(key, ',') INTO header_row FROM jsonb_object_keys(record_item) AS key;
+              csv_output := header_row || E'\\n';
+            END IF;
+            SELECT string_agg(COALESCE(value::TEXT, ''), ',') INTO data_row FROM jsonb_each_text(record_item);
+            csv_output := csv_output || data_row || E'\\n';
+          END LOOP;
+          RETURN csv_output;
+        END;
+        $$ LANGUAGE plpgsql;
+
+        -- The set-based CSV branch of export_report_data now
+        CREATE OR REPLACE FUNCTION {SCRATCH_SCHEMA}.set_based_csv(p_rows INTEGER)
+        RETURNS TEXT AS $$
+          WITH items AS (
+            SELECT value AS item, ordinality AS n
+            FROM jsonb_array_elements({SCRATCH_SCHEMA}.report_data(p_rows)) WITH ORDINALITY
+          )
+          SELECT
+            (SELECT string_agg({SCRATCH_SCHEMA}.csv_field(key), ',') FROM jsonb_object_keys((SELECT item FROM items WHERE n = 1)) AS key)
+            || E'\\n'
+            || string_agg((SELECT string_agg({SCRATCH_SCHEMA}.csv_field(value), ',') FROM jsonb_each_text(item)), E'\\n' ORDER BY n)
+            || E'\\n'
+          FROM items;
+        $$ LANGUAGE sql;
+    """)
+
+def time_concat(function, rows):
+    """Seconds one function takes to build the CSV of the first rows exported rows"""
+    started = time.perf_counter()
+    query_value(f"SELECT length({SCRATCH_SCHEMA}.{function}({rows}))")
+    return time.perf_counter() - started
+
+def main():
+    """Main benchmark function"""
+    parser = argparse.ArgumentParser(description="Benchmark the streaming COPY report export")
+    parser.add_argument("--rows", type=int, default=1000000, help="attendance records exported")
+    parser.add_argument("--students", type=int, default=2000, help="students the records are spread over")
+    parser.add_argument("--classes", type=int, default=60, help="classes the students are spread over")
+    parser.add_argument("--max-growth-mb", type=float, default=16.0,
+                        help="allowed psql memory growth after the first 10%% of the rows")
+    parser.add_argument("--compare-rows", default="5000,10000,20000,40000",
+                        help="sizes for the concatenation comparison (empty to skip)")
+    parser.add_argument("--keep", action="store_true", help=f"keep the {SCRATCH_SCHEMA} schema afterwards")
+    args = parser.parse_args()
+
+    print("\n" + "="*70)
+    print("  STREAMING REPORT EXPORT: COPY ... TO STDOUT WITH CSV")
+    print(f"  Database: {bench_database_url()}")
+    print("="*70 + "\n")
+
+    print(f"Seeding {args.rows:,} attendance records ({args.students:,} students)...")
+    days = seed_scratch_tables(args.rows, args.students, args.classes)
+    print(f"  {days} school days of attendance\n")
+
+    with tempfile.TemporaryDirectory() as directory:
+        result = stream_export(args.rows, Path(directory) / "attendance_export.csv")
+
+    print(f"Exported {result['rows']:,} rows, {format_bytes(result['bytes'])} in {result['seconds']:.1f}s "
+          f"({result['rows'] / max(result['seconds'], 1e-9):,.0f} rows/s, first block after "
+          f"{result['first_block_seconds']:.2f}s)\n")
+
+    flat = True
+    samples = [sample for sample in result['samples'] if sample[2] is not None]
+    if samples:
+        print(f"{'progress':>9} {'rows':>12} {'psql RSS':>12} {'worker RSS':>12}")
+        print("-" * 48)
+        for fraction, exported, psql_rss, own_rss in samples:
+            print(f"{fraction:>8.0%} {exported:>12,} {format_bytes(psql_rss):>12} {format_bytes(own_rss or 0):>12}")
+        growth = result['psql_peak'] - samples[0][2]
+        flat = growth <= args.max_growth_mb * 1024 * 1024
+        print(f"\npsql grew {format_bytes(max(growth, 0))} after the first 10% "
+              f"(limit {args.max_growth_mb:g} MB): {'✅ flat' if flat else '❌ NOT FLAT'}")
+    else:
+        print("Memory sampling needs /proc (Linux) - skipped")
+    # ru_maxrss is kB on Linux, bytes on macOS
+    own_peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    print(f"Benchmark process peak RSS: {format_bytes(own_peak if sys.platform == 'darwin' else own_peak * 1024)}")
+
+    sizes = [int(size) for size in args.compare_rows.split(",") if size.strip()]
+    if sizes:
+        create_concat_functions()
+        print(f"\n{'rows':>10} {'concatenation':>15} {'set-based':>12}")
+        print("-" * 40)
+        previous = None
+        for size in sizes:
+            concat, set_based = time_concat("concat_csv", size), time_concat("set_based_csv", size)
+            growth = f"  x{concat / previous:.1f}" if previous else ""
+            print(f"{size:>10,} {concat:>13.2f} s {set_based:>10.2f} s{growth}")
+            previous = concat
+        print("\nDoubling the rows should double the set-based time; the concatenation "
+              "grows ~4x per doubling once the string dominates.")
+
+    if not args.keep:
+        psql(f"DROP SCHEMA IF EXISTS {SCRATCH_SCHEMA} CASCADE;")
+    print("\n" + "="*70 + "\n")
+    raise SystemExit(0 if flat else 1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+Full-Text Search Benchmark
+Compares the generated tsvector + GIN search path against ILIKE scans.
+
+Usage:
+    python benchmark_search.py                        # 1M rows per tenant, 2 tenants
+    python benchmark_search.py --rows-per-tenant 200000 --tenants 5
+    python benchmark_search.py --keep                 # leave the scratch schema behind
+
+The scratch table uses the same search_vector column the Phase 8/9 generators
+emit for searchable specs, so the numbers describe the generated schema. Each
+query runs under the tenant/branch predicate the RLS policies add and returns
+the first page (20 rows, newest first), like the generated search() method.
+"""
+
+import argparse
+
+from local_db import psql, explain_analyze, percentile, format_bytes, bench_database_url
+from spec_generators import load_generator
+
+SCRATCH_SCHEMA = "perf_search"
+SCRATCH_TABLE = f"{SCRATCH_SCHEMA}.searchable_records"
+PAGE_SIZE = 20
+
+# Seed vocabulary: a few very common words, the rest progressively rarer
+COMMON_WORDS = ["fee", "payment", "student", "request", "report", "notice", "meeting", "book"]
+RARE_WORD_COUNT = 20000
+
+SEARCH_TERMS = [
+    ("common word", "payment"),
+    ("rare word", "term1234"),
+    ("two words", "student term77"),
+    ("prefix-free miss", "nonexistentword"),
+]
+
+def seed_scratch_table(rows_per_tenant, tenants):
+    """Create and fill a scratch table with the generated search column"""
+    generator = load_generator("PHASE-08-SUPPORT-STAFF")
+    common = ", ".join(f"'{word}'" for word in COMMON_WORDS)
+    total_rows = rows_per_tenant * tenants
+    psql(f"""
+        DROP SCHEMA IF EXISTS {SCRATCH_SCHEMA} CASCADE;
+        CREATE SCHEMA {SCRATCH_SCHEMA};
+        CREATE TABLE {SCRATCH_TABLE} (
+          id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+          tenant_id UUID NOT NULL,
+          branch_id UUID NOT NULL,
+          name VARCHAR(255),
+          description TEXT,
+          status VARCHAR(50) DEFAULT 'active',
+          {generator.generate_search_vector_column()},
+          created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+        );
+        INSERT INTO {SCRATCH_TABLE} (tenant_id, branch_id, name, description, created_at)
+        SELECT
+          ('00000000-0000-0000-0000-' || lpad((g % {tenants})::text, 12, '0'))::uuid,
+          ('00000000-0000-0000-0001-' || lpad((g % {tenants})::text, 12, '0'))::uuid,
+          (ARRAY[{common}])[1 + (g % {len(COMMON_WORDS)})] || ' term' || ((g * 7919) % {RARE_WORD_COUNT}),
+          'Recorded ' || (ARRAY[{common}])[1 + ((g / 3) % {len(COMMON_WORDS)})]
+            || ' entry ' || md5(g::text) || ' term' || ((g * 104729) % {RARE_WORD_COUNT}),
+          timestamptz '2025-01-01' + (g::double precision / {total_rows}) * interval '365 days'
+        FROM generate_series(1, {total_rows}) g;
+        CREATE INDEX ON {SCRATCH_TABLE}(tenant_id, branch_id);
+        CREATE INDEX ON {SCRATCH_TABLE}(created_at DESC);
+        CREATE INDEX searchable_records_search ON {SCRATCH_TABLE} USING GIN (search_vector);
+        VACUUM ANALYZE {SCRATCH_TABLE};
+    """)
+    return int(psql(f"SELECT pg_relation_size('{SCRATCH_SCHEMA}.searchable_records_search');").strip())
+
+def tenant_filter():
+    """Predicate the RLS policies add for tenant 0"""
+    return ("tenant_id = '00000000-0000-0000-0000-000000000000' "
+            "AND branch_id = '00000000-0000-0000-0001-000000000000'")
+
+def ilike_query(term):
+    """What search turns into without a text index"""
+    clauses = " AND ".join(
+        f"(name ILIKE '%{word}%' OR description ILIKE '%{word}%')" for word in term.split()
+    )
+    return f"""SELECT * FROM {SCRATCH_TABLE}
+        WHERE {tenant_filter()} AND {clauses}
+        ORDER BY created_at DESC LIMIT {PAGE_SIZE + 1}"""
+
+def tsvector_query(term):
+    """What the generated search() method sends through PostgREST"""
+    return f"""SELECT * FROM {SCRATCH_TABLE}
+        WHERE {tenant_filter()} AND search_vector @@ websearch_to_tsquery('simple', '{term}')
+        ORDER BY created_at DESC LIMIT {PAGE_SIZE + 1}"""
+
+def time_query(sql, repeats):
+    """Execution times of repeated EXPLAIN ANALYZE runs"""
+    return [explain_analyze(sql)['Execution Time'] for _ in range(repeats)]
+
+def main():
+    """Main benchmark function"""
+    parser = argparse.ArgumentParser(description="Benchmark generated full-text search against ILIKE")
+    parser.add_argument("--rows-per-tenant", type=int, default=1000000)
+    parser.add_argument("--tenants", type=int, default=2)
+    parser.add_argument("--repeats", type=int, default=10, help="timed runs per query")
+    parser.add_argument("--keep", action="store_true", help=f"keep the {SCRATCH_SCHEMA} schema afterwards")
+    args = parser.parse_args()
+
+    print("\n" + "="*70)
+    print("  FULL-TEXT SEARCH BENCHMARK")
+    print(f"  Database: {bench_database_url()}")
+    print(f"  {args.rows_per_tenant:,} rows per tenant x {args.tenants} tenants")
+    print("="*70 + "\n")
+
+    print("Seeding scratch table (this takes a while at 1M rows per tenant)...")
+    gin_size = seed_scratch_table(args.rows_per_tenant, args.tenants)
+    print(f"  ✓ GIN index size: {format_bytes(gin_size)}\n")
+
+    header = f"{'query':18} {'ILIKE p50':>12} {'ILIKE p95':>12} {'tsvector p50':>14} {'tsvector p95':>14}"
+    print(header)
+    print("-" * len(header))
+    for label, term in SEARCH_TERMS:
+        ilike = time_query(ilike_query(term), args.repeats)
+        fts = time_query(tsvector_query(term), args.repeats)
+        print(f"{label:18} {percentile(ilike, 50):>9.1f} ms {percentile(ilike, 95):>9.1f} ms"
+              f" {percentile(fts, 50):>11.1f} ms {percentile(fts, 95):>11.1f} ms")
+
+    print("\nSearch budget in the generated specs: < 500ms")
+
+    if not args.keep:
+        psql(f"DROP SCHEMA IF EXISTS {SCRATCH_SCHEMA} CASCADE;")
+    print("\n" + "="*70 + "\n")
+
+if __name__ == "__main__":
+    main()
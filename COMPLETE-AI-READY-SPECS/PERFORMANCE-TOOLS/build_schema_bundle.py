@@ -0,0 +1,634 @@
+#!/usr/bin/env python3
+"""
+Schema Bundle Builder
+Extracts the runnable SQL from the PHASE-01 migrations and spec documents and
+from the Phase 8/9/10 generators, orders it by dependency and writes one
+deterministic migration bundle that a local Postgres applies in a single
+transaction.
+
+Usage:
+    python build_schema_bundle.py                  # writes schema-bundle.sql
+    python build_schema_bundle.py --apply          # ...and applies it to a fresh BENCH_DATABASE_URL
+    python build_schema_bundle.py --check          # exit 1 when schema-bundle.sql is stale
+    python build_schema_bundle.py --no-generated   # PHASE-01 only
+    python build_schema_bundle.py --report         # list skipped and duplicate statements
+
+Sources, in precedence order:
+    1. PHASE-01-FOUNDATION/02-DATABASE/migrations/*.sql, taken whole
+    2. The ```sql fences of the PHASE-01 spec documents (02-DATABASE/*.md and
+       the 03-SECURITY / 04-DATABASE-FUNCTIONS *.sql files, which are markdown
+       with embedded SQL), except sections that are usage examples or tests
+    3. The ```sql fences of every spec the Phase 8/9/10 generators emit, built
+       in memory so the bundle follows the generators rather than stale files
+
+How the statements are reconciled:
+    - Only definitions and data changes are kept (CREATE, ALTER, COMMENT,
+      GRANT/REVOKE, DO, INSERT/UPDATE/DELETE, and DROP POLICY/TRIGGER IF
+      EXISTS ahead of a replacement). Stand-alone SELECTs, ANALYZE, VACUUM and
+      psql meta-commands are examples or maintenance and are skipped.
+    - CREATE INDEX CONCURRENTLY becomes a plain CREATE INDEX: the bundle runs in
+      one transaction, where CONCURRENTLY is not allowed.
+    - The blocks the generators repeat in every spec are kept once. An object
+      defined twice keeps one definition: the first for tables, indexes,
+      policies, triggers and types (what IF NOT EXISTS or the error on a
+      second CREATE would leave), the last differing one for CREATE OR
+      REPLACE functions and views (what re-running them would leave). A later
+      CREATE TABLE with columns the kept one lacks adds them (ALTER TABLE ...
+      ADD COLUMN IF NOT EXISTS), as the phases disagree on some shared tables.
+    - Schemas the specs put objects in without creating them (rbac, reports,
+      utils, ...) are created at the top.
+    - Statements are sorted topologically on the schemas, relations, types and
+      functions they reference, ties broken by source order, so the bundle is
+      byte-identical for identical inputs. Function bodies are not validated
+      (check_function_bodies = off, as pg_dump does), so only what a statement
+      needs at creation time orders it; a dependency cycle falls back to
+      source order and is reported.
+"""
+
+import argparse
+import difflib
+import heapq
+import re
+import subprocess
+import sys
+from collections import namedtuple
+from pathlib import Path
+
+from local_db import psql_command, bench_database_url
+from spec_generators import SPECS_ROOT, load_generators
+
+BUNDLE_PATH = SPECS_ROOT / "PERFORMANCE-TOOLS" / "schema-bundle.sql"
+PHASE_01 = SPECS_ROOT / "PHASE-01-FOUNDATION"
+MIGRATIONS_DIR = PHASE_01 / "02-DATABASE" / "migrations"
+SPEC_DOCUMENT_GLOBS = ("02-DATABASE/*.md", "03-SECURITY/*.sql", "04-DATABASE-FUNCTIONS/*.sql")
+
+# Markdown sections whose fences are examples, checks or tuning notes rather than schema
+EXAMPLE_HEADING_KEYWORDS = (
+    "usage", "example", "testing", "test", "validation", "verification",
+    "query optimization", "connection pooling", "monitoring", "setup script",
+)
+
+# Leading keywords of the statements the bundle keeps
+RUNNABLE_KEYWORDS = ("CREATE", "ALTER", "COMMENT", "GRANT", "REVOKE", "DO", "INSERT", "UPDATE", "DELETE", "DROP")
+
+Statement = namedtuple("Statement", "position source line text")
+Definition = namedtuple("Definition", "kind key name replaces")
+
+IDENTIFIER = r'(?:"[^"]+"|[A-Za-z_][A-Za-z0-9_$]*)'
+QUALIFIED = rf"{IDENTIFIER}(?:\s*\.\s*{IDENTIFIER})?"
+NAME_TOKEN = re.compile(rf"({IDENTIFIER})(?:\s*\.\s*({IDENTIFIER}))?")
+
+# The one kind of DROP kept: the specs drop a policy or trigger they replace
+DROP_PATTERN = re.compile(rf"^DROP\s+(POLICY|TRIGGER)\s+IF\s+EXISTS\s+({IDENTIFIER})\s+ON\s+({QUALIFIED})", re.I)
+
+# Schemas every Supabase database already has; any other schema the specs
+# define objects in without creating it is created at the top of the bundle
+SUPABASE_SCHEMAS = {
+    "public", "auth", "storage", "extensions", "realtime", "graphql", "graphql_public",
+    "vault", "pgsodium", "cron", "pg_catalog", "information_schema",
+}
+
+# Keywords a relation or function name follows
+REFERENCE_CONTEXT = re.compile(
+    r"\b(?:REFERENCES|FROM|JOIN|ON|TABLE|INTO|UPDATE|ONLY|LIKE|SETOF|INHERITS\s*\(|"
+    r"EXECUTE\s+(?:FUNCTION|PROCEDURE)|FUNCTION)\s+$", re.I)
+
+DEFINITION_PATTERNS = [
+    ("schema", False, re.compile(rf"^CREATE\s+SCHEMA\s+(?:IF\s+NOT\s+EXISTS\s+)?({IDENTIFIER})", re.I)),
+    ("extension", False, re.compile(rf"^CREATE\s+EXTENSION\s+(?:IF\s+NOT\s+EXISTS\s+)?({IDENTIFIER})", re.I)),
+    ("type", False, re.compile(rf"^CREATE\s+(?:TYPE|DOMAIN)\s+({QUALIFIED})", re.I)),
+    ("relation", False, re.compile(
+        rf"^CREATE\s+(?:(?:GLOBAL\s+|LOCAL\s+)?(?:TEMP|TEMPORARY|UNLOGGED)\s+)?TABLE\s+(?:IF\s+NOT\s+EXISTS\s+)?({QUALIFIED})", re.I)),
+    ("relation", False, re.compile(rf"^CREATE\s+SEQUENCE\s+(?:IF\s+NOT\s+EXISTS\s+)?({QUALIFIED})", re.I)),
+    ("relation", False, re.compile(rf"^CREATE\s+MATERIALIZED\s+VIEW\s+(?:IF\s+NOT\s+EXISTS\s+)?({QUALIFIED})", re.I)),
+    ("relation", True, re.compile(rf"^CREATE\s+(?:OR\s+REPLACE\s+)?(?:TEMP\s+|TEMPORARY\s+)?(?:RECURSIVE\s+)?VIEW\s+({QUALIFIED})", re.I)),
+    ("function", True, re.compile(rf"^CREATE\s+(?:OR\s+REPLACE\s+)?(?:FUNCTION|PROCEDURE)\s+({QUALIFIED})\s*\(", re.I)),
+    ("index", False, re.compile(
+        rf"^CREATE\s+(?:UNIQUE\s+)?INDEX\s+(?:CONCURRENTLY\s+)?(?:IF\s+NOT\s+EXISTS\s+)?({IDENTIFIER})\s+ON\s+(?:ONLY\s+)?({QUALIFIED})", re.I)),
+    ("policy", False, re.compile(rf"^CREATE\s+POLICY\s+({IDENTIFIER})\s+ON\s+({QUALIFIED})", re.I)),
+    ("trigger", False, re.compile(
+        rf"^CREATE\s+(?:OR\s+REPLACE\s+)?(?:CONSTRAINT\s+)?TRIGGER\s+({IDENTIFIER})\s.*?\bON\s+({QUALIFIED})", re.I | re.S)),
+]
+
+def read_text(path):
+    """Read a source file with normalised line endings"""
+    return path.read_text(encoding="utf-8").replace("\r\n", "\n")
+
+def unquote(identifier):
+    """Fold an identifier the way Postgres does: quoted keeps its case"""
+    identifier = identifier.strip()
+    return identifier[1:-1] if identifier.startswith('"') else identifier.lower()
+
+def qualify(name, default_schema="public"):
+    """schema.name of a possibly unqualified name"""
+    parts = [unquote(part) for part in re.split(r"\s*\.\s*(?=(?:[^\"]*\"[^\"]*\")*[^\"]*$)", name.strip())]
+    return ".".join(parts) if len(parts) == 2 else f"{default_schema}.{parts[0]}"
+
+def sql_fences(markdown, skip_examples=True):
+    """Yield (line number, sql) of the ```sql fences outside example sections"""
+    lines = markdown.split("\n")
+    heading = {}
+    index = 0
+    while index < len(lines):
+        line = lines[index]
+        match = re.match(r"^(#{1,6})\s+(.*)", line)
+        if match:
+            level = len(match.group(1))
+            heading = {depth: text for depth, text in heading.items() if depth < level}
+            heading[level] = match.group(2).lower()
+        elif line.startswith("```"):
+            language = line[3:].strip().lower()
+            end = index + 1
+            while end < len(lines) and not lines[end].startswith("```"):
+                end += 1
+            example = any(keyword in text for text in heading.values() for keyword in EXAMPLE_HEADING_KEYWORDS)
+            if language == "sql" and not (skip_examples and example):
+                yield index + 2, "\n".join(lines[index + 1:end])
+            index = end
+        index += 1
+
+def split_statements(sql):
+    """Split SQL into (line offset, statement) on top-level semicolons
+
+    Quotes, dollar-quoted bodies and comments are kept intact; psql
+    meta-commands (lines starting with a backslash) come out as statements
+    of their own so they can be skipped.
+    """
+    statements = []
+    start = 0
+    position = 0
+    length = len(sql)
+    while position < length:
+        char = sql[position]
+        if char == "-" and sql.startswith("--", position):
+            position = sql.find("\n", position)
+            position = length if position < 0 else position
+        elif char == "/" and sql.startswith("/*", position):
+            depth = 0
+            while position < length:
+                if sql.startswith("/*", position):
+                    depth += 1
+                    position += 2
+                elif sql.startswith("*/", position):
+                    depth -= 1
+                    position += 2
+                    if depth == 0:
+                        break
+                else:
+                    position += 1
+            continue
+        elif char in ("'", '"'):
+            position += 1
+            while position < length:
+                if sql[position] == char:
+                    if sql.startswith(char * 2, position):
+                        position += 2
+                        continue
+                    break
+                position += 1
+        elif char == "$":
+            match = re.match(r"\$([A-Za-z_][A-Za-z0-9_]*)?\$", sql[position:])
+            if match and not re.match(r"[A-Za-z0-9_]", sql[position - 1:position] or " "):
+                end = sql.find(match.group(0), position + len(match.group(0)))
+                position = length if end < 0 else end + len(match.group(0)) - 1
+        elif char == "\\" and not strip_comments(sql[start:position]):
+            end = sql.find("\n", position)
+            end = length if end < 0 else end
+            statements.append((sql.count("\n", 0, position), sql[position:end].strip()))
+            start = position = end
+            continue
+        elif char == ";":
+            add_statement(statements, sql, start, position)
+            start = position + 1
+        position += 1
+    add_statement(statements, sql, start, length)
+    return statements
+
+def add_statement(statements, sql, start, end):
+    """Append sql[start:end] unless it is only whitespace and comments"""
+    chunk = sql[start:end]
+    if strip_comments(chunk):
+        leading = re.match(r"(?:\s+|--[^\n]*|/\*.*?\*/)*", chunk, re.S).end()
+        statements.append((sql.count("\n", 0, start + leading), chunk[leading:].strip() + ";"))
+
+def strip_comments(sql):
+    """SQL without -- and /* */ comments (string contents untouched)"""
+    return re.sub(r"/\*.*?\*/|--[^\n]*|('(?:[^']|'')*')", lambda m: m.group(1) or " ", sql, flags=re.S).strip()
+
+def strip_literals(sql, keep_bodies):
+    """SQL without comments, string literals and (unless kept) dollar-quoted bodies"""
+    sql = strip_comments(sql)
+    if keep_bodies:
+        sql = re.sub(r"\$((?:[A-Za-z_][A-Za-z0-9_]*)?)\$", " ", sql)
+    else:
+        sql = re.sub(r"\$((?:[A-Za-z_][A-Za-z0-9_]*)?)\$.*?\$\1\$", "$$ $$", sql, flags=re.S)
+    return re.sub(r"'(?:[^']|'')*'", "''", sql)
+
+def collect_statements(include_generated=True):
+    """Every statement of every source, in precedence order"""
+    sources = []
+    for path in sorted(MIGRATIONS_DIR.glob("*.sql")):
+        sources.append((path.relative_to(SPECS_ROOT).as_posix(), [(1, read_text(path))]))
+    for pattern in SPEC_DOCUMENT_GLOBS:
+        for path in sorted(PHASE_01.glob(pattern)):
+            sources.append((path.relative_to(SPECS_ROOT).as_posix(), list(sql_fences(read_text(path)))))
+    if include_generated:
+        for phase, generator in sorted(load_generators().items()):
+            for spec in generator.SPECIFICATIONS:
+                source = f"{phase}/{spec['portal']}/SPEC-{spec['id']} (generated)"
+                sources.append((source, list(sql_fences(generator.generate_spec(spec)))))
+
+    statements = []
+    for source, blocks in sources:
+        for first_line, sql in blocks:
+            for offset, text in split_statements(sql):
+                statements.append(Statement(len(statements), source, first_line + offset, text))
+    return statements
+
+def leading_keywords(text, count=4):
+    """First few keywords of a statement, upper-cased"""
+    return " ".join(strip_comments(text).split()[:count]).upper()
+
+def skip_reason(statement):
+    """Why a statement is left out of the bundle, or None to keep it"""
+    head = leading_keywords(statement.text)
+    if statement.text.startswith("\\"):
+        return "psql meta-command"
+    if not head.startswith(RUNNABLE_KEYWORDS):
+        return f"not a definition ({head.split()[0] if head else 'empty'})"
+    if re.match(r"^ALTER\s+SYSTEM\b|^CREATE\s+DATABASE\b|^ALTER\s+DATABASE\b", head):
+        return "server-level statement"
+    if head.startswith("DROP") and not DROP_PATTERN.match(strip_comments(statement.text)):
+        return "destructive DROP"
+    return None
+
+def make_runnable(text):
+    """Rewrite what a single transaction rejects"""
+    return re.sub(r"^(CREATE\s+(?:UNIQUE\s+)?INDEX\s+)CONCURRENTLY\s+", r"\1", text, flags=re.I)
+
+def function_signature(text):
+    """Argument types of a CREATE FUNCTION, normalised, for telling overloads apart"""
+    match = re.search(r"\(", text)
+    depth, end = 0, match.start()
+    for end in range(match.start(), len(text)):
+        depth += {"(": 1, ")": -1}.get(text[end], 0)
+        if depth == 0:
+            break
+    types = []
+    for argument in re.split(r",(?![^()]*\))", text[match.start() + 1:end]):
+        argument = re.split(r"\s+DEFAULT\s+|\s*=\s*", argument.strip(), flags=re.I)[0]
+        words = [word for word in argument.split() if word.upper() not in ("IN", "INOUT", "VARIADIC")]
+        if not words or (words[0].upper() == "OUT"):
+            continue
+        # "name type" or just "type"
+        types.append(" ".join(words[1:] if len(words) > 1 and not words[1].startswith("(") else words).lower())
+    return ",".join(types)
+
+def describe(text):
+    """The object a statement defines, or None"""
+    body = strip_comments(text)
+    for kind, replaces, pattern in DEFINITION_PATTERNS:
+        match = pattern.match(body)
+        if not match:
+            continue
+        if kind in ("schema", "extension"):
+            name = unquote(match.group(1))
+            return Definition(kind, f"{kind}:{name}", name, False)
+        name = qualify(match.group(1))
+        if kind == "function":
+            return Definition(kind, f"function:{name}({function_signature(body)})", name, replaces)
+        if kind == "index":
+            schema = qualify(match.group(2)).split(".")[0]
+            return Definition(kind, f"index:{schema}.{unquote(match.group(1))}", f"{schema}.{unquote(match.group(1))}", False)
+        if kind in ("policy", "trigger"):
+            table = qualify(match.group(2))
+            name = unquote(match.group(1))
+            trigger_replaces = kind == "trigger" and re.match(r"^CREATE\s+OR\s+REPLACE", body, re.I) is not None
+            return Definition(kind, f"{kind}:{table}.{name}", f"{table}.{name}", trigger_replaces)
+        if kind == "relation" and replaces and not re.match(r"^CREATE\s+OR\s+REPLACE", body, re.I):
+            replaces = False
+        return Definition(kind, f"{kind}:{name}", name, replaces)
+    return None
+
+def references(text, definition, kinds):
+    """Names of bundle objects a statement needs to exist when it runs
+
+    Bare names only count where a relation or function must go (after FROM,
+    REFERENCES, ON, ... or before an opening parenthesis) or when they name a
+    type, so a column that shares a table's name adds no dependency.
+    """
+    keep_bodies = leading_keywords(text, 1) == "DO"
+    body = strip_literals(text, keep_bodies)
+    needed = set()
+    for match in NAME_TOKEN.finditer(body):
+        first, second = unquote(match.group(1)), match.group(2)
+        before = body[max(0, match.start() - 40):match.start()]
+        after = body[match.end():match.end() + 10]
+        if second is not None:
+            needed.update({f"schema:{first}", f"{first}.{unquote(second)}"})
+            if re.search(r"\bCOLUMN\s+$", before, re.I):
+                needed.add(f"public.{first}")
+            continue
+        name = f"public.{first}"
+        if re.search(r"\bSCHEMA\s+$", before, re.I):
+            needed.add(f"schema:{first}")
+        elif (REFERENCE_CONTEXT.search(before) or re.match(r"\s*\(|%(?:ROW)?TYPE", after, re.I)
+                or "type" in kinds.get(name, ())):
+            needed.add(name)
+    if definition is not None:
+        needed.discard(definition.name)
+    return {name for name in needed if name in kinds}
+
+def split_top_level(text):
+    """Split on commas outside parentheses and quotes"""
+    parts, depth, quote, start = [], 0, None, 0
+    for position, char in enumerate(text):
+        if quote:
+            quote = None if char == quote else quote
+        elif char in ("'", '"'):
+            quote = char
+        elif char == "(":
+            depth += 1
+        elif char == ")":
+            depth -= 1
+        elif char == "," and depth == 0:
+            parts.append(text[start:position].strip())
+            start = position + 1
+    parts.append(text[start:].strip())
+    return [part for part in parts if part]
+
+TABLE_CONSTRAINTS = ("CONSTRAINT", "PRIMARY", "UNIQUE", "CHECK", "FOREIGN", "EXCLUDE", "LIKE")
+
+def table_columns(text):
+    """{column: definition} of a CREATE TABLE with a column list, else None"""
+    body = strip_comments(text)
+    if not re.match(r"^CREATE\s+(?:\w+\s+)*?TABLE\b", body, re.I) or re.search(r"\bPARTITION\s+OF\b|\bAS\s+SELECT\b", body, re.I):
+        return None
+    start = body.find("(")
+    depth = 0
+    for end in range(start, len(body)):
+        depth += {"(": 1, ")": -1}.get(body[end], 0)
+        if depth == 0:
+            break
+    columns = {}
+    for item in split_top_level(body[start + 1:end]):
+        first = re.split(r"[\s(]", item, 1)[0]
+        if first.upper() not in TABLE_CONSTRAINTS:
+            columns[unquote(first)] = item
+    return columns
+
+def merge_columns(statement, table, columns):
+    """ALTER TABLE adding the columns a duplicate CREATE TABLE has and the kept one lacks
+
+    Added columns are never the primary key and, without a default, nullable:
+    the kept shape did not require them and the table may already hold seed rows.
+    """
+    extra = []
+    for column, definition in (table_columns(statement.text) or {}).items():
+        if column in columns:
+            continue
+        definition = re.sub(r"\s+PRIMARY\s+KEY\b", "", definition, flags=re.I)
+        if not re.search(r"\bDEFAULT\b", definition, re.I):
+            definition = re.sub(r"\s+NOT\s+NULL\b", "", definition, flags=re.I)
+        extra.append(definition)
+    if not extra:
+        return None
+    columns.update(table_columns(statement.text))
+    clauses = ",\n  ".join(f"ADD COLUMN IF NOT EXISTS {definition}" for definition in extra)
+    return statement._replace(text=f"ALTER TABLE {table}\n  {clauses};")
+
+def dropped_key(text):
+    """Definition key of the policy or trigger a kept DROP removes, or None"""
+    match = DROP_PATTERN.match(strip_comments(text))
+    if not match:
+        return None
+    return f"{match.group(1).lower()}:{qualify(match.group(3))}.{unquote(match.group(2))}"
+
+def normalized(text):
+    """Statement text without comments and with collapsed whitespace"""
+    return " ".join(strip_comments(text).split())
+
+def reconcile(statements):
+    """Drop skipped statements and duplicate definitions; returns (kept, report)
+
+    kept holds (statement, definition) pairs; a kept DROP carries a "drop"
+    definition naming the key it removes. Shared blocks the generators repeat
+    in every spec are kept once, at their first occurrence. A duplicate
+    CREATE TABLE with columns the kept one lacks becomes an ALTER TABLE adding
+    them, so the indexes and policies written against either shape apply.
+    """
+    report = []
+    runnable = []
+    for statement in statements:
+        reason = skip_reason(statement)
+        if reason:
+            report.append((statement, f"skipped: {reason}"))
+        else:
+            runnable.append(statement._replace(text=make_runnable(statement.text)))
+
+    # A replaceable definition wins when it differs from the current winner;
+    # a CREATE that follows a DROP of the same object always does
+    winners = {}
+    dropped = set()
+    for statement in runnable:
+        key = dropped_key(statement.text)
+        if key:
+            dropped.add(key)
+            continue
+        definition = describe(statement.text)
+        if definition is None:
+            continue
+        current = winners.get(definition.key)
+        if (current is None or definition.key in dropped
+                or (definition.replaces and current[1] != normalized(statement.text))):
+            winners[definition.key] = (statement.position, normalized(statement.text))
+            dropped.discard(definition.key)
+
+    kept = []
+    table_shapes = {}
+    repeated = set()
+    for statement in runnable:
+        key = dropped_key(statement.text)
+        definition = describe(statement.text)
+        if key:
+            if winners.get(key, (len(statements),))[0] > statement.position:
+                report.append((statement, f"skipped: nothing to drop, {key} is only created later or never"))
+            else:
+                kept.append((statement, Definition("drop", f"drop:{key}", key, False)))
+        elif definition is None:
+            if normalized(statement.text) in repeated:
+                report.append((statement, "skipped: repeats an earlier statement"))
+            else:
+                repeated.add(normalized(statement.text))
+                kept.append((statement, None))
+        elif winners[definition.key][0] != statement.position:
+            report.append((statement, f"duplicate {definition.key}, kept statement #{winners[definition.key][0]}"))
+            if definition.key in table_shapes:
+                merged = merge_columns(statement, definition.name, table_shapes[definition.key])
+                if merged:
+                    report.append((statement, f"merged its extra columns into {definition.name}"))
+                    kept.append((merged, None))
+        else:
+            if table_columns(statement.text) is not None:
+                table_shapes[definition.key] = table_columns(statement.text)
+            kept.append((statement, definition))
+    return implied_schemas(kept, report) + kept, report
+
+def implied_schemas(kept, report):
+    """CREATE SCHEMA statements for the schemas objects are defined in but no source creates"""
+    created = {definition.name for _, definition in kept if definition and definition.kind == "schema"}
+    first_use = {}
+    for statement, definition in kept:
+        if definition is None or definition.kind in ("schema", "extension", "drop"):
+            continue
+        schema = definition.name.split(".")[0]
+        if schema not in created and schema not in SUPABASE_SCHEMAS:
+            first_use.setdefault(schema, statement)
+    statements = []
+    for schema, statement in sorted(first_use.items()):
+        report.append((statement, f"implies CREATE SCHEMA {schema}"))
+        statements.append((
+            Statement(-1, f"implied by {statement.source}", statement.line, f"CREATE SCHEMA IF NOT EXISTS {schema};"),
+            Definition("schema", f"schema:{schema}", schema, False),
+        ))
+    return statements
+
+def order_statements(kept):
+    """Stable topological order: dependencies first, otherwise source order"""
+    providers = {}
+    kinds = {}
+    by_key = {}
+    for index, (statement, definition) in enumerate(kept):
+        if definition is None or definition.kind == "drop":
+            continue
+        by_key[definition.key] = index
+        name = definition.key if definition.kind == "schema" else definition.name
+        providers.setdefault(name, []).append(index)
+        kinds.setdefault(name, set()).add(definition.kind)
+
+    dependencies = []
+    for index, (statement, definition) in enumerate(kept):
+        # A name defined both before and after (an overload, a later ALTER)
+        # only waits for the definitions that come first in source order
+        edges = set()
+        for name in references(statement.text, definition, kinds):
+            earlier = [provider for provider in providers[name] if provider < index]
+            edges.update(earlier or providers[name][:1])
+        if definition is not None and definition.kind == "drop":
+            edges.add(by_key[definition.name])
+        edges.discard(index)
+        dependencies.append(edges)
+
+    # Kahn's algorithm, always emitting the lowest source position that is
+    # ready; on a cycle, the lowest remaining position goes anyway
+    dependents = [[] for _ in kept]
+    waiting = [len(edges) for edges in dependencies]
+    for index, edges in enumerate(dependencies):
+        for edge in edges:
+            dependents[edge].append(index)
+    ready = [index for index, count in enumerate(waiting) if count == 0]
+    heapq.heapify(ready)
+    emitted = [False] * len(kept)
+    order, cycles = [], []
+    while len(order) < len(kept):
+        if not ready:
+            forced = next(index for index in range(len(kept)) if not emitted[index])
+            cycles.append(kept[forced][0])
+            waiting[forced] = 0
+            heapq.heappush(ready, forced)
+        index = heapq.heappop(ready)
+        if emitted[index]:
+            continue
+        emitted[index] = True
+        order.append(kept[index][0])
+        for dependent in dependents[index]:
+            waiting[dependent] -= 1
+            if waiting[dependent] == 0 and not emitted[dependent]:
+                heapq.heappush(ready, dependent)
+    return order, cycles
+
+def render_bundle(order, sources):
+    """Bundle text: one transaction, each statement tagged with its source"""
+    lines = [
+        "-- ==============================================",
+        "-- SCHEMA BUNDLE",
+        "-- Generated by PERFORMANCE-TOOLS/build_schema_bundle.py - do not edit.",
+        f"-- {len(order)} statements from {len(sources)} sources, dependency-ordered.",
+        "-- Apply: psql \"$BENCH_DATABASE_URL\" -X -v ON_ERROR_STOP=1 -f schema-bundle.sql",
+        "-- ==============================================",
+        "",
+        "BEGIN;",
+        "SET LOCAL check_function_bodies = off;",
+        "SET LOCAL client_min_messages = warning;",
+        "",
+    ]
+    for statement in order:
+        lines.append(f"-- {statement.source}:{statement.line}")
+        lines.append(statement.text)
+        lines.append("")
+    lines.append("COMMIT;")
+    return "\n".join(lines) + "\n"
+
+def apply_bundle(path):
+    """Run the bundle through psql, stopping at the first error"""
+    result = subprocess.run(psql_command() + ["-f", str(path)], capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip())
+
+def main():
+    """Main bundle function"""
+    parser = argparse.ArgumentParser(description="Build one dependency-ordered SQL bundle from the specs")
+    parser.add_argument("--output", default=str(BUNDLE_PATH), help="bundle file to write")
+    parser.add_argument("--no-generated", action="store_true", help="leave out the Phase 8/9/10 generated specs")
+    parser.add_argument("--check", action="store_true", help="exit 1 if the bundle on disk differs instead of writing it")
+    parser.add_argument("--apply", action="store_true", help="apply the bundle to BENCH_DATABASE_URL afterwards")
+    parser.add_argument("--report", action="store_true", help="list skipped and duplicate statements")
+    args = parser.parse_args()
+
+    print("\n" + "="*70)
+    print("  SCHEMA BUNDLE")
+    print("="*70 + "\n")
+
+    statements = collect_statements(include_generated=not args.no_generated)
+    sources = sorted({statement.source for statement in statements})
+    kept, report = reconcile(statements)
+    order, cycles = order_statements(kept)
+    bundle = render_bundle(order, sources)
+
+    moved = sum(1 for previous, current in zip(order, order[1:]) if current.position < previous.position)
+    print(f"{len(statements):,} statements from {len(sources)} sources")
+    print(f"  {len(order):,} kept, {sum(1 for _, note in report if note.startswith('skipped')):,} skipped, "
+          f"{sum(1 for _, note in report if note.startswith('duplicate')):,} duplicate definitions dropped")
+    print(f"  {sum(1 for _, note in report if note.startswith('merged')):,} table shapes merged, "
+          f"{sum(1 for _, note in report if note.startswith('implies')):,} schemas created implicitly")
+    print(f"  {moved:,} statements moved behind a dependency defined later in the sources")
+    for statement in cycles:
+        print(f"  ⚠️  dependency cycle broken at {statement.source}:{statement.line}")
+    if args.report:
+        print()
+        for statement, note in report:
+            print(f"  {statement.source}:{statement.line}  {note}")
+
+    output = Path(args.output)
+    if args.check:
+        current = output.read_text(encoding="utf-8") if output.exists() else ""
+        stale = current != bundle
+        if stale:
+            diff = list(difflib.unified_diff(current.splitlines(), bundle.splitlines(), lineterm="", n=0))
+            print(f"\n❌ {output.name} is stale ({len(diff):,} diff lines) - rerun build_schema_bundle.py")
+        else:
+            print(f"\n✅ {output.name} is up to date")
+        print("\n" + "="*70 + "\n")
+        sys.exit(1 if stale else 0)
+
+    output.write_text(bundle, encoding="utf-8")
+    print(f"\n✓ Wrote {output} ({len(bundle) / 1024:,.0f} KiB)")
+
+    if args.apply:
+        print(f"  Applying to {bench_database_url()} in one transaction...")
+        apply_bundle(output)
+        print("  ✓ Applied")
+    print("\n" + "="*70 + "\n")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,336 @@
+#!/usr/bin/env python3
+"""
+Capacity Planner
+Projects row counts, heap size, index size and WAL volume of every table in
+the schema catalog over the coming years, from the platform's scale and
+per-table growth assumptions, and flags the tables that need partitioning or
+archival before they get there.
+
+Usage:
+    python capacity_planner.py                                   # defaults, 5 years
+    python capacity_planner.py --tenants 2000 --branches 10 --students 1500
+    python capacity_planner.py --table student_activity_log      # year by year
+    python capacity_planner.py --write-assumptions               # editable per-table growth
+    python capacity_planner.py --strict                          # CI: exit 1 on unpartitioned tables to split
+
+Assumptions (capacity-assumptions.json, created with --write-assumptions; a
+table missing from it falls back to the name-based defaults below):
+
+    {
+      "scale": {"tenants": 2000, "branches_per_tenant": 10, "students_per_branch": 1500,
+                "staff_per_branch": 120, "years": 5},
+      "tables": {
+        "student_activity_log": {"per": "student", "rows": 0, "rows_per_year": 200,
+                                 "updates_per_row_per_year": 0, "retention_years": null,
+                                 "widths": {"metadata": 400}}
+      }
+    }
+
+    per is the unit rows scale with (tenant, branch, student or staff); rows
+    exist from the start, rows_per_year are added every year and, with
+    retention_years, deleted again after that many years. widths overrides
+    the average bytes of a column.
+
+How sizes are estimated:
+    - Column widths from the declared types (the migrations and PHASE-01 specs,
+      generate_table_schema for generated tables): fixed-size types exactly,
+      VARCHAR(n) at a quarter of n, TEXT, JSONB and TSVECTOR at typical sizes.
+    - Heap: 24-byte tuple header plus the data, 4-byte line pointer, 8 kB pages;
+      tables with updates carry 20% dead-tuple bloat.
+    - Indexes: every CREATE INDEX and PRIMARY KEY/UNIQUE constraint. B-tree
+      leaves 90% full, GIN on a TSVECTOR at half the column, BRIN a few pages.
+    - WAL: one record per inserted row and index entry, one per (HOT) update,
+      per year. Full-page images after checkpoints come on top.
+"""
+
+import argparse
+import json
+import math
+import re
+from pathlib import Path
+
+from local_db import format_bytes
+from schema_catalog import build_catalog
+from spec_generators import SPECS_ROOT
+
+ASSUMPTIONS_PATH = SPECS_ROOT / "PERFORMANCE-TOOLS" / "capacity-assumptions.json"
+
+DEFAULT_SCALE = {
+    "tenants": 2000,
+    "branches_per_tenant": 10,
+    "students_per_branch": 1500,
+    "staff_per_branch": 120,
+    "years": 5,
+}
+
+# Name-based growth of tables without an assumption, first match wins
+DEFAULT_GROWTH = [
+    (r"^tenants$", {"per": "tenant", "rows": 1}),
+    (r"^branches$", {"per": "branch", "rows": 1}),
+    (r"^students$", {"per": "student", "rows": 1, "rows_per_year": 0.2, "updates_per_row_per_year": 2}),
+    (r"^(staff|teachers|employees|users)$", {"per": "staff", "rows": 1, "rows_per_year": 0.1, "updates_per_row_per_year": 2}),
+    (r"_(templates?|policies|settings|config|types?|categories)$", {"per": "tenant", "rows": 20, "rows_per_year": 2}),
+    (r"^(student_)?attendance$", {"per": "student", "rows_per_year": 200}),
+    (r"^(staff|employee)_attendance$", {"per": "staff", "rows_per_year": 250}),
+    (r"^(student|parent)_\w*_log$", {"per": "student", "rows_per_year": 200}),
+    (r"_(log|logs|history|trail|trails)$|audit", {"per": "staff", "rows_per_year": 200}),
+    (r"(notifications|messages|communications?)$", {"per": "student", "rows_per_year": 50}),
+    (r"(grades|marks|results|submissions)$", {"per": "student", "rows_per_year": 40, "updates_per_row_per_year": 1}),
+    (r"(payments|invoices|receipts|transactions)$", {"per": "student", "rows_per_year": 12, "updates_per_row_per_year": 2}),
+    (r".", {"per": "branch", "rows": 50, "rows_per_year": 100, "updates_per_row_per_year": 2}),
+]
+
+GROWTH_DEFAULTS = {"rows": 0, "rows_per_year": 0, "updates_per_row_per_year": 0, "retention_years": None, "widths": {}}
+
+# Average stored bytes per type; VARCHAR(n) and CHAR(n) are derived from n
+TYPE_WIDTHS = {
+    "UUID": 16, "BIGINT": 8, "BIGSERIAL": 8, "INTEGER": 4, "INT": 4, "SERIAL": 4, "SMALLINT": 2,
+    "BOOLEAN": 1, "DATE": 4, "TIMESTAMP": 8, "TIMESTAMPTZ": 8, "TIME": 8, "INTERVAL": 16,
+    "REAL": 4, "DOUBLE": 8, "DECIMAL": 8, "NUMERIC": 8, "MONEY": 8, "INET": 8,
+    "TEXT": 65, "JSONB": 160, "JSON": 160, "TSVECTOR": 120, "BYTEA": 256,
+}
+ARRAY_WIDTH = 64
+
+PAGE_BYTES = 8192
+PAGE_HEADER_BYTES = 24
+TUPLE_HEADER_BYTES = 24
+LINE_POINTER_BYTES = 4
+INDEX_TUPLE_HEADER_BYTES = 8
+BTREE_FILL = 0.9
+UPDATE_BLOAT = 0.2
+WAL_RECORD_BYTES = 50
+
+def column_width(definition, widths):
+    """Average stored bytes of a column definition"""
+    name, rest = definition.split(None, 1)
+    if name in widths:
+        return widths[name]
+    match = re.match(r"^(\w+)(?:\s+PRECISION)?(?:\s*\(\s*(\d+)[^)]*\))?(\[\])?", rest)
+    if not match:
+        return 16
+    sql_type, length, array = match.group(1).upper(), match.group(2), match.group(3)
+    if array:
+        return ARRAY_WIDTH
+    if sql_type in ("VARCHAR", "CHARACTER"):
+        return min(int(length or 255) // 4, 256) + 1
+    if sql_type == "CHAR":
+        return int(length or 1) + 1
+    return TYPE_WIDTHS.get(sql_type, 16)
+
+def align(size, to=8):
+    """size rounded up to a multiple of to"""
+    return (size + to - 1) // to * to
+
+def table_shape(entry, widths):
+    """(heap tuple bytes, {index name: (method, key bytes)}) of a catalog entry"""
+    columns = {name: column_width(definition, widths) for name, definition in entry['columns'].items()}
+    tuple_bytes = TUPLE_HEADER_BYTES + align(sum(columns.values())) + LINE_POINTER_BYTES
+    indexes = {}
+    for name, index in {**entry['constraint_indexes'], **entry['indexes']}.items():
+        keys = [column.split()[0].strip('"') for column in index['columns']]
+        indexes[name] = (index['method'], sum(columns.get(key, 16) for key in keys))
+    return tuple_bytes, indexes
+
+def units(scale):
+    """Rows-per-unit multipliers of the scale"""
+    branches = scale['tenants'] * scale['branches_per_tenant']
+    return {
+        "tenant": scale['tenants'],
+        "branch": branches,
+        "student": branches * scale['students_per_branch'],
+        "staff": branches * scale['staff_per_branch'],
+    }
+
+def growth_for(table_name, assumptions):
+    """Growth assumption of a table: the file's, else the first matching default"""
+    if table_name in assumptions.get('tables', {}):
+        return {**GROWTH_DEFAULTS, **assumptions['tables'][table_name]}
+    for pattern, growth in DEFAULT_GROWTH:
+        if re.search(pattern, table_name):
+            return {**GROWTH_DEFAULTS, **growth}
+    return dict(GROWTH_DEFAULTS)
+
+def index_bytes(method, key_bytes, rows, heap_pages):
+    """Estimated size of one index over rows"""
+    if rows <= 0:
+        return PAGE_BYTES
+    if method == "brin":
+        return PAGE_BYTES * (2 + math.ceil(heap_pages / 128 / 400))
+    if method == "gin":
+        return int(rows * key_bytes * 0.5) + PAGE_BYTES
+    entry = INDEX_TUPLE_HEADER_BYTES + align(key_bytes if method != "hash" else 4) + LINE_POINTER_BYTES
+    per_page = max(1, int((PAGE_BYTES - PAGE_HEADER_BYTES - 16) * BTREE_FILL / entry))
+    return math.ceil(math.ceil(rows / per_page) * 1.01 + 1) * PAGE_BYTES
+
+def project_table(entry, growth, scale):
+    """Year-by-year projection of one table: rows, heap, index, total bytes and WAL per year"""
+    multiplier = units(scale)[growth['per']]
+    tuple_bytes, indexes = table_shape(entry, growth['widths'])
+    per_page = max(1, (PAGE_BYTES - PAGE_HEADER_BYTES) // tuple_bytes)
+    bloat = 1 + UPDATE_BLOAT if growth['updates_per_row_per_year'] else 1
+    index_entry_bytes = sum(INDEX_TUPLE_HEADER_BYTES + align(key) for _, key in indexes.values())
+
+    years = []
+    for year in range(scale['years'] + 1):
+        kept_years = min(year, growth['retention_years']) if growth['retention_years'] is not None else year
+        rows = int(multiplier * (growth['rows'] + growth['rows_per_year'] * kept_years))
+        heap_pages = math.ceil(rows / per_page * bloat)
+        index_size = sum(index_bytes(method, key, rows, heap_pages) for method, key in indexes.values())
+        inserted = multiplier * growth['rows_per_year'] if year else multiplier * growth['rows']
+        wal = inserted * (tuple_bytes + WAL_RECORD_BYTES + len(indexes) * WAL_RECORD_BYTES + index_entry_bytes) \
+            + rows * growth['updates_per_row_per_year'] * (tuple_bytes + WAL_RECORD_BYTES)
+        years.append({
+            "year": year,
+            "rows": rows,
+            "heap": heap_pages * PAGE_BYTES,
+            "index": index_size,
+            "total": heap_pages * PAGE_BYTES + index_size,
+            "wal": int(wal),
+        })
+    return {"tuple_bytes": tuple_bytes, "indexes": len(indexes), "years": years}
+
+def flag_table(entry, growth, projection, args):
+    """(flag, year it applies from, advice) of a projected table, or None"""
+    def first_year(predicate):
+        return next((year['year'] for year in projection['years'] if predicate(year)), None)
+
+    partition_bytes = args.partition_gb * 1024 ** 3
+    partition_year = first_year(lambda year: year['total'] >= partition_bytes or year['rows'] >= args.partition_rows)
+    append_only = not growth['rows'] and not growth['updates_per_row_per_year']
+    if partition_year is not None and not entry['partitioned']:
+        if append_only and "created_at" in entry['columns']:
+            key = "RANGE (created_at), monthly"
+        elif "tenant_id" in entry['columns']:
+            key = "HASH (tenant_id)"
+        else:
+            key = "RANGE on its busiest key"
+        return "partition", partition_year, f"partition by {key}"
+    archive_year = first_year(lambda year: year['total'] >= args.archive_gb * 1024 ** 3)
+    if append_only and growth['retention_years'] is None and archive_year is not None:
+        return "archive", archive_year, "set retention_years and move older rows to archive storage"
+    if partition_year is not None:
+        return "partitioned", partition_year, "already partitioned: keep partitions ahead of time"
+    return None
+
+def load_assumptions(path):
+    """Assumption file contents, or empty assumptions when it does not exist"""
+    if not path.exists():
+        return {"scale": {}, "tables": {}}
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+def write_assumptions(path, scale, catalog, assumptions):
+    """Write every table's effective growth so it can be edited"""
+    tables = {}
+    for name in sorted(catalog):
+        table_name = name.split(".")[-1]
+        tables.setdefault(table_name, growth_for(table_name, assumptions))
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump({"scale": scale, "tables": tables}, f, indent=2, sort_keys=True)
+        f.write("\n")
+
+def main():
+    """Main capacity planning function"""
+    parser = argparse.ArgumentParser(description="Project table, index and WAL sizes from growth assumptions")
+    parser.add_argument("--assumptions", default=str(ASSUMPTIONS_PATH), help="growth assumption file")
+    parser.add_argument("--tenants", type=int, help="tenants on the platform")
+    parser.add_argument("--branches", type=int, help="branches per tenant")
+    parser.add_argument("--students", type=int, help="students per branch")
+    parser.add_argument("--staff", type=int, help="staff per branch")
+    parser.add_argument("--years", type=int, help="years projected")
+    parser.add_argument("--table", action="append", default=[], help="print this table's projection year by year")
+    parser.add_argument("--top", type=int, default=25, help="largest tables listed")
+    parser.add_argument("--partition-gb", type=float, default=32.0, help="table+index size that calls for partitioning")
+    parser.add_argument("--partition-rows", type=int, default=500000000, help="row count that calls for partitioning")
+    parser.add_argument("--archive-gb", type=float, default=8.0, help="append-only size that calls for archival")
+    parser.add_argument("--write-assumptions", action="store_true", help="write the effective assumptions and exit")
+    parser.add_argument("--strict", action="store_true", help="exit 1 when an unpartitioned table needs partitioning")
+    args = parser.parse_args()
+
+    assumptions_path = Path(args.assumptions)
+    assumptions = load_assumptions(assumptions_path)
+    scale = {**DEFAULT_SCALE, **assumptions.get('scale', {})}
+    for key, value in (("tenants", args.tenants), ("branches_per_tenant", args.branches),
+                       ("students_per_branch", args.students), ("staff_per_branch", args.staff),
+                       ("years", args.years)):
+        if value is not None:
+            scale[key] = value
+
+    catalog = build_catalog()
+    if args.write_assumptions:
+        write_assumptions(assumptions_path, scale, catalog, assumptions)
+        print(f"✓ Wrote {assumptions_path.name} ({len(catalog)} tables): edit it and re-run")
+        return
+
+    counts = units(scale)
+    print("\n" + "="*70)
+    print("  CAPACITY PLAN")
+    print(f"  {scale['tenants']:,} tenants x {scale['branches_per_tenant']} branches x "
+          f"{scale['students_per_branch']:,} students ({counts['student']:,} students, "
+          f"{counts['staff']:,} staff), {scale['years']} years")
+    print("="*70 + "\n")
+
+    plans = {}
+    for name, entry in sorted(catalog.items()):
+        growth = growth_for(name.split(".")[-1], assumptions)
+        projection = project_table(entry, growth, scale)
+        plans[name] = (entry, growth, projection, flag_table(entry, growth, projection, args))
+
+    for wanted in args.table:
+        name = wanted if "." in wanted else f"public.{wanted}"
+        if name not in plans:
+            raise SystemExit(f"{wanted}: not in the schema catalog")
+        entry, growth, projection, flag = plans[name]
+        print(f"{name} ({entry['spec'] or entry['source']})")
+        print(f"  {growth['per']}: {growth['rows']:g} rows + {growth['rows_per_year']:g}/year, "
+              f"{growth['updates_per_row_per_year']:g} updates/row/year, retention {growth['retention_years'] or '-'}; "
+              f"{projection['tuple_bytes']} bytes/row, {projection['indexes']} indexes")
+        print(f"  {'year':>4} {'rows':>16} {'heap':>10} {'indexes':>10} {'total':>10} {'per tenant':>11} {'WAL/year':>10}")
+        for year in projection['years']:
+            print(f"  {year['year']:>4} {year['rows']:>16,} {format_bytes(year['heap']):>10} "
+                  f"{format_bytes(year['index']):>10} {format_bytes(year['total']):>10} "
+                  f"{format_bytes(year['total'] / scale['tenants']):>11} {format_bytes(year['wal']):>10}")
+        if flag:
+            print(f"  ⚠️  {flag[0]} from year {flag[1]}: {flag[2]}")
+        print()
+
+    horizon = scale['years']
+    largest = sorted(plans.items(), key=lambda item: -item[1][2]['years'][horizon]['total'])
+    print(f"Largest tables after {horizon} years:")
+    print(f"{'table':36} {'rows':>15} {'heap':>10} {'indexes':>10} {'per tenant':>11} {'WAL/year':>10}  flag")
+    print("-" * 110)
+    for name, (entry, growth, projection, flag) in largest[:args.top]:
+        year = projection['years'][horizon]
+        print(f"{name.split('.')[-1][:36]:36} {year['rows']:>15,} {format_bytes(year['heap']):>10} "
+              f"{format_bytes(year['index']):>10} {format_bytes(year['total'] / scale['tenants']):>11} "
+              f"{format_bytes(year['wal']):>10}  {flag[0] if flag else ''}")
+
+    print(f"\n{'year':>4} {'rows':>18} {'heap':>10} {'indexes':>10} {'total':>10} {'WAL/year':>10}")
+    for year in range(horizon + 1):
+        totals = [projection['years'][year] for _, _, projection, _ in plans.values()]
+        print(f"{year:>4} {sum(t['rows'] for t in totals):>18,} {format_bytes(sum(t['heap'] for t in totals)):>10} "
+              f"{format_bytes(sum(t['index'] for t in totals)):>10} {format_bytes(sum(t['total'] for t in totals)):>10} "
+              f"{format_bytes(sum(t['wal'] for t in totals)):>10}")
+
+    flagged = sorted(((flag[1], -projection['years'][horizon]['total'], name, flag)
+                      for name, (_, _, projection, flag) in plans.items() if flag))
+    to_partition = [name for _, _, name, flag in flagged if flag[0] == "partition"]
+    kinds = {}
+    for _, _, _, (kind, _, _) in flagged:
+        kinds[kind] = kinds.get(kind, 0) + 1
+    print()
+    if flagged:
+        print(f"Flagged, soonest first: {', '.join(f'{count} {kind}' for kind, count in sorted(kinds.items()))}")
+    for _, _, name, (kind, year, advice) in flagged[:args.top]:
+        marker = "✅" if kind == "partitioned" else "❌" if kind == "partition" else "⚠️ "
+        print(f"{marker} {name.split('.')[-1]}: {kind} from year {year} - {advice}")
+    if len(flagged) > args.top:
+        print(f"   ... and {len(flagged) - args.top} more (--top)")
+    if not flagged:
+        print(f"✅ No table reaches {args.partition_gb:g} GB or {args.archive_gb:g} GB append-only in {horizon} years")
+    print("\n" + "="*70 + "\n")
+    if args.strict and to_partition:
+        raise SystemExit(1)
+
+if __name__ == "__main__":
+    main()
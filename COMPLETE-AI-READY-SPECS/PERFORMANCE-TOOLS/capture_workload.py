@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+"""
+Workload Capture
+Records the parameterized query stream of production (or staging) traffic,
+per session and tenant, into a workload file that replay_workload.py re-runs
+on the local benchmark database and whatif_indexes.py plans indexes against.
+
+Usage:
+    python capture_workload.py --log postgresql.json                      # jsonlog
+    python capture_workload.py --log postgresql.csv --output workload.jsonl.gz
+    python capture_workload.py --log postgresql.json --tenant 8d0e... --tenant 41aa...
+    python capture_workload.py --log postgresql.json --statements --database-url "$REPLICA_URL"
+
+Logging the stream (on the server being captured, for the capture window):
+
+    log_destination = 'jsonlog'            # or 'csvlog'; logging_collector = on
+    log_min_duration_statement = 0         # every statement, with its duration
+    log_parameter_max_length = -1          # full bind parameters
+
+What it does:
+    1. Reads every "execute" and "statement" entry of the csvlog/jsonlog
+       files: the query text as sent ($1, $2, ... placeholders kept), its bind
+       parameters, duration, session and time.
+    2. Attributes each query to a tenant: the value bound to a
+       "tenant_id = $n" predicate, else the tenant the session last set in
+       request.jwt.claims, app.current_tenant_id or auth.set_tenant_context().
+       Those context statements stay in the stream, so the replay runs every
+       query under the same context. --tenant keeps only the given tenants.
+    3. --statements adds the pg_stat_statements queries of --database-url the
+       logs did not cover, as aggregated lines (calls, mean time, no
+       parameters): whatif_indexes.py plans them generically, the replay
+       skips them.
+    4. Writes one JSON line per query (gzip when the file ends in .gz):
+
+       {"query": "...", "params": ["..."], "calls": 1, "at": 12.034,
+        "session": "65f1a2b3.1c2d", "tenant": "8d0e...", "ms": 3.21}
+
+       at is seconds since the first captured query; ms the captured duration.
+"""
+
+import argparse
+import csv
+import json
+import re
+import sys
+from datetime import datetime
+
+from local_db import query_json, bench_database_url
+from whatif_indexes import WORKLOAD_PATH, open_text
+
+MESSAGE_PATTERN = re.compile(r"^(?:duration: ([\d.]+) ms\s+)?(?:execute [^:]*|statement): (.*)$", re.S)
+PARAMETER_PATTERN = re.compile(r"\$(\d+) = (NULL|'((?:[^']|'')*)')")
+TENANT_PREDICATE = re.compile(r"\btenant_id\s*=\s*\$(\d+)", re.I)
+CLAIMS_CONTEXT = re.compile(r"set_config\(\s*'request\.jwt\.claims'\s*,\s*(?:\$(\d+)|'((?:[^']|'')*)')", re.I)
+TENANT_CONTEXT = re.compile(
+    r"(?:set_config\(\s*'app\.current_tenant_id'\s*,|auth\.set_tenant_context\()\s*(?:\$(\d+)|'((?:[^']|'')*)')", re.I)
+CSVLOG_FIELDS = {"log_time": 0, "session_id": 5, "error_severity": 11, "message": 13, "detail": 14}
+
+def log_records(path):
+    """(time, session, severity, message, detail) of every entry of a csvlog or jsonlog file"""
+    csv.field_size_limit(sys.maxsize)
+    with open_text(path) as f:
+        if ".csv" in path:
+            for row in csv.reader(f):
+                if len(row) > CSVLOG_FIELDS["detail"]:
+                    yield tuple(row[CSVLOG_FIELDS[field]] for field in
+                                ("log_time", "session_id", "error_severity", "message", "detail"))
+            return
+        for line in f:
+            line = line.strip()
+            if line:
+                entry = json.loads(line)
+                yield (entry.get("timestamp", ""), entry.get("session_id", ""), entry.get("error_severity", ""),
+                       entry.get("message", ""), entry.get("detail", ""))
+
+def log_time(text):
+    """Seconds since the epoch of a log timestamp, its zone ignored"""
+    return datetime.strptime(text[:23], "%Y-%m-%d %H:%M:%S.%f").timestamp()
+
+def parameters(detail):
+    """Bind parameter values of a "parameters: $1 = '...'" detail, as strings"""
+    values = {}
+    for match in PARAMETER_PATTERN.finditer(detail or ""):
+        values[int(match.group(1))] = None if match.group(2) == "NULL" else match.group(3).replace("''", "'")
+    return [values.get(position) for position in range(1, max(values, default=0) + 1)]
+
+def bound_value(match, params):
+    """Value of a $n or '...' literal captured by a context pattern"""
+    if match.group(1):
+        position = int(match.group(1))
+        return params[position - 1] if position <= len(params) else None
+    return match.group(2).replace("''", "'")
+
+def query_tenant(query, params, context):
+    """Tenant a query runs for: its tenant_id parameter, else the session context"""
+    match = TENANT_PREDICATE.search(query)
+    if match and int(match.group(1)) <= len(params) and params[int(match.group(1)) - 1]:
+        return params[int(match.group(1)) - 1]
+    match = CLAIMS_CONTEXT.search(query)
+    if match:
+        try:
+            context["tenant"] = json.loads(bound_value(match, params) or "{}").get("tenant_id")
+        except ValueError:
+            context["tenant"] = None
+    match = TENANT_CONTEXT.search(query)
+    if match:
+        context["tenant"] = bound_value(match, params)
+    return context.get("tenant")
+
+def capture_logs(paths):
+    """Workload lines of every logged execution, in time order"""
+    executions = []
+    for path in paths:
+        for time_text, session, severity, message, detail in log_records(path):
+            if severity not in ("LOG", ""):
+                continue
+            match = MESSAGE_PATTERN.match(message)
+            if not match:
+                continue
+            executions.append((log_time(time_text), session, match.group(2).strip(), parameters(detail),
+                               float(match.group(1)) if match.group(1) else None))
+    executions.sort(key=lambda execution: execution[0])
+
+    contexts = {}
+    lines = []
+    started = executions[0][0] if executions else 0.0
+    for at, session, query, params, duration in executions:
+        line = {"query": query, "params": params, "calls": 1, "at": round(at - started, 3),
+                "session": session, "tenant": query_tenant(query, params, contexts.setdefault(session, {}))}
+        if duration is not None:
+            line["ms"] = duration
+        lines.append(line)
+    return lines
+
+def capture_statements(database_url, covered):
+    """Aggregated lines of the pg_stat_statements queries the logs did not cover"""
+    rows = query_json("""
+        SELECT query, calls, ROUND(mean_exec_time::numeric, 3) AS mean_ms
+        FROM pg_stat_statements
+        WHERE dbid = (SELECT oid FROM pg_database WHERE datname = current_database())
+          AND query ~* '^\\s*(SELECT|WITH|INSERT|UPDATE|DELETE)\\s'
+        ORDER BY total_exec_time DESC
+    """, database_url)
+    return [{"query": row['query'], "params": [], "calls": row['calls'], "ms": float(row['mean_ms'])}
+            for row in rows if " ".join(row['query'].split()) not in covered]
+
+def main():
+    """Main capture function"""
+    parser = argparse.ArgumentParser(description="Capture a per-tenant query workload from Postgres logs")
+    parser.add_argument("--log", action="append", default=[], help="csvlog (.csv) or jsonlog file, .gz allowed")
+    parser.add_argument("--statements", action="store_true", help="add pg_stat_statements queries the logs missed")
+    parser.add_argument("--database-url", default=None, help="database of pg_stat_statements (default: bench)")
+    parser.add_argument("--tenant", action="append", default=[], help="keep only this tenant's queries")
+    parser.add_argument("--output", default=str(WORKLOAD_PATH), help="workload file to write (.gz to compress)")
+    args = parser.parse_args()
+
+    print("\n" + "="*70)
+    print("  WORKLOAD CAPTURE")
+    print("="*70 + "\n")
+
+    if not args.log and not args.statements:
+        parser.error("give --log files, --statements or both")
+
+    lines = capture_logs(args.log)
+    print(f"Logs: {len(lines):,} executions in {len({line['session'] for line in lines}):,} sessions "
+          f"over {lines[-1]['at'] if lines else 0:,.1f}s")
+    if args.tenant:
+        wanted = set(args.tenant)
+        sessions = {line['session'] for line in lines if line['tenant'] in wanted}
+        # Context statements (no tenant yet) of the kept sessions stay in the stream
+        lines = [line for line in lines if line['tenant'] in wanted
+                 or (line['tenant'] is None and line['session'] in sessions)]
+        print(f"  {len(lines):,} kept for {len(wanted)} tenant(s)")
+    if args.statements:
+        covered = {" ".join(line['query'].split()) for line in lines}
+        aggregated = capture_statements(args.database_url or bench_database_url(), covered)
+        print(f"pg_stat_statements: {len(aggregated):,} queries not in the logs "
+              f"({sum(line['calls'] for line in aggregated):,} calls)")
+        lines += aggregated
+
+    tenants = {}
+    for line in lines:
+        tenants[line.get('tenant')] = tenants.get(line.get('tenant'), 0) + line['calls']
+    print(f"\n{'tenant':40} {'calls':>12}")
+    print("-" * 53)
+    for tenant, calls in sorted(tenants.items(), key=lambda item: -item[1])[:20]:
+        print(f"{tenant or '(none)':40} {calls:>12,}")
+
+    with open_text(args.output, "w") as f:
+        for line in lines:
+            f.write(json.dumps(line, separators=(",", ":")) + "\n")
+    print(f"\n✓ Wrote {len(lines):,} workload lines to {args.output}")
+    print("\n" + "="*70 + "\n")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Performance Budget Checker
+Compares measured benchmark results against performance-budgets.json and
+exits non-zero when any spec blew any budget.
+
+Usage:
+    BENCH_RESULTS_FILE=bench-results.jsonl npx vitest run --config vitest.bench.config.ts
+    python compile_budgets.py
+    python check_budgets.py bench-results.jsonl
+    python check_budgets.py bench-results.jsonl --budgets other-budgets.json
+
+Results are JSON lines, as written by the generated benches (specBudgets in
+tests/bench/budget.ts):
+
+    {"spec": "PHASE-08-SUPPORT-STAFF/01-FRONT-DESK-PORTAL/SPEC-380",
+     "metric": "page_load", "label": "getAll() first page",
+     "runs": 30, "p50_ms": 41.2, "p95_ms": 87.9, "max_ms": 120.4}
+
+Several results may share one budget (every read of a spec is held to its
+page_load budget); each is checked on its own.
+"""
+
+import argparse
+import json
+import sys
+
+from compile_budgets import BUDGETS_PATH, load_budgets
+
+def load_results(path):
+    """Read benchmark results, one JSON object per line"""
+    results = []
+    with open(path, 'r', encoding='utf-8') as f:
+        for number, line in enumerate(f, 1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                results.append(json.loads(line))
+            except json.JSONDecodeError as error:
+                raise SystemExit(f"{path}:{number}: not a JSON result line ({error})")
+    return results
+
+def check_results(results, budgets):
+    """Split results into (over budget, within budget, without a budget) rows"""
+    over, within, unbudgeted = [], [], []
+    for result in results:
+        budget = budgets.get(result['spec'], {}).get(result['metric'])
+        if budget is None:
+            unbudgeted.append((result, None, None))
+            continue
+        measured = result.get(f"p{budget['percentile']}_ms")
+        if measured is None:
+            unbudgeted.append((result, budget, None))
+        elif measured >= budget['max_ms']:
+            over.append((result, budget, measured))
+        else:
+            within.append((result, budget, measured))
+    return over, within, unbudgeted
+
+def print_rows(title, rows):
+    """Print one section of the report"""
+    if not rows:
+        return
+    print(f"\n{title} ({len(rows)})")
+    print("-" * 110)
+    for result, budget, measured in rows:
+        label = f"{result['metric']} / {result.get('label', '')}"
+        if measured is None:
+            reason = "no budget" if budget is None else f"no p{budget['percentile']} measured"
+            print(f"  {result['spec']:58} {label:36} {reason}")
+        else:
+            print(f"  {result['spec']:58} {label:36} p{budget['percentile']} "
+                  f"{measured:,.1f}ms / {budget['max_ms']:,}ms")
+
+def main():
+    """Main checker function"""
+    parser = argparse.ArgumentParser(description="Check benchmark results against the compiled budgets")
+    parser.add_argument("results", help="JSON lines written via BENCH_RESULTS_FILE")
+    parser.add_argument("--budgets", default=str(BUDGETS_PATH), help="compiled budget file")
+    parser.add_argument("--strict", action="store_true", help="also fail on results without a budget")
+    args = parser.parse_args()
+
+    try:
+        budgets = load_budgets(args.budgets)
+    except FileNotFoundError:
+        raise SystemExit(f"{args.budgets} not found - run compile_budgets.py first")
+
+    results = load_results(args.results)
+    over, within, unbudgeted = check_results(results, budgets)
+
+    print("\n" + "="*70)
+    print("  PERFORMANCE BUDGET CHECK")
+    print(f"  {len(results)} results against {sum(len(b) for b in budgets.values())} budgets")
+    print("="*70)
+
+    print_rows("❌ OVER BUDGET", over)
+    print_rows("⚠️  NO BUDGET", unbudgeted)
+    print_rows("✅ WITHIN BUDGET", within)
+
+    failed = bool(over) or (args.strict and bool(unbudgeted))
+    print(f"\n{len(over)} over, {len(within)} within, {len(unbudgeted)} without a budget")
+    print("="*70 + "\n")
+    sys.exit(1 if failed else 0)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""
+Performance Budget Compiler
+Collects the latency targets written as prose across the spec markdown into
+one structured budget file, keyed by spec and metric.
+
+Usage:
+    python compile_budgets.py                  # writes performance-budgets.json
+    python compile_budgets.py --phase PHASE-08-SUPPORT-STAFF --print
+
+Spec keys are "<phase>/<portal>/SPEC-<id>" (the spec file's folder plus its
+ID): IDs repeat across phases (Phase 9 and Phase 10 both start at SPEC-401)
+and even across portals of one phase. Recognised budget lines:
+
+    - **Page Load**: < 2 seconds
+    - API response < 500ms
+    - **API Response Time**: < 200ms (p95)
+    - [ ] Performance optimized (<2s load time)
+
+Targets without a time unit (error rates, scores, coverage) are skipped. A
+metric stated twice in one spec keeps its tightest budget. Budgets without an
+explicit percentile are p95, which is what the generated benches report.
+"""
+
+import argparse
+import json
+import re
+
+from spec_generators import SPECS_ROOT
+
+BUDGETS_PATH = SPECS_ROOT / "PERFORMANCE-TOOLS" / "performance-budgets.json"
+
+DEFAULT_PERCENTILE = 95
+
+UNIT_MS = {
+    "ms": 1, "millisecond": 1, "milliseconds": 1,
+    "s": 1000, "second": 1000, "seconds": 1000,
+    "minute": 60000, "minutes": 60000,
+    "hour": 3600000, "hours": 3600000,
+}
+
+# Different wordings of the same measurement across phases
+METRIC_ALIASES = {
+    "load": "page_load",
+    "response": "api_response",
+}
+
+_UNIT = r"(?P<unit>" + "|".join(sorted(UNIT_MS, key=len, reverse=True)) + r")\b"
+
+# - **Label**: < 200ms (p95)   /   - Label < 2 seconds
+BULLET_BUDGET = re.compile(
+    r"^\s*- (?:\*\*)?(?P<label>[A-Za-z][^:<*]*?)(?:\*\*)?:?\s*<\s*(?P<value>\d+(?:\.\d+)?)\s*" + _UNIT + r"(?P<rest>.*)$"
+)
+
+# - [ ] Performance optimized (<2s load time)
+CHECKBOX_BUDGET = re.compile(
+    r"^\s*- \[[ x]\] .*\(\s*<\s*(?P<value>\d+(?:\.\d+)?)\s*" + _UNIT + r"\s+(?P<label>[^)]+)\)"
+)
+
+PERCENTILE = re.compile(r"\bp(\d{2})\b")
+
+def metric_name(label):
+    """Normalise a budget label: 'API Response Time (p95)' -> 'api_response'"""
+    label = re.sub(r"\([^)]*\)", "", label).strip().lower()
+    name = re.sub(r"[^a-z0-9]+", "_", label).strip("_")
+    if name.endswith("_time") and name != "time":
+        name = name[:-len("_time")]
+    return METRIC_ALIASES.get(name, name)
+
+def parse_budget_line(line):
+    """(metric, budget) for one markdown line, or None"""
+    match = CHECKBOX_BUDGET.match(line) or BULLET_BUDGET.match(line)
+    if not match:
+        return None
+    percentile = PERCENTILE.search(line)
+    max_ms = float(match.group('value')) * UNIT_MS[match.group('unit')]
+    return metric_name(match.group('label')), {
+        "max_ms": int(max_ms) if max_ms.is_integer() else max_ms,
+        "percentile": int(percentile.group(1)) if percentile else DEFAULT_PERCENTILE,
+        "source": line.strip(),
+    }
+
+def spec_key(spec_path):
+    """'<phase>/<portal>/SPEC-<id>' for a spec markdown file"""
+    match = re.match(r"SPEC-\d+", spec_path.name)
+    name = match.group(0) if match else spec_path.stem
+    return str(spec_path.parent.relative_to(SPECS_ROOT) / name).replace("\\", "/")
+
+def compile_spec(spec_path):
+    """Budgets of one spec file, {metric: budget}"""
+    budgets = {}
+    in_code_block = False
+    with open(spec_path, 'r', encoding='utf-8') as f:
+        for line in f:
+            if line.lstrip().startswith("```"):
+                in_code_block = not in_code_block
+                continue
+            parsed = None if in_code_block else parse_budget_line(line)
+            if not parsed:
+                continue
+            metric, budget = parsed
+            if metric not in budgets or budget['max_ms'] < budgets[metric]['max_ms']:
+                budgets[metric] = budget
+    return budgets
+
+def compile_budgets(phases=None):
+    """Budgets of every spec with at least one, {spec key: {metric: budget}}"""
+    compiled = {}
+    for phase_dir in sorted(SPECS_ROOT.glob("PHASE-*")):
+        if phases and phase_dir.name not in phases:
+            continue
+        for spec_path in sorted(phase_dir.rglob("SPEC-*.md")):
+            budgets = compile_spec(spec_path)
+            if budgets:
+                compiled[spec_key(spec_path)] = budgets
+    return compiled
+
+def load_budgets(path=BUDGETS_PATH):
+    """Read a compiled budget file"""
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)['budgets']
+
+def print_budgets(compiled):
+    """Print one line per spec and metric"""
+    print(f"{'spec':62} {'metric':28} {'budget':>16}")
+    print("-" * 108)
+    for key, budgets in compiled.items():
+        for metric, budget in sorted(budgets.items()):
+            shown = f"p{budget['percentile']} {budget['max_ms']:,}ms"
+            print(f"{key:62} {metric:28} {shown:>16}")
+
+def main():
+    """Main compiler function"""
+    parser = argparse.ArgumentParser(description="Compile the spec performance budgets into one file")
+    parser.add_argument("--phase", action="append", help="only this phase folder (repeatable)")
+    parser.add_argument("--output", default=str(BUDGETS_PATH), help="budget file to write")
+    parser.add_argument("--print", action="store_true", help="print the budgets instead of writing them")
+    args = parser.parse_args()
+
+    compiled = compile_budgets(args.phase)
+    if args.print:
+        print_budgets(compiled)
+        return
+
+    metrics = sorted({metric for budgets in compiled.values() for metric in budgets})
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump({"metrics": metrics, "budgets": compiled}, f, indent=2, sort_keys=True, ensure_ascii=False)
+        f.write("\n")
+
+    print(f"\n  ✓ {sum(len(b) for b in compiled.values())} budgets across {len(compiled)} specs -> {args.output}")
+    print(f"  Metrics: {', '.join(metrics)}\n")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+"""
+Index Advisor Feedback Loop
+Runs the SPEC-034 index advisor on the local benchmark database, maps each
+recommendation to the spec that owns the table, and feeds the ones the
+measured load backs into the phase generators' index output.
+
+Usage:
+    python index_advisor.py                               # recommendations per owning spec
+    python index_advisor.py --write-feedback              # accept the measured ones
+    python index_advisor.py --accept idx_a --reject idx_b --write-feedback
+    python index_advisor.py --min-seq-scans 20 --min-rows 5000
+
+What it does:
+    1. Calls performance.suggest_missing_indexes() on the database the schema
+       bundle was applied to (build_schema_bundle.py --apply) and the
+       benchmarks have exercised, so pg_stat_user_tables holds real load.
+    2. Looks every recommended table up in the schema catalog: generated
+       tables go back to their phase generator, PHASE-01 tables are listed
+       for a change to their spec by hand.
+    3. Accepts a recommendation on a generated table when the statistics back
+       it: foreign key columns of tables with at least --min-rows rows, other
+       columns of tables with at least --min-seq-scans sequential scans over
+       --min-rows rows. --accept and --reject override by index name.
+    4. --write-feedback stores the accepted indexes in index-feedback.json
+       under advisor_indexes. The generators emit them for the table from then
+       on (re-run generate_all_specs.py; the schema bundle picks them up
+       directly), so the generated schemas converge on the measured needs.
+"""
+
+import argparse
+import json
+import re
+
+from build_schema_bundle import IDENTIFIER, QUALIFIED, qualify, split_top_level, unquote
+from local_db import query_json, query_value, sql_literal, bench_database_url
+from schema_catalog import build_catalog, leading_index
+from spec_generators import SPECS_ROOT
+
+FEEDBACK_PATH = SPECS_ROOT / "PERFORMANCE-TOOLS" / "index-feedback.json"
+
+SUGGESTION_PATTERN = re.compile(rf"^CREATE\s+INDEX\s+({IDENTIFIER})\s+ON\s+({QUALIFIED})\s*\((.*)\)\s*$", re.I | re.S)
+
+def advisor_recommendations(schema):
+    """Rows of performance.suggest_missing_indexes() with the index parsed"""
+    recommendations = []
+    for row in query_json(f"SELECT * FROM performance.suggest_missing_indexes({sql_literal(schema)})"):
+        match = SUGGESTION_PATTERN.match(row['suggested_index'].strip())
+        if not match:
+            continue
+        recommendations.append({
+            "table": qualify(match.group(2), schema),
+            "index": unquote(match.group(1)),
+            "columns": [unquote(column) for column in split_top_level(match.group(3))],
+            "reason": row['reason'],
+            "benefit": row['estimated_benefit'].split()[0],
+        })
+    return recommendations
+
+def table_statistics(schema):
+    """{schema.table: pg_stat_user_tables counters}"""
+    return {f"{schema}.{row['relname']}": row for row in query_json(f"""
+        SELECT relname, n_live_tup, seq_scan, seq_tup_read, COALESCE(idx_scan, 0) AS idx_scan
+        FROM pg_stat_user_tables
+        WHERE schemaname = {sql_literal(schema)}
+    """)}
+
+def judge(recommendation, entry, stats, args):
+    """(status, note) of one recommendation: accepted, rejected, manual or existing"""
+    name = recommendation['index']
+    if entry is None:
+        return "manual", "table not in the schema catalog"
+    if not entry['generated']:
+        return "manual", f"owned by {entry['source']}: change the spec by hand"
+    existing = leading_index(entry, recommendation['columns'][0])
+    if existing:
+        return "existing", f"the generator already emits {existing}: rebuild the bundle"
+    if name in args.reject:
+        return "rejected", "rejected by hand"
+    if name in args.accept:
+        return "accepted", "accepted by hand"
+
+    rows = int(stats.get('n_live_tup') or 0)
+    seq_scans = int(stats.get('seq_scan') or 0)
+    if recommendation['benefit'] == "High":
+        if rows >= args.min_rows:
+            return "accepted", f"foreign key on {rows:,} rows"
+        return "rejected", f"foreign key on only {rows:,} rows"
+    if seq_scans >= args.min_seq_scans and rows >= args.min_rows:
+        return "accepted", f"{seq_scans:,} sequential scans over {rows:,} rows"
+    return "rejected", f"not enough measured load ({seq_scans:,} sequential scans, {rows:,} rows)"
+
+def write_feedback(accepted, rejected_names):
+    """Merge accepted indexes into the generators' index feedback file"""
+    feedback = {}
+    if FEEDBACK_PATH.exists():
+        with open(FEEDBACK_PATH, 'r', encoding='utf-8') as f:
+            feedback = json.load(f)
+    advisor = feedback.setdefault('advisor_indexes', {})
+    for table_name in list(advisor):
+        advisor[table_name] = [index for index in advisor[table_name] if index['name'] not in rejected_names]
+    for recommendation, entry in accepted:
+        table_name = recommendation['table'].split('.')[-1]
+        indexes = {index['name']: index for index in advisor.get(table_name, [])}
+        indexes[recommendation['index']] = {
+            "name": recommendation['index'],
+            "columns": recommendation['columns'],
+            "reason": recommendation['reason'],
+            "spec": entry['spec'],
+        }
+        advisor[table_name] = [indexes[name] for name in sorted(indexes)]
+    feedback['advisor_indexes'] = {table: indexes for table, indexes in sorted(advisor.items()) if indexes}
+    with open(FEEDBACK_PATH, 'w', encoding='utf-8') as f:
+        json.dump(feedback, f, indent=2, sort_keys=True)
+        f.write("\n")
+
+def main():
+    """Main advisor function"""
+    parser = argparse.ArgumentParser(description="Feed index advisor recommendations back into the generators")
+    parser.add_argument("--schema", default="public", help="schema the advisor inspects")
+    parser.add_argument("--min-rows", type=int, default=10000, help="live rows a table needs before an index pays off")
+    parser.add_argument("--min-seq-scans", type=int, default=50, help="sequential scans that show a missing index")
+    parser.add_argument("--accept", nargs="*", default=[], help="index names to accept regardless of the statistics")
+    parser.add_argument("--reject", nargs="*", default=[], help="index names to reject (and drop from the feedback)")
+    parser.add_argument("--write-feedback", action="store_true", help="store accepted indexes for the generators")
+    args = parser.parse_args()
+
+    print("\n" + "="*70)
+    print("  INDEX ADVISOR FEEDBACK")
+    print(f"  Database: {bench_database_url()}")
+    print("="*70 + "\n")
+
+    if query_value("SELECT to_regproc('performance.suggest_missing_indexes') IS NOT NULL") != "t":
+        print("❌ performance.suggest_missing_indexes() not found: run python build_schema_bundle.py --apply first")
+        raise SystemExit(1)
+
+    catalog = build_catalog()
+    statistics = table_statistics(args.schema)
+    recommendations = advisor_recommendations(args.schema)
+    print(f"{len(recommendations)} recommendations for {len({r['table'] for r in recommendations})} tables "
+          f"({len(catalog)} tables in the schema catalog)\n")
+
+    judged = {"accepted": [], "rejected": [], "manual": [], "existing": []}
+    print(f"{'index':44} {'owner':22} {'status':9} note")
+    print("-" * 110)
+    for recommendation in sorted(recommendations, key=lambda r: (r['table'], r['index'])):
+        entry = catalog.get(recommendation['table'])
+        status, note = judge(recommendation, entry, statistics.get(recommendation['table'], {}), args)
+        judged[status].append((recommendation, entry))
+        owner = (entry['spec'] or entry['phase']) if entry else "-"
+        print(f"{recommendation['index']:44} {owner:22} {status:9} {note}")
+
+    print(f"\n{len(judged['accepted'])} accepted, {len(judged['rejected'])} rejected, "
+          f"{len(judged['manual'])} for a PHASE-01 spec change, {len(judged['existing'])} already generated")
+    by_phase = {}
+    for recommendation, entry in judged['accepted']:
+        by_phase.setdefault(entry['phase'], []).append(recommendation['index'])
+    for phase, names in sorted(by_phase.items()):
+        print(f"  {phase}: {', '.join(sorted(names))}")
+
+    if args.write_feedback:
+        write_feedback(judged['accepted'], set(args.reject))
+        print(f"\n✓ Wrote {FEEDBACK_PATH.name}: re-run the phase generators to emit the accepted indexes")
+    elif judged['accepted']:
+        print("\nRe-run with --write-feedback to hand the accepted indexes to the generators")
+    print("\n" + "="*70 + "\n")
+
+if __name__ == "__main__":
+    main()
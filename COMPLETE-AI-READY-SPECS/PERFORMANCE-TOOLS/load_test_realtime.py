@@ -0,0 +1,302 @@
+#!/usr/bin/env python3
+"""
+Realtime Fan-out Load Test
+Measures what committed changes cost when thousands of clients hold Realtime
+subscriptions, with and without the server-side filter that the generated
+subscribeToChanges() helpers send.
+
+Usage:
+    ulimit -n 20000
+    BENCH_SUPABASE_ANON_KEY=... python load_test_realtime.py      # 10k clients, both modes
+    python load_test_realtime.py --clients 2000 --mode unfiltered
+    python load_test_realtime.py --changes 500 --rate 50 --branches 20
+
+Modes:
+    filtered     every client subscribes with branch_id=eq.<its branch>, like
+                 the generated helpers
+    unfiltered   every client subscribes to the whole table and drops other
+                 branches' rows itself (a naive channel)
+
+Each client is a bare websocket speaking the Realtime (Phoenix) protocol, so
+one Python process can hold 10k of them. The scratch table lives in its own
+schema and is in the supabase_realtime publication only for the run. Rows
+carry their commit-time clock, so delivery latency is measured end to end
+(the local stack shares the host clock). Watch `docker stats` for the
+Realtime container's CPU while a run is in progress.
+"""
+
+import argparse
+import asyncio
+import base64
+import json
+import os
+import struct
+import time
+import urllib.parse
+
+from local_db import psql, percentile, bench_database_url
+
+SCRATCH_SCHEMA = "perf_realtime"
+SCRATCH_TABLE = f"{SCRATCH_SCHEMA}.events"
+DEFAULT_SUPABASE_URL = "http://localhost:54321"
+HEARTBEAT_SECONDS = 25
+JOIN_TIMEOUT_SECONDS = 120
+
+def realtime_url():
+    """Websocket URL of the local Realtime server"""
+    anon_key = os.environ.get("BENCH_SUPABASE_ANON_KEY")
+    if not anon_key:
+        raise SystemExit("BENCH_SUPABASE_ANON_KEY is not set - `supabase status` prints the local anon key")
+    base = os.environ.get("BENCH_SUPABASE_URL", DEFAULT_SUPABASE_URL).replace("http", "ws", 1)
+    return f"{base}/realtime/v1/websocket?apikey={anon_key}&vsn=1.0.0", anon_key
+
+def branch_id(index):
+    """Deterministic branch UUID"""
+    return f"00000000-0000-0000-0001-{index:012d}"
+
+def seed_scratch_table():
+    """Create the scratch table and publish its changes"""
+    psql(f"""
+        DROP SCHEMA IF EXISTS {SCRATCH_SCHEMA} CASCADE;
+        CREATE SCHEMA {SCRATCH_SCHEMA};
+        CREATE TABLE {SCRATCH_TABLE} (
+          id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+          branch_id UUID NOT NULL,
+          name VARCHAR(255),
+          sent_at_ms DOUBLE PRECISION DEFAULT extract(epoch FROM clock_timestamp()) * 1000
+        );
+        GRANT USAGE ON SCHEMA {SCRATCH_SCHEMA} TO anon;
+        GRANT SELECT ON {SCRATCH_TABLE} TO anon;
+        ALTER PUBLICATION supabase_realtime ADD TABLE {SCRATCH_TABLE};
+    """)
+
+def drop_scratch_table():
+    """Remove the scratch table from the publication and drop it"""
+    psql(f"""
+        ALTER PUBLICATION supabase_realtime DROP TABLE {SCRATCH_TABLE};
+        DROP SCHEMA IF EXISTS {SCRATCH_SCHEMA} CASCADE;
+    """)
+
+def produce_changes(changes, rate, branches):
+    """Insert rows one transaction at a time at roughly `rate` per second"""
+    psql(f"""
+        DO $$
+        BEGIN
+          FOR i IN 1..{changes} LOOP
+            INSERT INTO {SCRATCH_TABLE} (branch_id, name)
+            VALUES (('00000000-0000-0000-0001-' || lpad((i % {branches})::text, 12, '0'))::uuid, 'change ' || i);
+            COMMIT;
+            PERFORM pg_sleep({1.0 / rate});
+          END LOOP;
+        END $$;
+    """)
+
+# --- minimal websocket client (RFC 6455, text frames only) -------------------
+
+async def ws_connect(url):
+    """Open a websocket and return its (reader, writer)"""
+    parts = urllib.parse.urlsplit(url)
+    secure = parts.scheme == "wss"
+    port = parts.port or (443 if secure else 80)
+    reader, writer = await asyncio.open_connection(parts.hostname, port, ssl=True if secure else None)
+    key = base64.b64encode(os.urandom(16)).decode()
+    writer.write((
+        f"GET {parts.path}?{parts.query} HTTP/1.1\r\n"
+        f"Host: {parts.hostname}:{port}\r\n"
+        "Upgrade: websocket\r\nConnection: Upgrade\r\n"
+        f"Sec-WebSocket-Key: {key}\r\nSec-WebSocket-Version: 13\r\n\r\n"
+    ).encode())
+    await writer.drain()
+    status = await reader.readline()
+    if b" 101 " not in status:
+        raise ConnectionError(f"websocket upgrade refused: {status.decode().strip()}")
+    while (await reader.readline()) not in (b"\r\n", b""):
+        pass
+    return reader, writer
+
+def ws_frame(opcode, payload):
+    """Masked client frame"""
+    mask = os.urandom(4)
+    length = len(payload)
+    if length < 126:
+        header = struct.pack("!BB", 0x80 | opcode, 0x80 | length)
+    elif length < 65536:
+        header = struct.pack("!BBH", 0x80 | opcode, 0x80 | 126, length)
+    else:
+        header = struct.pack("!BBQ", 0x80 | opcode, 0x80 | 127, length)
+    return header + mask + bytes(byte ^ mask[i % 4] for i, byte in enumerate(payload))
+
+def ws_send(writer, message):
+    """Queue one JSON text message"""
+    writer.write(ws_frame(0x1, json.dumps(message).encode()))
+
+async def ws_receive(reader, writer):
+    """Next text message, or None once the server closes"""
+    message = b""
+    while True:
+        first, second = await reader.readexactly(2)
+        length = second & 0x7F
+        if length == 126:
+            length = struct.unpack("!H", await reader.readexactly(2))[0]
+        elif length == 127:
+            length = struct.unpack("!Q", await reader.readexactly(8))[0]
+        payload = await reader.readexactly(length)
+        opcode = first & 0x0F
+        if opcode == 0x8:
+            return None
+        if opcode == 0x9:
+            writer.write(ws_frame(0xA, payload))
+            continue
+        if opcode in (0x0, 0x1):
+            message += payload
+            if first & 0x80:
+                return message.decode()
+
+# --- clients ------------------------------------------------------------------
+
+def new_stats():
+    """Counters shared by every client of one run"""
+    return {"joined": 0, "join_errors": [], "join_ms": [], "deliveries": 0, "wasted": 0, "latency_ms": []}
+
+async def heartbeat(writer):
+    """Keep the Phoenix socket alive"""
+    ref = 0
+    while True:
+        await asyncio.sleep(HEARTBEAT_SECONDS)
+        ref += 1
+        ws_send(writer, {"topic": "phoenix", "event": "heartbeat", "payload": {}, "ref": f"hb{ref}"})
+
+async def run_client(index, url, anon_key, branch, filtered, stats, stop):
+    """One subscriber: join, then count the changes it is sent"""
+    started = time.monotonic()
+    try:
+        reader, writer = await ws_connect(url)
+    except (OSError, ConnectionError) as error:
+        stats["join_errors"].append(str(error))
+        return
+
+    change = {"event": "INSERT", "schema": SCRATCH_SCHEMA, "table": "events"}
+    if filtered:
+        change["filter"] = f"branch_id=eq.{branch}"
+    ws_send(writer, {
+        "topic": f"realtime:load-{index}",
+        "event": "phx_join",
+        "payload": {
+            "config": {"broadcast": {"self": False}, "presence": {"key": ""}, "postgres_changes": [change]},
+            "access_token": anon_key,
+        },
+        "ref": "1",
+        "join_ref": "1",
+    })
+    keepalive = asyncio.create_task(heartbeat(writer))
+
+    try:
+        while not stop.is_set():
+            raw = await ws_receive(reader, writer)
+            if raw is None:
+                break
+            message = json.loads(raw)
+            if message.get("event") == "phx_reply" and message.get("ref") == "1":
+                if message["payload"].get("status") == "ok":
+                    stats["joined"] += 1
+                    stats["join_ms"].append((time.monotonic() - started) * 1000)
+                else:
+                    stats["join_errors"].append(json.dumps(message["payload"].get("response")))
+            elif message.get("event") == "postgres_changes":
+                record = message["payload"]["data"]["record"]
+                stats["deliveries"] += 1
+                if record["branch_id"] != branch:
+                    stats["wasted"] += 1
+                else:
+                    stats["latency_ms"].append(time.time() * 1000 - record["sent_at_ms"])
+    except (asyncio.IncompleteReadError, ConnectionError):
+        pass
+    finally:
+        keepalive.cancel()
+        writer.close()
+
+async def run_mode(filtered, args, url, anon_key):
+    """Connect every client, produce changes, and collect what was delivered"""
+    stats = new_stats()
+    stop = asyncio.Event()
+    tasks = []
+    for index in range(args.clients):
+        branch = branch_id(index % args.branches)
+        tasks.append(asyncio.create_task(run_client(index, url, anon_key, branch, filtered, stats, stop)))
+        if (index + 1) % args.connect_batch == 0:
+            await asyncio.sleep(args.connect_pause)
+
+    deadline = time.monotonic() + JOIN_TIMEOUT_SECONDS
+    while stats["joined"] + len(stats["join_errors"]) < args.clients and time.monotonic() < deadline:
+        await asyncio.sleep(0.5)
+
+    produce_started = time.monotonic()
+    await asyncio.to_thread(produce_changes, args.changes, args.rate, args.branches)
+    produce_seconds = time.monotonic() - produce_started
+    await asyncio.sleep(args.drain)
+
+    stop.set()
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+    stats["produce_seconds"] = produce_seconds
+    return stats
+
+def print_report(mode, stats, args):
+    """One block of results per mode"""
+    clients_per_branch = args.clients / args.branches
+    expected = args.changes * clients_per_branch * stats["joined"] / max(args.clients, 1)
+    useful = stats["deliveries"] - stats["wasted"]
+    latency = stats["latency_ms"]
+
+    print(f"\n{mode.upper()}")
+    print("-" * 70)
+    print(f"  joined clients         {stats['joined']:,} / {args.clients:,}"
+          f"   (join p95 {percentile(stats['join_ms'], 95):,.0f} ms)")
+    if stats["join_errors"]:
+        print(f"  join errors            {len(stats['join_errors']):,}  e.g. {stats['join_errors'][0][:80]}")
+    print(f"  changes committed      {args.changes:,} in {stats['produce_seconds']:.1f}s")
+    print(f"  messages delivered     {stats['deliveries']:,}   ({stats['deliveries'] / max(args.changes, 1):,.0f} per change)")
+    print(f"  useful / expected      {useful:,} / {expected:,.0f}")
+    print(f"  wasted (other branch)  {stats['wasted']:,}")
+    print(f"  delivery latency       p50 {percentile(latency, 50):,.0f} ms, p95 {percentile(latency, 95):,.0f} ms,"
+          f" max {max(latency, default=0):,.0f} ms")
+
+def main():
+    """Main load test function"""
+    parser = argparse.ArgumentParser(description="Realtime fan-out with and without server-side filters")
+    parser.add_argument("--clients", type=int, default=10000, help="subscribed clients per mode")
+    parser.add_argument("--branches", type=int, default=100, help="branches the clients are spread over")
+    parser.add_argument("--changes", type=int, default=200, help="rows inserted per mode")
+    parser.add_argument("--rate", type=float, default=20, help="inserts per second")
+    parser.add_argument("--mode", choices=["filtered", "unfiltered", "both"], default="both")
+    parser.add_argument("--drain", type=float, default=10, help="seconds to wait for deliveries after the last insert")
+    parser.add_argument("--connect-batch", type=int, default=250, help="connections opened between pauses")
+    parser.add_argument("--connect-pause", type=float, default=0.2, help="seconds between connection batches")
+    parser.add_argument("--keep", action="store_true", help=f"keep the {SCRATCH_SCHEMA} schema afterwards")
+    args = parser.parse_args()
+
+    url, anon_key = realtime_url()
+    modes = ["filtered", "unfiltered"] if args.mode == "both" else [args.mode]
+
+    print("\n" + "="*70)
+    print("  REALTIME FAN-OUT LOAD TEST")
+    print(f"  Database: {bench_database_url()}")
+    print(f"  {args.clients:,} clients over {args.branches} branches, {args.changes} changes at {args.rate:g}/s")
+    print("="*70)
+
+    seed_scratch_table()
+    try:
+        for mode in modes:
+            stats = asyncio.run(run_mode(mode == "filtered", args, url, anon_key))
+            print_report(mode, stats, args)
+    finally:
+        if not args.keep:
+            drop_scratch_table()
+
+    print("\nFiltered subscriptions should deliver ~clients/branches messages per change;")
+    print("unfiltered ones deliver one per client and the Realtime server pays for all of them.")
+    print("\n" + "="*70 + "\n")
+
+if __name__ == "__main__":
+    main()
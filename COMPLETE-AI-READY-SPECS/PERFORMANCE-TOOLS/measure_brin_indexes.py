@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+"""
+BRIN vs B-tree Measurement for created_at Indexes
+Compares index size and range-scan latency on the local benchmark database.
+
+Usage:
+    python measure_brin_indexes.py
+    python measure_brin_indexes.py --rows 2000000 --days 730
+    python measure_brin_indexes.py --shuffle          # simulate poor correlation
+    python measure_brin_indexes.py --write-feedback   # feed correlations to the generators
+
+What it does:
+    1. Lists every append-only table the phase generators emit a BRIN index for
+       and, for the ones that exist locally, reports the pg_stats correlation
+       of created_at (the generators fall back to a B-tree below 0.9).
+    2. Seeds a scratch copy of the generated table layout, builds a B-tree and
+       then a BRIN index on created_at, and times 1/7/30 day range scans.
+"""
+
+import argparse
+import json
+import statistics
+
+from local_db import psql, query_json, explain_analyze, format_bytes, bench_database_url
+from spec_generators import iter_spec_tables, SPECS_ROOT
+
+SCRATCH_SCHEMA = "perf_brin"
+SCRATCH_TABLE = f"{SCRATCH_SCHEMA}.activity_log"
+WINDOWS = ["1 day", "7 days", "30 days"]
+SEED_START = "2025-01-01 00:00:00+00"
+
+INDEX_VARIANTS = {
+    "btree": f"CREATE INDEX activity_log_created_at ON {SCRATCH_TABLE}(created_at DESC);",
+    "brin": f"CREATE INDEX activity_log_created_at ON {SCRATCH_TABLE} USING BRIN (created_at) WITH (pages_per_range = 32);",
+}
+
+def append_only_tables():
+    """Collect append-only tables (and the generator deciding for them)"""
+    tables = {}
+    for phase, generator, spec, table_name in iter_spec_tables():
+        if generator.is_append_only_table(table_name):
+            tables.setdefault(table_name, (phase, generator))
+    return tables
+
+def report_live_correlation(tables):
+    """Print pg_stats correlation for generated append-only tables present locally"""
+    names = ", ".join(f"'{name}'" for name in sorted(tables))
+    rows = query_json(f"""
+        SELECT tablename, correlation
+        FROM pg_stats
+        WHERE schemaname = 'public' AND attname = 'created_at' AND tablename IN ({names})
+    """)
+    measured = {row['tablename']: row['correlation'] for row in rows}
+
+    print(f"{'table':40} {'correlation':>12}  index")
+    print("-" * 70)
+    for table_name in sorted(tables):
+        phase, generator = tables[table_name]
+        correlation = measured.get(table_name)
+        shown = f"{correlation:.3f}" if correlation is not None else "not seeded"
+        if correlation is not None and abs(correlation) < generator.BRIN_MIN_CORRELATION:
+            kind = "btree (poor correlation)"
+        else:
+            kind = "brin"
+        print(f"{table_name:40} {shown:>12}  {kind}")
+    return measured
+
+def write_feedback(measured):
+    """Merge measured correlations into the generators' index feedback file"""
+    feedback_path = SPECS_ROOT / "PERFORMANCE-TOOLS" / "index-feedback.json"
+    feedback = {}
+    if feedback_path.exists():
+        with open(feedback_path, 'r', encoding='utf-8') as f:
+            feedback = json.load(f)
+    feedback.setdefault('created_at_correlation', {}).update(
+        {table: round(value, 4) for table, value in measured.items()}
+    )
+    with open(feedback_path, 'w', encoding='utf-8') as f:
+        json.dump(feedback, f, indent=2, sort_keys=True)
+        f.write("\n")
+    print(f"\n  ✓ Wrote {len(measured)} correlations to {feedback_path.relative_to(SPECS_ROOT)}")
+
+def seed_scratch_table(rows, days, tenants, shuffle):
+    """Create and fill a scratch table shaped like generate_table_schema"""
+    order = "random()" if shuffle else "g"
+    psql(f"""
+        DROP SCHEMA IF EXISTS {SCRATCH_SCHEMA} CASCADE;
+        CREATE SCHEMA {SCRATCH_SCHEMA};
+        CREATE TABLE {SCRATCH_TABLE} (
+          id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+          tenant_id UUID NOT NULL,
+          branch_id UUID NOT NULL,
+          name VARCHAR(255),
+          description TEXT,
+          status VARCHAR(50) DEFAULT 'active',
+          metadata JSONB DEFAULT '{{}}',
+          created_by UUID,
+          updated_by UUID,
+          created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+          updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+        );
+        INSERT INTO {SCRATCH_TABLE} (tenant_id, branch_id, name, description, created_at, updated_at)
+        SELECT
+          ('00000000-0000-0000-0000-' || lpad((g % {tenants})::text, 12, '0'))::uuid,
+          ('00000000-0000-0000-0001-' || lpad((g % {tenants * 10})::text, 12, '0'))::uuid,
+          'entry ' || g,
+          md5(g::text),
+          ts, ts
+        FROM (
+          SELECT g, timestamptz '{SEED_START}' + (g::double precision / {rows}) * interval '{days} days' AS ts
+          FROM generate_series(1, {rows}) g
+        ) s
+        ORDER BY {order};
+        VACUUM ANALYZE {SCRATCH_TABLE};
+    """)
+    return float(psql(f"""
+        SELECT correlation FROM pg_stats
+        WHERE schemaname = '{SCRATCH_SCHEMA}' AND tablename = 'activity_log' AND attname = 'created_at';
+    """).strip())
+
+def measure_variant(kind, days, repeats):
+    """Build one index variant and time range scans against it"""
+    psql(f"DROP INDEX IF EXISTS {SCRATCH_SCHEMA}.activity_log_created_at;\n{INDEX_VARIANTS[kind]}\nANALYZE {SCRATCH_TABLE};")
+    size = int(psql(f"SELECT pg_relation_size('{SCRATCH_SCHEMA}.activity_log_created_at');").strip())
+
+    timings = {}
+    for window in WINDOWS:
+        query = f"""SELECT * FROM {SCRATCH_TABLE}
+            WHERE created_at >= timestamptz '{SEED_START}' + interval '{days} days' - interval '{window}'"""
+        samples = []
+        for _ in range(repeats):
+            plan = explain_analyze(query, settings="SET enable_seqscan = off;")
+            samples.append(plan['Execution Time'])
+        timings[window] = statistics.median(samples)
+    return size, timings
+
+def main():
+    """Main measurement function"""
+    parser = argparse.ArgumentParser(description="Compare BRIN and B-tree created_at indexes")
+    parser.add_argument("--rows", type=int, default=1000000, help="rows in the scratch table")
+    parser.add_argument("--days", type=int, default=365, help="days of history the rows span")
+    parser.add_argument("--tenants", type=int, default=20, help="tenants spread across the rows")
+    parser.add_argument("--repeats", type=int, default=5, help="timed runs per range scan (median reported)")
+    parser.add_argument("--shuffle", action="store_true", help="insert rows out of created_at order")
+    parser.add_argument("--write-feedback", action="store_true", help="save live correlations for the generators")
+    parser.add_argument("--keep", action="store_true", help=f"keep the {SCRATCH_SCHEMA} schema afterwards")
+    args = parser.parse_args()
+
+    print("\n" + "="*70)
+    print("  BRIN vs B-TREE: created_at INDEXES")
+    print(f"  Database: {bench_database_url()}")
+    print("="*70 + "\n")
+
+    tables = append_only_tables()
+    print(f"Append-only tables emitted with BRIN: {len(tables)}\n")
+    measured = report_live_correlation(tables)
+    if args.write_feedback:
+        write_feedback(measured)
+
+    print("\n" + "-"*70)
+    print(f"Seeding {args.rows:,} rows over {args.days} days ({'shuffled' if args.shuffle else 'insert order'})...")
+    correlation = seed_scratch_table(args.rows, args.days, args.tenants, args.shuffle)
+    print(f"  created_at correlation: {correlation:.3f}")
+    print("-"*70 + "\n")
+
+    results = {kind: measure_variant(kind, args.days, args.repeats) for kind in INDEX_VARIANTS}
+
+    header = f"{'index':8} {'size':>10}" + "".join(f" {('scan ' + w):>14}" for w in WINDOWS)
+    print(header)
+    print("-" * len(header))
+    for kind, (size, timings) in results.items():
+        print(f"{kind:8} {format_bytes(size):>10}" + "".join(f" {timings[w]:>11.2f} ms" for w in WINDOWS))
+
+    btree_size, btree_timings = results['btree']
+    brin_size, brin_timings = results['brin']
+    print(f"\nBRIN is {btree_size / max(brin_size, 1):.0f}x smaller than the B-tree.")
+    slower = [w for w in WINDOWS if brin_timings[w] > btree_timings[w] * 1.5]
+    if slower:
+        print(f"BRIN range scans were >1.5x slower for: {', '.join(slower)} - "
+              "expected when correlation is poor, keep the B-tree there.")
+
+    if not args.keep:
+        psql(f"DROP SCHEMA IF EXISTS {SCRATCH_SCHEMA} CASCADE;")
+    print("\n" + "="*70 + "\n")
+
+if __name__ == "__main__":
+    main()
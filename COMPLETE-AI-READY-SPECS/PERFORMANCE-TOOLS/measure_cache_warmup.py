@@ -0,0 +1,261 @@
+#!/usr/bin/env python3
+"""
+Cache Warm-up Measurement
+Measures how long tenant-scoped queries take to get back to their steady-state
+p95 after a cold restart, with no warming, with the old whole-table scan, and
+with the SPEC-034 snapshot replay (performance.warm_cache), plain and with
+one tenant's index ranges first.
+
+Usage:
+    python measure_cache_warmup.py
+    python measure_cache_warmup.py --rows 5000000 --tenants 100 --queries 4000
+    python measure_cache_warmup.py --restart-command "supabase stop && supabase start"
+    python measure_cache_warmup.py --keep              # keep the scratch schema
+
+What it does:
+    1. Seeds a multi-tenant events table (two tenant_id-leading indexes) in a
+       scratch schema together with the SPEC-034 snapshot and warming
+       functions, runs the workload warm to get the steady-state p95, and
+       takes a hot block snapshot (performance.snapshot_hot_blocks).
+    2. For each strategy: goes cold, warms, then replays the same query
+       sequence in windows of --window queries, timing each query with
+       EXPLAIN ANALYZE. --hot-share of the queries hit --hot-tenant.
+    3. Reports warm-up time and the time until a window's p95 is back within
+       --tolerance of steady state. Exits 1 when the snapshot replay never
+       gets there or gets there later than no warming at all.
+
+Going cold: --restart-command restarts the server (shared buffers are lost,
+the snapshot table survives, like a real restart). Without it the scratch
+relations are evicted with pg_buffercache_evict() (PostgreSQL 17+); the OS
+page cache stays warm then, so every strategy looks better than after a
+real restart.
+"""
+
+import argparse
+import json
+import random
+import re
+import subprocess
+import time
+
+from build_schema_bundle import leading_keywords, read_text, split_statements, sql_fences
+from local_db import psql, query_value, percentile, format_bytes, bench_database_url
+from spec_generators import SPECS_ROOT
+
+SCRATCH_SCHEMA = "perf_warmup"
+SCRATCH_TABLE = f"{SCRATCH_SCHEMA}.events"
+PERFORMANCE_SPEC = SPECS_ROOT / "PHASE-01-FOUNDATION" / "04-DATABASE-FUNCTIONS" / "SPEC-034-performance-functions.sql"
+SEED_ANCHOR = "2025-06-30 00:00:00+00"
+STUDENTS_PER_TENANT = 2000
+
+# SPEC-034 objects the measurement needs
+WARMING_OBJECTS = ("performance.cache_snapshot", "performance.snapshot_hot_blocks", "performance.warm_cache")
+
+STRATEGIES = [
+    ("none", None),
+    ("table scan", f"SELECT COUNT(*) FROM {SCRATCH_TABLE};"),
+    ("snapshot", f"SELECT * FROM {SCRATCH_SCHEMA}.warm_cache(ARRAY['events']);"),
+    ("snapshot + tenant", f"SELECT * FROM {SCRATCH_SCHEMA}.warm_cache(ARRAY['events'], {{tenant}});"),
+]
+
+def tenant_id(index):
+    """Deterministic tenant UUID literal"""
+    return f"md5('tenant' || {index})::uuid"
+
+def warming_definitions():
+    """The SPEC-034 snapshot table and warming functions, moved to the scratch schema"""
+    kept = []
+    for _, sql in sql_fences(read_text(PERFORMANCE_SPEC)):
+        for _, text in split_statements(sql):
+            head = leading_keywords(text, 6).lower()
+            if head.startswith("create") and any(name in head for name in WARMING_OBJECTS):
+                kept.append(text)
+    return re.sub(r"\bperformance\.", f"{SCRATCH_SCHEMA}.", "\n\n".join(kept))
+
+def seed(rows, tenants):
+    """Scratch schema with the warming functions and a multi-tenant events table"""
+    psql(f"""
+        CREATE EXTENSION IF NOT EXISTS pg_buffercache;
+        CREATE EXTENSION IF NOT EXISTS pg_prewarm;
+        DROP SCHEMA IF EXISTS {SCRATCH_SCHEMA} CASCADE;
+        CREATE SCHEMA {SCRATCH_SCHEMA};
+        {warming_definitions()}
+        CREATE TABLE {SCRATCH_TABLE} (
+          id BIGINT PRIMARY KEY,
+          tenant_id UUID NOT NULL,
+          student_id UUID NOT NULL,
+          status VARCHAR(20) NOT NULL,
+          payload TEXT,
+          created_at TIMESTAMPTZ NOT NULL
+        );
+        INSERT INTO {SCRATCH_TABLE}
+        SELECT
+          g,
+          {tenant_id(f'(g % {tenants})')},
+          md5('student' || (g % {tenants}) || ':' || ((g / {tenants}) % {STUDENTS_PER_TENANT}))::uuid,
+          CASE WHEN g % 10 = 0 THEN 'absent' ELSE 'present' END,
+          repeat(md5(g::text), 3),
+          TIMESTAMPTZ '{SEED_ANCHOR}' - ((g * 7919) % (365 * 24 * 60)) * INTERVAL '1 minute'
+        FROM generate_series(1, {rows}) g;
+        CREATE INDEX events_tenant_created ON {SCRATCH_TABLE}(tenant_id, created_at DESC);
+        CREATE INDEX events_tenant_student ON {SCRATCH_TABLE}(tenant_id, student_id);
+        VACUUM ANALYZE {SCRATCH_TABLE};
+    """)
+
+def workload(queries, tenants, hot_tenant, hot_share, seed_value=7):
+    """The query sequence every strategy replays: student histories and recent activity"""
+    rng = random.Random(seed_value)
+    sequence = []
+    for _ in range(queries):
+        tenant = hot_tenant if rng.random() < hot_share else rng.randrange(tenants)
+        if rng.random() < 0.5:
+            student = rng.randrange(STUDENTS_PER_TENANT)
+            sequence.append(
+                f"SELECT COUNT(*), MAX(created_at) FROM {SCRATCH_TABLE} "
+                f"WHERE tenant_id = {tenant_id(tenant)} "
+                f"AND student_id = md5('student' || {tenant} || ':' || {student})::uuid"
+            )
+        else:
+            days = rng.randrange(365)
+            sequence.append(
+                f"SELECT id, status, created_at FROM {SCRATCH_TABLE} "
+                f"WHERE tenant_id = {tenant_id(tenant)} "
+                f"AND created_at < TIMESTAMPTZ '{SEED_ANCHOR}' - INTERVAL '{days} days' "
+                f"ORDER BY created_at DESC LIMIT 50"
+            )
+    return sequence
+
+def run_window(queries):
+    """Execution time (ms) of each query, from one psql session"""
+    output = psql("\n".join(f"EXPLAIN (ANALYZE, TIMING OFF, FORMAT JSON) {query};" for query in queries))
+    decoder = json.JSONDecoder()
+    timings = []
+    position = 0
+    output = output.strip()
+    while position < len(output):
+        plan, position = decoder.raw_decode(output, position)
+        timings.append(plan[0]["Execution Time"])
+        while position < len(output) and output[position].isspace():
+            position += 1
+    return timings
+
+def go_cold(restart_command):
+    """Lose the cached blocks: restart the server, or evict the scratch relations"""
+    if restart_command:
+        subprocess.run(restart_command, shell=True, check=True, capture_output=True)
+        deadline = time.time() + 180
+        while True:
+            try:
+                query_value("SELECT 1")
+                return
+            except RuntimeError:
+                if time.time() > deadline:
+                    raise
+                time.sleep(1)
+    psql(f"""
+        SELECT COUNT(pg_buffercache_evict(b.bufferid))
+        FROM pg_buffercache b
+        JOIN pg_class c ON pg_relation_filenode(c.oid) = b.relfilenode
+        WHERE c.relnamespace = '{SCRATCH_SCHEMA}'::regnamespace
+          AND b.reldatabase = (SELECT oid FROM pg_database WHERE datname = current_database());
+    """)
+
+def measure(windows, steady_p95, tolerance):
+    """Replay the windows; (p95 per window, seconds per window, index of the first steady window)"""
+    p95s, seconds, steady_at = [], [], None
+    for index, queries in enumerate(windows):
+        started = time.perf_counter()
+        timings = run_window(queries)
+        seconds.append(time.perf_counter() - started)
+        p95s.append(percentile(timings, 95))
+        if steady_at is None and p95s[-1] <= steady_p95 * (1 + tolerance):
+            steady_at = index
+    return p95s, seconds, steady_at
+
+def main():
+    """Main measurement function"""
+    parser = argparse.ArgumentParser(description="Measure time to steady-state p95 after a cold restart")
+    parser.add_argument("--rows", type=int, default=2000000, help="events seeded")
+    parser.add_argument("--tenants", type=int, default=50, help="tenants the events belong to")
+    parser.add_argument("--hot-tenant", type=int, default=0, help="tenant most queries hit, warmed first")
+    parser.add_argument("--hot-share", type=float, default=0.8, help="share of queries for the hot tenant")
+    parser.add_argument("--queries", type=int, default=2000, help="queries replayed after each cold start")
+    parser.add_argument("--window", type=int, default=100, help="queries per p95 window")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="how far above steady-state p95 counts as steady")
+    parser.add_argument("--restart-command", help="shell command restarting the database server")
+    parser.add_argument("--keep", action="store_true", help=f"keep the {SCRATCH_SCHEMA} schema afterwards")
+    args = parser.parse_args()
+
+    print("\n" + "="*70)
+    print("  CACHE WARM-UP: TIME TO STEADY-STATE P95")
+    print(f"  Database: {bench_database_url()}")
+    print("="*70 + "\n")
+
+    if not args.restart_command and query_value("SELECT to_regproc('pg_buffercache_evict') IS NOT NULL") != "t":
+        print("❌ pg_buffercache_evict() needs PostgreSQL 17+: pass --restart-command instead")
+        raise SystemExit(1)
+
+    print(f"Seeding {args.rows:,} events for {args.tenants} tenants...")
+    seed(args.rows, args.tenants)
+    sizes = query_value(f"""
+        SELECT pg_relation_size('{SCRATCH_TABLE}') || ' ' || pg_indexes_size('{SCRATCH_TABLE}')
+               || ' ' || (SELECT setting::BIGINT * current_setting('block_size')::BIGINT
+                          FROM pg_settings WHERE name = 'shared_buffers')
+    """).split()
+    print(f"  heap {format_bytes(int(sizes[0]))}, indexes {format_bytes(int(sizes[1]))}, "
+          f"shared_buffers {format_bytes(int(sizes[2]))}")
+
+    sequence = workload(args.queries, args.tenants, args.hot_tenant, args.hot_share)
+    windows = [sequence[i:i + args.window] for i in range(0, len(sequence), args.window)]
+
+    # Steady state: the second of two warm passes
+    run_window(sequence)
+    steady_p95 = percentile(run_window(sequence), 95)
+    snapshot = query_value(f"SELECT blocks || ' ' || block_ranges FROM {SCRATCH_SCHEMA}.snapshot_hot_blocks()").split()
+    print(f"  steady-state p95 {steady_p95:.2f} ms; snapshot of {int(snapshot[0]):,} hot blocks "
+          f"in {int(snapshot[1]):,} ranges")
+    print(f"  going cold by {'restarting the server' if args.restart_command else 'evicting the scratch relations'}\n")
+
+    results = {}
+    for name, warm_sql in STRATEGIES:
+        go_cold(args.restart_command)
+        started = time.perf_counter()
+        if warm_sql:
+            psql(warm_sql.format(tenant=tenant_id(args.hot_tenant)))
+        warm_seconds = time.perf_counter() - started
+        p95s, seconds, steady_at = measure(windows, steady_p95, args.tolerance)
+        results[name] = {
+            "warm": warm_seconds,
+            "first_p95": p95s[0],
+            "steady_at": steady_at,
+            "to_steady": None if steady_at is None else warm_seconds + sum(seconds[:steady_at + 1]),
+        }
+        print(f"  {name:18} warmed in {warm_seconds:6.2f}s, first window p95 {p95s[0]:8.2f} ms")
+
+    print(f"\n{'strategy':18} {'warm-up':>9} {'first p95':>11} {'steady after':>14} {'time to steady':>15}")
+    print("-" * 71)
+    for name, _ in STRATEGIES:
+        result = results[name]
+        if result["steady_at"] is None:
+            steady, to_steady = "never", "-"
+        else:
+            steady = f"{(result['steady_at'] + 1) * args.window:,} queries"
+            to_steady = f"{result['to_steady']:.2f}s"
+        print(f"{name:18} {result['warm']:>8.2f}s {result['first_p95']:>8.2f} ms {steady:>14} {to_steady:>15}")
+
+    baseline, replay = results["none"], results["snapshot + tenant"]
+    passed = replay["to_steady"] is not None and (
+        baseline["to_steady"] is None or replay["to_steady"] <= baseline["to_steady"]
+    )
+    print(f"\n{'✅' if passed else '❌'} Snapshot replay with tenant priority reaches steady-state p95 "
+          f"({steady_p95:.2f} ms +{args.tolerance:.0%}) "
+          f"{'in ' + format(replay['to_steady'], '.2f') + 's' if replay['to_steady'] is not None else 'never'}"
+          f", no warming {'in ' + format(baseline['to_steady'], '.2f') + 's' if baseline['to_steady'] is not None else 'never'}")
+
+    if not args.keep:
+        psql(f"DROP SCHEMA IF EXISTS {SCRATCH_SCHEMA} CASCADE;")
+    print("\n" + "="*70 + "\n")
+    raise SystemExit(0 if passed else 1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,322 @@
+#!/usr/bin/env python3
+"""
+Notification Dispatcher
+Local dispatcher pool for the generated notification outbox. Claims batches
+from notification_outbox (FOR UPDATE SKIP LOCKED, so any number of
+dispatchers can poll the same outbox), coalesces each address's notifications
+into one message per channel, holds every channel to its rate limit and hands
+the messages to pluggable senders.
+
+Usage:
+    python notification_sink.py &                          # fake SMTP + SMS gateway
+    python notification_dispatcher.py                      # 4 dispatchers, until Ctrl+C
+    python notification_dispatcher.py --drain --batch 1000
+    python notification_dispatcher.py --sender sms=my_gateway:send_sms --rate sms=1200
+
+Senders: --sender CHANNEL=NAME, where NAME is a built-in sender (smtp,
+sms-http, log) or module:function on the import path. A sender is called with
+one message dict (channel, address, subject, body, ids) and raises to fail
+it: the rows are retried with backoff, or failed for good when the exception
+has a truthy `permanent` attribute. Defaults: email=smtp, sms=sms-http, both
+pointed at notification_sink.py (BENCH_SMTP_HOST, BENCH_SMTP_PORT,
+BENCH_SMS_URL).
+
+Rate limits are per dispatcher process, shared by its workers: per minute
+from notification_channel_limits, overridden with --rate CHANNEL=PER_MINUTE.
+Messages a batch cannot send before its lease runs low are handed back
+(defer_notifications) without using up an attempt.
+"""
+
+import argparse
+import importlib
+import json
+import os
+import smtplib
+import socket
+import threading
+import time
+from email.message import EmailMessage
+from http.client import HTTPConnection
+from urllib.parse import urlparse
+
+from local_db import query_json, query_value, sql_literal, percentile
+
+DEFAULT_SMTP_HOST = "localhost"
+DEFAULT_SMTP_PORT = 2525
+DEFAULT_SMS_URL = "http://localhost:2580/sms"
+DEFAULT_FROM_ADDRESS = "notifications@school.local"
+
+# A claimed batch is the dispatcher's for this long
+LEASE_SECONDS = 120
+
+# Rows that missed their rate-limit window are offered again after this delay
+DEFER_DELAY = "15 seconds"
+
+# A coalesced message lists at most this many notifications, then a count
+DIGEST_MAX_ITEMS = 20
+
+# Idle dispatchers back off from POLL_MIN_SECONDS to POLL_MAX_SECONDS between claims
+POLL_MIN_SECONDS = 0.2
+POLL_MAX_SECONDS = 2.0
+
+CONNECTIONS = threading.local()
+
+def send_smtp(message):
+    """Deliver an email over one SMTP connection per worker thread"""
+    client = getattr(CONNECTIONS, "smtp", None)
+    if client is None:
+        client = smtplib.SMTP(
+            os.environ.get("BENCH_SMTP_HOST", DEFAULT_SMTP_HOST),
+            int(os.environ.get("BENCH_SMTP_PORT", DEFAULT_SMTP_PORT))
+        )
+        CONNECTIONS.smtp = client
+    email = EmailMessage()
+    email['From'] = os.environ.get("NOTIFICATION_FROM_ADDRESS", DEFAULT_FROM_ADDRESS)
+    email['To'] = message['address']
+    email['Subject'] = message['subject']
+    email.set_content(message['body'])
+    try:
+        client.send_message(email)
+    except smtplib.SMTPServerDisconnected:
+        CONNECTIONS.smtp = None
+        raise
+    except smtplib.SMTPRecipientsRefused as error:
+        error.permanent = True
+        raise
+
+def send_sms_http(message):
+    """Deliver an SMS through the HTTP gateway, over one keep-alive connection per worker thread"""
+    url = urlparse(os.environ.get("BENCH_SMS_URL", DEFAULT_SMS_URL))
+    connection = getattr(CONNECTIONS, "sms", None)
+    if connection is None:
+        connection = HTTPConnection(url.hostname, url.port or 80, timeout=30)
+        CONNECTIONS.sms = connection
+    payload = json.dumps({"to": message['address'], "body": message['body']})
+    try:
+        connection.request("POST", url.path, body=payload, headers={"Content-Type": "application/json"})
+        response = connection.getresponse()
+        response.read()
+    except OSError:
+        CONNECTIONS.sms = None
+        connection.close()
+        raise
+    if response.status >= 300:
+        error = RuntimeError(f"SMS gateway answered {response.status}")
+        error.permanent = 400 <= response.status < 500
+        raise error
+
+def send_log(message):
+    """Print the message instead of delivering it"""
+    print(f"  → {message['channel']:5} {message['address']:32} {message['subject']}")
+
+SENDERS = {"smtp": send_smtp, "sms-http": send_sms_http, "log": send_log}
+DEFAULT_SENDERS = {"email": "smtp", "sms": "sms-http"}
+
+def load_sender(name):
+    """A built-in sender, or module:function from the import path"""
+    if name in SENDERS:
+        return SENDERS[name]
+    module_name, _, function_name = name.partition(":")
+    if not function_name:
+        raise SystemExit(f"unknown sender {name!r} - use {', '.join(SENDERS)} or module:function")
+    return getattr(importlib.import_module(module_name), function_name)
+
+def channel_limits(overrides):
+    """Per-minute limits of each channel: notification_channel_limits, then overrides"""
+    limits = {row['channel']: row['per_minute'] for row in query_json(
+        "SELECT channel, per_minute FROM notification_channel_limits"
+    )}
+    limits.update(overrides)
+    return limits
+
+def new_bucket(per_minute):
+    """Token bucket refilled at per_minute, holding at most one second of burst"""
+    rate = per_minute / 60.0
+    return {"rate": rate, "capacity": max(rate, 1.0), "tokens": max(rate, 1.0),
+            "updated": time.monotonic(), "lock": threading.Lock()}
+
+def take_token(bucket, deadline):
+    """Wait for a send slot; False when none frees up before deadline"""
+    with bucket['lock']:
+        now = time.monotonic()
+        bucket['tokens'] = min(bucket['capacity'], bucket['tokens'] + (now - bucket['updated']) * bucket['rate'])
+        bucket['updated'] = now
+        wait = (1.0 - bucket['tokens']) / bucket['rate'] if bucket['tokens'] < 1.0 else 0.0
+        if now + wait > deadline:
+            return False
+        # Reserve the slot now; waiting happens outside the lock
+        bucket['tokens'] -= 1.0
+    if wait:
+        time.sleep(wait)
+    return True
+
+def id_array(ids):
+    """SQL BIGINT[] literal of row ids"""
+    return "ARRAY[" + ",".join(str(row_id) for row_id in ids) + "]::BIGINT[]"
+
+def claim_batch(worker, batch):
+    """Claim a batch (plus the rest of its addresses' pending rows)"""
+    return query_json(
+        f"SELECT * FROM claim_notifications({sql_literal(worker)}, {batch}, {sql_literal(f'{LEASE_SECONDS} seconds')})"
+    )
+
+def coalesce(rows):
+    """Group claimed rows into one message per (channel, address)"""
+    groups = {}
+    for row in rows:
+        groups.setdefault((row['channel'], row['address']), []).append(row)
+    messages = []
+    for (channel, address), group in groups.items():
+        group.sort(key=lambda row: row['id'])
+        if len(group) == 1:
+            subject, body = group[0]['subject'] or "Notification", group[0]['body']
+        else:
+            subject = f"{len(group)} new notifications"
+            lines = [f"- {row['subject'] or row['body']}" if channel == "email" else row['body']
+                     for row in group[:DIGEST_MAX_ITEMS]]
+            if len(group) > DIGEST_MAX_ITEMS:
+                lines.append(f"...and {len(group) - DIGEST_MAX_ITEMS} more")
+            body = "\n".join(lines)
+        messages.append({"channel": channel, "address": address, "subject": subject, "body": body,
+                         "ids": [row['id'] for row in group]})
+    return messages
+
+def dispatch_batch(rows, worker, senders, buckets):
+    """Send one claimed batch; returns (sent ids, deferred ids, {error: (ids, permanent)}, messages sent)"""
+    deadline = time.monotonic() + LEASE_SECONDS * 0.8
+    sent, deferred, failed, messages_sent = [], [], {}, 0
+    for message in coalesce(rows):
+        if not message['address']:
+            failed.setdefault("no address for recipient", ([], True))[0].extend(message['ids'])
+            continue
+        sender = senders.get(message['channel'])
+        if sender is None:
+            failed.setdefault(f"no sender for channel {message['channel']}", ([], True))[0].extend(message['ids'])
+            continue
+        if not take_token(buckets[message['channel']], deadline):
+            deferred.extend(message['ids'])
+            continue
+        try:
+            sender(message)
+        except Exception as error:
+            key = f"{type(error).__name__}: {error}"[:500]
+            failed.setdefault(key, ([], bool(getattr(error, "permanent", False))))[0].extend(message['ids'])
+            continue
+        sent.extend(message['ids'])
+        messages_sent += 1
+    return sent, deferred, failed, messages_sent
+
+def settle_batch(worker, sent, deferred, failed):
+    """Record a batch's outcome in the outbox"""
+    if sent:
+        query_value(f"SELECT complete_notifications({id_array(sent)}, {sql_literal(worker)})")
+    if deferred:
+        query_value(f"SELECT defer_notifications({id_array(deferred)}, {sql_literal(worker)}, {sql_literal(DEFER_DELAY)})")
+    for error, (ids, permanent) in failed.items():
+        query_value(
+            f"SELECT fail_notifications({id_array(ids)}, {sql_literal(worker)}, {sql_literal(error)}, "
+            f"{'false' if permanent else 'true'})"
+        )
+
+def run_dispatcher(worker, args, senders, buckets, stop, stats, lock):
+    """Claim and dispatch batches until stopped (with --drain: until nothing is ready)"""
+    idle = POLL_MIN_SECONDS
+    while not stop.is_set():
+        started = time.perf_counter()
+        rows = claim_batch(worker, args.batch)
+        claim_ms = (time.perf_counter() - started) * 1000
+        if not rows:
+            if args.drain:
+                return
+            stop.wait(idle)
+            idle = min(idle * 2, POLL_MAX_SECONDS)
+            continue
+        idle = POLL_MIN_SECONDS
+
+        sent, deferred, failed, messages_sent = dispatch_batch(rows, worker, senders, buckets)
+        settle_batch(worker, sent, deferred, failed)
+
+        with lock:
+            stats['claim_ms'].append(claim_ms)
+            stats['batches'] += 1
+            stats['sent'] += len(sent)
+            stats['messages'] += messages_sent
+            stats['deferred'] += len(deferred)
+            stats['failed'] += sum(len(ids) for ids, permanent in failed.values())
+            for error in failed:
+                if error not in stats['errors']:
+                    stats['errors'].add(error)
+                    print(f"  ❌ {worker}: {error}")
+
+def new_stats():
+    """Counters shared by a pool's dispatchers"""
+    return {"batches": 0, "sent": 0, "messages": 0, "deferred": 0, "failed": 0, "claim_ms": [], "errors": set()}
+
+def start_pool(args, senders, buckets, stats, lock, stop):
+    """Start args.workers dispatcher threads"""
+    prefix = f"{socket.gethostname()}:{os.getpid()}"
+    threads = [
+        threading.Thread(target=run_dispatcher, args=(f"{prefix}:{i}", args, senders, buckets, stop, stats, lock), daemon=True)
+        for i in range(1, args.workers + 1)
+    ]
+    for thread in threads:
+        thread.start()
+    return threads
+
+def parse_pairs(values, convert=str):
+    """CHANNEL=VALUE arguments as a dict"""
+    pairs = {}
+    for value in values:
+        channel, _, setting = value.partition("=")
+        if not setting:
+            raise SystemExit(f"expected CHANNEL=VALUE, got {value!r}")
+        pairs[channel] = convert(setting)
+    return pairs
+
+def main():
+    """Main dispatcher function"""
+    parser = argparse.ArgumentParser(description="Run a local dispatcher pool for the notification outbox")
+    parser.add_argument("--workers", type=int, default=4, help="concurrent dispatchers")
+    parser.add_argument("--batch", type=int, default=500, help="ready rows claimed per batch (their addresses' other rows come along)")
+    parser.add_argument("--sender", action="append", default=[], help="CHANNEL=smtp|sms-http|log|module:function")
+    parser.add_argument("--rate", action="append", default=[], help="CHANNEL=PER_MINUTE, overriding notification_channel_limits")
+    parser.add_argument("--drain", action="store_true", help="exit once nothing is ready to send")
+    args = parser.parse_args()
+
+    senders = {channel: load_sender(name) for channel, name in {**DEFAULT_SENDERS, **parse_pairs(args.sender)}.items()}
+    limits = channel_limits(parse_pairs(args.rate, int))
+    buckets = {channel: new_bucket(per_minute) for channel, per_minute in limits.items()}
+
+    print("\n" + "="*70)
+    print("  NOTIFICATION DISPATCHERS")
+    print(f"  {args.workers} workers, batches of {args.batch}; limits "
+          + ", ".join(f"{channel} {per_minute:,}/min" for channel, per_minute in sorted(limits.items())))
+    print("="*70 + "\n")
+
+    stop = threading.Event()
+    lock = threading.Lock()
+    stats = new_stats()
+    started = time.perf_counter()
+    threads = start_pool(args, senders, buckets, stats, lock, stop)
+
+    try:
+        for thread in threads:
+            while thread.is_alive():
+                thread.join(0.5)
+    except KeyboardInterrupt:
+        # Running batches are settled; their dispatchers then stop claiming
+        print("\n  Stopping after the running batches...")
+        stop.set()
+        for thread in threads:
+            thread.join()
+
+    elapsed = time.perf_counter() - started
+    print(f"\n{stats['sent']:,} notifications sent as {stats['messages']:,} messages in {elapsed:.1f}s "
+          f"({stats['sent'] / max(elapsed, 1e-9) * 60:,.0f}/min), {stats['deferred']:,} deferred, {stats['failed']:,} failed")
+    if stats['claim_ms']:
+        print(f"claim p50 {percentile(stats['claim_ms'], 50):.1f} ms, p95 {percentile(stats['claim_ms'], 95):.1f} ms "
+              f"over {stats['batches']:,} batches")
+    print("="*70 + "\n")
+
+if __name__ == "__main__":
+    main()
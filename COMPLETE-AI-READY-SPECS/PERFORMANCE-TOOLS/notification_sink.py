@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+"""
+Fake SMTP / SMS Sink
+Local stand-in for the mail server and the SMS gateway the notification
+dispatcher delivers to. Accepts everything, counts it, and optionally records
+each message or fails a share of them to exercise retries.
+
+Usage:
+    python notification_sink.py                          # SMTP :2525, SMS http://localhost:2580/sms
+    python notification_sink.py --output sink.jsonl      # also record every message
+    python notification_sink.py --fail-rate 0.05         # reject 5% (SMTP 451 / HTTP 503)
+
+SMS gateway: POST /sms with {"to": "+15550100", "body": "..."} (JSON), answered
+with 202. GET /stats returns the counters as JSON.
+
+The dispatcher's built-in senders talk to this sink by default
+(BENCH_SMTP_HOST / BENCH_SMTP_PORT, BENCH_SMS_URL).
+"""
+
+import argparse
+import json
+import random
+import socketserver
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+DEFAULT_SMTP_PORT = 2525
+DEFAULT_SMS_PORT = 2580
+
+def new_stats():
+    """Counters shared by both servers"""
+    return {"email": 0, "sms": 0, "rejected": 0, "bytes": 0, "lock": threading.Lock(), "output": None}
+
+def record(stats, channel, to, body, fail_rate):
+    """Count one message; False when it is to be rejected"""
+    with stats['lock']:
+        if fail_rate and random.random() < fail_rate:
+            stats['rejected'] += 1
+            return False
+        stats[channel] += 1
+        stats['bytes'] += len(body)
+        if stats['output'] is not None:
+            stats['output'].write(json.dumps({"channel": channel, "to": to, "body": body}) + "\n")
+    return True
+
+def smtp_handler(stats, fail_rate):
+    """Minimal SMTP session handler: EHLO/HELO, MAIL, RCPT, DATA, RSET, NOOP, QUIT"""
+    class Handler(socketserver.StreamRequestHandler):
+        def reply(self, line):
+            self.wfile.write((line + "\r\n").encode("ascii"))
+
+        def handle(self):
+            self.reply("220 notification-sink ESMTP")
+            recipients = []
+            while True:
+                line = self.rfile.readline()
+                if not line:
+                    return
+                command = line.decode("utf-8", "replace").strip()
+                verb = command[:4].upper()
+                if verb == "EHLO":
+                    self.reply("250-notification-sink")
+                    self.reply("250 8BITMIME")
+                elif verb in ("HELO", "NOOP"):
+                    self.reply("250 OK")
+                elif verb == "MAIL":
+                    recipients = []
+                    self.reply("250 OK")
+                elif verb == "RCPT":
+                    recipients.append(command.split(":", 1)[-1].strip().strip("<>"))
+                    self.reply("250 OK")
+                elif verb == "DATA":
+                    self.reply("354 End data with <CR><LF>.<CR><LF>")
+                    data = []
+                    for data_line in self.rfile:
+                        if data_line in (b".\r\n", b".\n"):
+                            break
+                        data.append(data_line)
+                    body = b"".join(data).decode("utf-8", "replace")
+                    if record(stats, "email", ", ".join(recipients), body, fail_rate):
+                        self.reply("250 OK queued")
+                    else:
+                        self.reply("451 Requested action aborted: sink rejection")
+                    recipients = []
+                elif verb == "RSET":
+                    recipients = []
+                    self.reply("250 OK")
+                elif verb == "QUIT":
+                    self.reply("221 Bye")
+                    return
+                else:
+                    self.reply("502 Command not implemented")
+    return Handler
+
+def sms_handler(stats, fail_rate):
+    """HTTP handler of the fake SMS gateway (keep-alive, so senders reuse connections)"""
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def respond(self, status, payload):
+            body = json.dumps(payload).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_POST(self):
+            if self.path != "/sms":
+                self.respond(404, {"error": "not found"})
+                return
+            message = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+            if record(stats, "sms", message.get("to"), message.get("body", ""), fail_rate):
+                self.respond(202, {"status": "queued"})
+            else:
+                self.respond(503, {"error": "sink rejection"})
+
+        def do_GET(self):
+            if self.path != "/stats":
+                self.respond(404, {"error": "not found"})
+                return
+            with stats['lock']:
+                self.respond(200, {key: stats[key] for key in ("email", "sms", "rejected", "bytes")})
+
+        def log_message(self, format, *args):
+            pass
+    return Handler
+
+def start_sink(smtp_port=DEFAULT_SMTP_PORT, sms_port=DEFAULT_SMS_PORT, fail_rate=0.0, output=None):
+    """Serve both sinks on background threads; returns (stats, (smtp port, sms port), stop)"""
+    stats = new_stats()
+    stats['output'] = output
+    socketserver.ThreadingTCPServer.allow_reuse_address = True
+    servers = [
+        socketserver.ThreadingTCPServer(("127.0.0.1", smtp_port), smtp_handler(stats, fail_rate)),
+        ThreadingHTTPServer(("127.0.0.1", sms_port), sms_handler(stats, fail_rate)),
+    ]
+    for server in servers:
+        server.daemon_threads = True
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    def stop():
+        for server in servers:
+            server.shutdown()
+            server.server_close()
+
+    # Port 0 picks a free port: report the real ones
+    return stats, tuple(server.server_address[1] for server in servers), stop
+
+def main():
+    """Main sink function"""
+    parser = argparse.ArgumentParser(description="Run a fake SMTP server and SMS gateway")
+    parser.add_argument("--smtp-port", type=int, default=DEFAULT_SMTP_PORT, help="SMTP port")
+    parser.add_argument("--sms-port", type=int, default=DEFAULT_SMS_PORT, help="SMS gateway HTTP port")
+    parser.add_argument("--fail-rate", type=float, default=0.0, help="share of messages rejected")
+    parser.add_argument("--output", help="append every accepted message to this JSON lines file")
+    args = parser.parse_args()
+
+    output = open(args.output, "a", encoding="utf-8") if args.output else None
+    stats, (smtp_port, sms_port), stop = start_sink(args.smtp_port, args.sms_port, args.fail_rate, output)
+
+    print("\n" + "="*70)
+    print("  NOTIFICATION SINK")
+    print(f"  SMTP localhost:{smtp_port}, SMS http://localhost:{sms_port}/sms")
+    print("="*70 + "\n")
+
+    previous = 0
+    try:
+        while True:
+            time.sleep(5)
+            with stats['lock']:
+                total = stats['email'] + stats['sms']
+                line = f"  {stats['email']:>10,} email {stats['sms']:>10,} sms {stats['rejected']:>8,} rejected"
+            print(f"{line}   {(total - previous) * 12:>10,}/min")
+            previous = total
+    except KeyboardInterrupt:
+        stop()
+        if output:
+            output.close()
+        print("\n" + "="*70 + "\n")
+
+if __name__ == "__main__":
+    main()
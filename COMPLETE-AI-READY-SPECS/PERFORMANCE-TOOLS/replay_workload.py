@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+"""
+Workload Replay
+Re-runs a captured query stream (capture_workload.py) against the local
+benchmark database, every captured session on a connection of its own and
+at the captured pace or faster, to reproduce a production slowdown offline.
+
+Usage:
+    python replay_workload.py                                  # workload.jsonl, real time
+    python replay_workload.py --workload incident.jsonl.gz --speed 4
+    python replay_workload.py --speed 0                        # as fast as the sessions go
+    python replay_workload.py --tenant 8d0e... --top 20
+
+What it does:
+    1. Groups the timed workload lines by captured session. Each session is
+       replayed in order on its own psql connection, so transactions and
+       tenant context statements (request.jwt.claims, app.current_tenant_id)
+       run as they did; sessions run concurrently.
+    2. Starts each query at its captured offset divided by --speed (0: no
+       waiting), with its captured bind parameters.
+    3. Reports per tenant the replayed and captured p50/p95 latency, the
+       slowest queries against their captured latency, how far the replay fell
+       behind schedule, and errors. Exits 1 when any query failed.
+
+Latency is measured from sending a query to psql until psql reports it done,
+so unlike the captured server-side durations it includes the client round
+trip: compare tenants and queries with each other, not single milliseconds.
+Aggregated pg_stat_statements lines (no captured time) are not replayed.
+"""
+
+import argparse
+import subprocess
+import threading
+import time
+
+from local_db import percentile, psql_command, bench_database_url
+from whatif_indexes import WORKLOAD_PATH, bind_params, load_workload
+
+DONE_MARKER = "@@replay-done"
+
+class ReplaySession:
+    """One psql connection replaying the statements of one captured session"""
+
+    def __init__(self):
+        self.process = subprocess.Popen(
+            psql_command() + ["-v", "ON_ERROR_STOP=0"],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            text=True,
+            bufsize=1
+        )
+        # Query results are discarded; the markers still go to stdout. Waiting
+        # for the first marker keeps connecting out of the first query's latency.
+        self.process.stdin.write(f"\\o /dev/null\nSELECT 1;\n\\echo {DONE_MARKER} :ERROR\n")
+        self.process.stdin.flush()
+        self.wait_done()
+
+    def wait_done(self):
+        """Read psql's output up to the next marker; whether the statement failed"""
+        while True:
+            line = self.process.stdout.readline()
+            if not line:
+                raise RuntimeError("psql exited during the replay")
+            if line.startswith(DONE_MARKER):
+                return line.split()[-1] == "true"
+
+    def execute(self, sql):
+        """Run one statement; (milliseconds, failed?)"""
+        started = time.perf_counter()
+        self.process.stdin.write(f"{sql.rstrip().rstrip(';')}\n;\n\\echo {DONE_MARKER} :ERROR\n")
+        self.process.stdin.flush()
+        failed = self.wait_done()
+        return (time.perf_counter() - started) * 1000.0, failed
+
+    def close(self):
+        """End the connection"""
+        self.process.stdin.close()
+        self.process.wait()
+
+def replay_session(lines, speed, started, results, lock):
+    """Replay one session's lines on schedule and record every execution"""
+    session = ReplaySession()
+    try:
+        for line in lines:
+            if speed > 0:
+                delay = started + line['at'] / speed - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+            behind = max(0.0, time.perf_counter() - started - (line['at'] / speed if speed > 0 else 0.0))
+            try:
+                sql = bind_params(line['query'], line['params'])
+            except ValueError:
+                milliseconds, failed = 0.0, True
+            else:
+                milliseconds, failed = session.execute(sql)
+            with lock:
+                results.append({"line": line, "ms": milliseconds, "failed": failed, "behind": behind})
+    finally:
+        session.close()
+
+def latency_summary(results):
+    """(queries, errors, replayed p50, replayed p95, captured p50, captured p95) of executions"""
+    replayed = [result['ms'] for result in results if not result['failed']]
+    captured = [result['line']['ms'] for result in results if result['line'].get('ms') is not None]
+    return (len(results), sum(1 for result in results if result['failed']),
+            percentile(replayed, 50), percentile(replayed, 95), percentile(captured, 50), percentile(captured, 95))
+
+def main():
+    """Main replay function"""
+    parser = argparse.ArgumentParser(description="Replay a captured workload against the benchmark database")
+    parser.add_argument("--workload", default=str(WORKLOAD_PATH), help="workload file from capture_workload.py")
+    parser.add_argument("--speed", type=float, default=1.0, help="replay speed factor (2 = twice as fast, 0 = no waits)")
+    parser.add_argument("--tenant", action="append", default=[], help="replay only this tenant's sessions")
+    parser.add_argument("--max-sessions", type=int, default=200, help="most concurrent sessions replayed")
+    parser.add_argument("--top", type=int, default=10, help="slowest queries listed")
+    args = parser.parse_args()
+
+    print("\n" + "="*70)
+    print("  WORKLOAD REPLAY")
+    print(f"  Database: {bench_database_url()}")
+    print("="*70 + "\n")
+
+    workload = load_workload(args.workload)
+    timed = [line for line in workload if line.get('at') is not None]
+    sessions = {}
+    for line in sorted(timed, key=lambda line: line['at']):
+        sessions.setdefault(line.get('session') or "-", []).append(line)
+    if args.tenant:
+        wanted = set(args.tenant)
+        sessions = {name: lines for name, lines in sessions.items()
+                    if any(line.get('tenant') in wanted for line in lines)}
+    if len(sessions) > args.max_sessions:
+        busiest = sorted(sessions, key=lambda name: -len(sessions[name]))[:args.max_sessions]
+        print(f"⚠️  {len(sessions)} sessions: replaying the {args.max_sessions} busiest (--max-sessions)")
+        sessions = {name: sessions[name] for name in busiest}
+    if not sessions:
+        print(f"❌ No timed workload lines to replay in {args.workload}")
+        raise SystemExit(1)
+
+    span = max(lines[-1]['at'] for lines in sessions.values())
+    print(f"{sum(len(lines) for lines in sessions.values()):,} queries in {len(sessions):,} sessions "
+          f"({len(workload) - len(timed):,} aggregated lines not replayed)")
+    print(f"  Captured span {span:,.1f}s, replayed at "
+          f"{f'{args.speed:g}x (~{span / args.speed:,.1f}s)' if args.speed > 0 else 'full speed'}\n")
+
+    results = []
+    lock = threading.Lock()
+    started = time.perf_counter()
+    threads = [
+        threading.Thread(target=replay_session, args=(lines, args.speed, started, results, lock), daemon=True)
+        for lines in sessions.values()
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    by_tenant = {}
+    for result in results:
+        by_tenant.setdefault(result['line'].get('tenant') or "(none)", []).append(result)
+    print(f"{'tenant':38} {'queries':>8} {'errors':>7} {'p50 ms':>8} {'p95 ms':>8} {'captured p50':>13} {'p95':>8}")
+    print("-" * 96)
+    for tenant, tenant_results in sorted(by_tenant.items(), key=lambda item: -len(item[1])):
+        queries, errors, p50, p95, captured_p50, captured_p95 = latency_summary(tenant_results)
+        print(f"{tenant[:38]:38} {queries:>8,} {errors:>7,} {p50:>8.2f} {p95:>8.2f} "
+              f"{captured_p50:>13.2f} {captured_p95:>8.2f}")
+    queries, errors, p50, p95, captured_p50, captured_p95 = latency_summary(results)
+    print("-" * 96)
+    print(f"{'all':38} {queries:>8,} {errors:>7,} {p50:>8.2f} {p95:>8.2f} {captured_p50:>13.2f} {captured_p95:>8.2f}")
+
+    by_query = {}
+    for result in results:
+        if not result['failed']:
+            by_query.setdefault(" ".join(result['line']['query'].split()), []).append(result)
+    print(f"\nSlowest queries by replayed p95 (top {args.top}):")
+    slowest = sorted(by_query.items(), key=lambda item: -percentile([r['ms'] for r in item[1]], 95))
+    for query, query_results in slowest[:args.top]:
+        _, _, _, p95, _, captured_p95 = latency_summary(query_results)
+        print(f"  {p95:>9.2f} ms (captured {captured_p95:>8.2f} ms) x{len(query_results):<6,} {query[:80]}")
+
+    behind = [result['behind'] for result in results]
+    print(f"\nReplayed in {elapsed:,.1f}s ({queries / elapsed:,.0f} queries/s); "
+          f"start lag p95 {percentile(behind, 95) * 1000:,.0f} ms, max {max(behind) * 1000:,.0f} ms")
+    print(f"{'✅' if not errors else '❌'} {errors:,} queries failed")
+    print("\n" + "="*70 + "\n")
+    raise SystemExit(1 if errors else 0)
+
+if __name__ == "__main__":
+    main()
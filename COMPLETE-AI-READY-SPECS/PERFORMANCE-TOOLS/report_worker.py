@@ -0,0 +1,308 @@
+#!/usr/bin/env python3
+"""
+Report Job Worker
+Local worker pool for the SPEC-033 report job queue. Claims jobs from
+reports.report_jobs (FOR UPDATE SKIP LOCKED, so any number of workers can
+poll the same queue), streams each report out of Postgres and stores the
+finished file.
+
+Usage:
+    python report_worker.py                       # 4 workers, until Ctrl+C
+    python report_worker.py --workers 8 --drain   # exit once the queue is empty
+    python report_worker.py --chunk-rows 20000 --upload
+
+Storage: files are written under --storage-dir as
+<requested_by>/<job id>.<format>, the local stand-in for the private
+'reports' bucket. With --upload they are also streamed into that bucket
+(BENCH_SUPABASE_URL plus BENCH_SUPABASE_SERVICE_KEY), where
+getReportDownloadUrl() signs them.
+
+Each report runs as its requester (request.jwt.claims and SET LOCAL ROLE
+authenticated), so RLS scopes the export exactly like the original request.
+The report is the plain query reports.report_query() returns. CSV goes
+through COPY (query) TO STDOUT and is copied to the file in 1 MB blocks; JSON
+rows are fetched --chunk-rows at a time through a cursor (FETCH_COUNT). Either
+way nothing is built up in Postgres, psql or here: memory stays flat however
+large the report (benchmark_report_export.py measures it). After every
+--chunk-rows rows the worker renews its lease and publishes rows_written,
+which Realtime pushes to the waiting client.
+"""
+
+import argparse
+import json
+import os
+import socket
+import subprocess
+import threading
+import time
+import urllib.request
+from pathlib import Path
+
+from local_db import psql, psql_command, query_value, sql_literal, format_bytes
+
+DEFAULT_STORAGE_DIR = Path(__file__).parent / "report-exports"
+DEFAULT_SUPABASE_URL = "http://localhost:54321"
+REPORTS_BUCKET = "reports"
+CONTENT_TYPES = {"csv": "text/csv", "json": "application/json"}
+
+# A job not heartbeaten for this long is considered abandoned and reclaimed
+LEASE = "5 minutes"
+
+# CSV exports are copied from psql to the file in blocks of this size
+COPY_BLOCK_BYTES = 1024 * 1024
+
+# psql reports the COPY row count on stderr behind this prefix
+ROW_COUNT_PREFIX = "report_rows"
+
+# Idle workers back off from POLL_MIN_SECONDS to POLL_MAX_SECONDS between claims
+POLL_MIN_SECONDS = 0.5
+POLL_MAX_SECONDS = 5.0
+
+def claim_job(worker):
+    """Claim one runnable job for this worker, or None"""
+    output = psql(f"SELECT row_to_json(j) FROM reports.claim_report_jobs({sql_literal(worker)}, 1, {sql_literal(LEASE)}) j;").strip()
+    return json.loads(output) if output else None
+
+def heartbeat_job(job, worker, rows_written):
+    """Renew the lease and publish progress; False once the lease is lost"""
+    return query_value(
+        f"SELECT reports.heartbeat_report_job({sql_literal(job['id'])}, {sql_literal(worker)}, {rows_written}, {sql_literal(LEASE)})"
+    ) == "t"
+
+def complete_job(job, worker, result_path, rows_written, byte_size):
+    """Mark the job succeeded with its stored file"""
+    return query_value(
+        f"SELECT reports.complete_report_job({sql_literal(job['id'])}, {sql_literal(worker)}, "
+        f"{sql_literal(result_path)}, {rows_written}, {byte_size})"
+    ) == "t"
+
+def fail_job(job, worker, error):
+    """Record a failed attempt; the queue retries it with backoff"""
+    return query_value(
+        f"SELECT reports.fail_report_job({sql_literal(job['id'])}, {sql_literal(worker)}, {sql_literal(str(error)[:2000])})"
+    ) == "t"
+
+def report_sql(job):
+    """psql script running the report as the job's requester, so RLS applies
+
+    CSV is streamed by COPY straight out of the executor; JSON rows come
+    through a cursor (FETCH_COUNT), one jsonb text per line.
+    """
+    claims = {"sub": job['requested_by'], "role": "authenticated"}
+    if job['tenant_id']:
+        claims['tenant_id'] = job['tenant_id']
+    settings = [("request.jwt.claims", json.dumps(claims))]
+    settings += [(name, job[column]) for name, column in (("app.current_tenant_id", "tenant_id"), ("app.current_branch_id", "branch_id")) if job[column]]
+    config = ", ".join([f"set_config({sql_literal(name)}, {sql_literal(value)}, true)" for name, value in settings])
+    if job['format'] == "csv":
+        output = f"COPY (:report_query) TO STDOUT WITH (FORMAT csv, HEADER);\n\\warn {ROW_COUNT_PREFIX} :ROW_COUNT"
+    else:
+        output = "SELECT to_jsonb(q)::text FROM (:report_query) q;"
+    return f"""BEGIN;
+DO $$ BEGIN PERFORM {config}; END $$;
+SET LOCAL ROLE authenticated;
+SELECT reports.report_query({sql_literal(job['report_type'])}, {sql_literal(json.dumps(job['parameters']))}::jsonb) AS report_query \\gset
+{output}
+COMMIT;
+"""
+
+def start_psql(script, *options):
+    """Start psql on a script; its output is read from process.stdout as bytes"""
+    process = subprocess.Popen(
+        psql_command() + list(options),
+        stdin=subprocess.PIPE,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE
+    )
+    process.stdin.write(script.encode("utf-8"))
+    process.stdin.close()
+    return process
+
+def finish_psql(process):
+    """Wait for psql to exit and return its messages; raises on failure"""
+    messages = process.stderr.read().decode("utf-8", "replace")
+    if process.wait() != 0:
+        raise RuntimeError(messages.strip())
+    return messages
+
+def stop_psql(process):
+    """Kill psql if it is still running (the export was abandoned)"""
+    if process.poll() is None:
+        process.kill()
+        process.wait()
+
+def copy_blocks(process):
+    """Yield psql's COPY ... TO STDOUT output in COPY_BLOCK_BYTES blocks"""
+    while True:
+        block = process.stdout.read(COPY_BLOCK_BYTES)
+        if not block:
+            return
+        yield block
+
+def keep_lease(job, worker, rows_written):
+    """Heartbeat, stopping the export once another worker owns the job"""
+    if not heartbeat_job(job, worker, rows_written):
+        raise RuntimeError("lease lost - the job was reclaimed by another worker")
+
+def write_csv(job, worker, out, chunk_rows):
+    """Copy the report's COPY CSV output into out, block by block"""
+    process = start_psql(report_sql(job))
+    try:
+        lines, reported = 0, 0
+        for block in copy_blocks(process):
+            out.write(block)
+            # Progress counts lines: close enough for quoted multi-line fields
+            lines += block.count(b"\n")
+            if lines - reported >= chunk_rows:
+                out.flush()
+                keep_lease(job, worker, max(lines - 1, 0))
+                reported = lines
+        messages = finish_psql(process)
+    finally:
+        stop_psql(process)
+
+    # The exact count, from the COPY command tag
+    for line in messages.splitlines():
+        if line.startswith(ROW_COUNT_PREFIX + " "):
+            return int(line.split()[1])
+    return max(lines - 1, 0)
+
+def write_json(job, worker, out, chunk_rows):
+    """Write the report's rows into out as a JSON array, chunk_rows at a time"""
+    process = start_psql(report_sql(job), "-v", f"FETCH_COUNT={chunk_rows}")
+    try:
+        rows_written = 0
+        out.write(b"[")
+        # jsonb text never contains a raw newline: one row per line
+        for line in process.stdout:
+            line = line.rstrip(b"\n")
+            if not line:
+                continue
+            out.write((b"," if rows_written else b"") + b"\n" + line)
+            rows_written += 1
+            if rows_written % chunk_rows == 0:
+                out.flush()
+                keep_lease(job, worker, rows_written)
+        out.write(b"\n]\n")
+        finish_psql(process)
+    finally:
+        stop_psql(process)
+    return rows_written
+
+def export_job(job, worker, storage_dir, chunk_rows):
+    """Stream one report into its file; returns (result path, rows, bytes)"""
+    result_path = f"{job['requested_by']}/{job['id']}.{job['format']}"
+    path = storage_dir / result_path
+    path.parent.mkdir(parents=True, exist_ok=True)
+    partial = path.with_name(path.name + ".partial")
+
+    with open(partial, "wb") as out:
+        if job['format'] == "csv":
+            rows_written = write_csv(job, worker, out, chunk_rows)
+        else:
+            rows_written = write_json(job, worker, out, chunk_rows)
+
+    # Readers never see a half-written file
+    os.replace(partial, path)
+    return result_path, rows_written, path.stat().st_size
+
+def upload_file(path, result_path, job_format):
+    """Stream a finished file into the private reports bucket"""
+    service_key = os.environ.get("BENCH_SUPABASE_SERVICE_KEY")
+    if not service_key:
+        raise RuntimeError("BENCH_SUPABASE_SERVICE_KEY is not set - `supabase status` prints the local service_role key")
+    base = os.environ.get("BENCH_SUPABASE_URL", DEFAULT_SUPABASE_URL).rstrip("/")
+
+    # A file body with a Content-Length is sent in blocks, never read whole
+    with open(path, "rb") as body:
+        request = urllib.request.Request(
+            f"{base}/storage/v1/object/{REPORTS_BUCKET}/{result_path}",
+            data=body,
+            method="POST",
+            headers={
+                "Authorization": f"Bearer {service_key}",
+                "apikey": service_key,
+                "Content-Type": CONTENT_TYPES[job_format],
+                "Content-Length": str(path.stat().st_size),
+                "x-upsert": "true",
+            }
+        )
+        with urllib.request.urlopen(request) as response:
+            response.read()
+
+def run_worker(worker, args, stop, stats, lock):
+    """Claim and export jobs until stopped (with --drain: until the queue is empty)"""
+    idle = POLL_MIN_SECONDS
+    while not stop.is_set():
+        job = claim_job(worker)
+        if job is None:
+            if args.drain:
+                return
+            stop.wait(idle)
+            idle = min(idle * 2, POLL_MAX_SECONDS)
+            continue
+        idle = POLL_MIN_SECONDS
+
+        started = time.perf_counter()
+        label = f"{worker:28} {job['report_type']:18} {job['id']}"
+        try:
+            result_path, rows_written, byte_size = export_job(job, worker, args.storage_dir, args.chunk_rows)
+            if args.upload:
+                upload_file(args.storage_dir / result_path, result_path, job['format'])
+            if not complete_job(job, worker, result_path, rows_written, byte_size):
+                raise RuntimeError("lease lost before completion")
+        except Exception as error:
+            fail_job(job, worker, error)
+            with lock:
+                stats['failed'] += 1
+                print(f"  ❌ {label} attempt {job['attempts']}: {error}")
+            continue
+
+        with lock:
+            stats['succeeded'] += 1
+            stats['rows'] += rows_written
+            print(f"  ✓ {label} {rows_written:>10,} rows {format_bytes(byte_size):>9} "
+                  f"in {time.perf_counter() - started:.1f}s")
+
+def main():
+    """Main worker function"""
+    parser = argparse.ArgumentParser(description="Run a local worker pool for the report job queue")
+    parser.add_argument("--workers", type=int, default=4, help="concurrent workers")
+    parser.add_argument("--chunk-rows", type=int, default=5000, help="rows fetched, written and reported per chunk")
+    parser.add_argument("--storage-dir", type=Path, default=DEFAULT_STORAGE_DIR, help="local stand-in for the reports bucket")
+    parser.add_argument("--upload", action="store_true", help="also stream finished files into Supabase Storage")
+    parser.add_argument("--drain", action="store_true", help="exit once no job is runnable")
+    args = parser.parse_args()
+
+    print("\n" + "="*70)
+    print("  REPORT JOB WORKERS")
+    print(f"  {args.workers} workers, {args.chunk_rows:,} rows per chunk -> {args.storage_dir}")
+    print("="*70 + "\n")
+
+    stop = threading.Event()
+    lock = threading.Lock()
+    stats = {"succeeded": 0, "failed": 0, "rows": 0}
+    prefix = f"{socket.gethostname()}:{os.getpid()}"
+    threads = [
+        threading.Thread(target=run_worker, args=(f"{prefix}:{i}", args, stop, stats, lock), daemon=True)
+        for i in range(1, args.workers + 1)
+    ]
+    for thread in threads:
+        thread.start()
+
+    try:
+        for thread in threads:
+            while thread.is_alive():
+                thread.join(0.5)
+    except KeyboardInterrupt:
+        # Running jobs finish; their workers then stop claiming
+        print("\n  Stopping after the running jobs...")
+        stop.set()
+        for thread in threads:
+            thread.join()
+
+    print(f"\n{stats['succeeded']} succeeded, {stats['failed']} failed attempts, {stats['rows']:,} rows exported")
+    print("="*70 + "\n")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+Schema Catalog
+Which spec owns each table of the bundled schema, with the table's columns
+and indexes. Built from the statements build_schema_bundle.py reconciles, with
+the same precedence: a table belongs to the source whose CREATE TABLE the
+bundle keeps, and later definitions only add columns. Generated tables carry
+the phase whose generator emits them, so measured feedback can go back to it.
+"""
+
+import re
+
+from build_schema_bundle import (
+    IDENTIFIER, QUALIFIED, TABLE_CONSTRAINTS, collect_statements, describe, qualify, skip_reason,
+    split_top_level, strip_comments, table_columns, unquote,
+)
+
+INDEX_PATTERN = re.compile(
+    rf"^CREATE\s+(?:UNIQUE\s+)?INDEX\s+(?:CONCURRENTLY\s+)?(?:IF\s+NOT\s+EXISTS\s+)?({IDENTIFIER})\s+"
+    rf"ON\s+(?:ONLY\s+)?({QUALIFIED})\s*(?:USING\s+(\w+)\s*)?\(", re.I)
+
+def spec_of(source):
+    """SPEC-nnn of a statement source, or None for migrations"""
+    match = re.search(r"SPEC-(\d+)", source)
+    return f"SPEC-{match.group(1)}" if match else None
+
+def index_columns(text):
+    """Key columns/expressions of a CREATE INDEX, as written"""
+    body = strip_comments(text)
+    match = INDEX_PATTERN.match(body)
+    start = match.end() - 1
+    depth = 0
+    for end in range(start, len(body)):
+        depth += {"(": 1, ")": -1}.get(body[end], 0)
+        if depth == 0:
+            break
+    columns = []
+    for item in split_top_level(body[start + 1:end]):
+        columns.append(unquote(item) if re.fullmatch(IDENTIFIER, item) else " ".join(item.split()))
+    return columns
+
+def constraint_indexes(table_name, text):
+    """{name: {columns, method}} of the indexes PRIMARY KEY and UNIQUE constraints create
+
+    Names follow PostgreSQL's defaults (table_pkey, table_col_key) unless the
+    constraint is named.
+    """
+    body = strip_comments(text)
+    start = body.find("(")
+    depth = 0
+    for end in range(start, len(body)):
+        depth += {"(": 1, ")": -1}.get(body[end], 0)
+        if depth == 0:
+            break
+    indexes = {}
+    for item in split_top_level(body[start + 1:end]):
+        named = re.match(rf"^CONSTRAINT\s+({IDENTIFIER})\s+(.*)$", item, re.I | re.S)
+        definition = named.group(2) if named else item
+        first = re.split(r"[\s(]", definition, 1)[0].upper()
+        if first in TABLE_CONSTRAINTS:
+            match = re.match(r"^(PRIMARY\s+KEY|UNIQUE)\s*\(([^)]*)\)", definition, re.I)
+            if not match:
+                continue
+            kind, columns = match.group(1).upper(), [unquote(column) for column in split_top_level(match.group(2))]
+        else:
+            match = re.search(r"\b(PRIMARY\s+KEY|UNIQUE)\b", definition, re.I)
+            if not match:
+                continue
+            kind, columns = match.group(1).upper(), [unquote(definition.split()[0])]
+        suffix = "pkey" if kind.startswith("PRIMARY") else "_".join(columns + ["key"])
+        name = unquote(named.group(1)) if named else f"{table_name}_{suffix}"[:63]
+        indexes.setdefault(name, {"columns": columns, "method": "btree"})
+    return indexes
+
+def build_catalog(include_generated=True):
+    """{schema.table: entry} for every table the bundle creates
+
+    An entry holds the owning source and line, its spec id and phase, whether
+    a generator emits it and whether it is partitioned, the merged columns
+    ({name: definition}), the other sources defining the table, its indexes
+    ({name: {columns, method, source}}), first definition of an index name
+    winning as in the bundle, and the indexes of its PRIMARY KEY and UNIQUE
+    constraints (constraint_indexes, same shape).
+    """
+    statements = [statement for statement in collect_statements(include_generated) if not skip_reason(statement)]
+    tables = {}
+    for statement in statements:
+        definition = describe(statement.text)
+        if definition is None or definition.kind != "relation":
+            continue
+        columns = table_columns(statement.text)
+        if columns is None:
+            continue
+        entry = tables.get(definition.name)
+        if entry is None:
+            tables[definition.name] = {
+                "name": definition.name,
+                "source": statement.source,
+                "line": statement.line,
+                "spec": spec_of(statement.source),
+                "phase": statement.source.split("/")[0],
+                "generated": statement.source.endswith("(generated)"),
+                "partitioned": re.search(r"\)\s*PARTITION\s+BY\b", strip_comments(statement.text), re.I) is not None,
+                "columns": dict(columns),
+                "defined_in": [],
+                "indexes": {},
+                "constraint_indexes": {
+                    name: {**index, "source": statement.source}
+                    for name, index in constraint_indexes(definition.name.split(".")[-1], statement.text).items()
+                },
+            }
+        else:
+            entry["defined_in"].append(statement.source)
+            for column, column_definition in columns.items():
+                entry["columns"].setdefault(column, column_definition)
+
+    for statement in statements:
+        match = INDEX_PATTERN.match(strip_comments(statement.text))
+        if not match:
+            continue
+        entry = tables.get(qualify(match.group(2)))
+        if entry is None:
+            continue
+        entry["indexes"].setdefault(unquote(match.group(1)), {
+            "columns": index_columns(statement.text),
+            "method": (match.group(3) or "btree").lower(),
+            "source": statement.source,
+        })
+    return tables
+
+def leading_index(entry, column):
+    """Name of an index of the table whose first key is column, or None"""
+    for name, index in sorted(entry["indexes"].items()):
+        if index["columns"] and index["columns"][0].split()[0] == column and index["method"] == "btree":
+            return name
+    return None
@@ -0,0 +1,38 @@
+#!/usr/bin/env python3
+"""
+Phase Generator Loader
+Imports the phase specification generators by path so the performance tools
+reuse their table definitions and index planning instead of copying them.
+"""
+
+import importlib.util
+from pathlib import Path
+
+# COMPLETE-AI-READY-SPECS/
+SPECS_ROOT = Path(__file__).parent.parent
+
+GENERATOR_PATHS = {
+    "PHASE-08-SUPPORT-STAFF": SPECS_ROOT / "PHASE-08-SUPPORT-STAFF" / "generate_all_specs.py",
+    "PHASE-09-END-USER-PORTALS": SPECS_ROOT / "PHASE-09-END-USER-PORTALS" / "generate_all_specs.py",
+    "PHASE-10-EXTERNAL-STAKEHOLDERS": SPECS_ROOT / "PHASE-10-EXTERNAL-STAKEHOLDERS" / "generate_all_specs.py",
+}
+
+def load_generator(phase):
+    """Import one phase generator module"""
+    module_name = "generator_" + phase.lower().replace('-', '_')
+    module_spec = importlib.util.spec_from_file_location(module_name, GENERATOR_PATHS[phase])
+    module = importlib.util.module_from_spec(module_spec)
+    module_spec.loader.exec_module(module)
+    return module
+
+def load_generators():
+    """Import every phase generator, keyed by phase folder"""
+    return {phase: load_generator(phase) for phase in GENERATOR_PATHS}
+
+def iter_spec_tables(generators=None):
+    """Yield (phase, generator, spec, table_name) for every generated table"""
+    generators = generators or load_generators()
+    for phase, generator in generators.items():
+        for spec in generator.SPECIFICATIONS:
+            for table_name in spec['tables']:
+                yield phase, generator, spec, table_name
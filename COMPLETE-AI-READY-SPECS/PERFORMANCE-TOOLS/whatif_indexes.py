@@ -0,0 +1,334 @@
+#!/usr/bin/env python3
+"""
+What-If Index Evaluation
+Estimates what each generated index and each index advisor suggestion does
+to the plan cost of a recorded query workload, and how big it is, without
+building or dropping anything: HypoPG hypothetical indexes stand in for the
+suggestions, hidden indexes for the generated ones.
+
+Usage:
+    python whatif_indexes.py                                  # workload.jsonl
+    python whatif_indexes.py --workload tenant-a.jsonl.gz --min-gain 0.5
+    python whatif_indexes.py --index "CREATE INDEX ON students (last_name, first_name)"
+    python whatif_indexes.py --no-generated                   # advisor suggestions only
+
+Workload files are JSON lines, one normalized query each, as written by
+capture_workload.py:
+
+    {"query": "SELECT * FROM students WHERE tenant_id = $1 AND status = $2",
+     "params": ["8d0e...", "active"], "calls": 1840}
+
+params fill $1, $2, ... (planned with the values, like a custom plan); a
+query without params is planned generically (EXPLAIN (GENERIC_PLAN),
+PostgreSQL 16+). calls weighs the query in the workload cost.
+
+What it does:
+    1. Plans every workload query with EXPLAIN (no ANALYZE, nothing runs) on
+       the seeded database the schema bundle was applied to: the baseline.
+    2. Advisor suggestions (performance.suggest_missing_indexes(), the
+       advisor_indexes of index-feedback.json not built yet, and --index)
+       are created with hypopg_create_index() and the workload planned again.
+    3. Indexes the generators emit are hidden with hypopg_hide_index() and
+       the workload planned without them.
+    4. Reports per index its size (estimated for hypothetical ones), the
+       calls-weighted workload cost without and with it, and the queries whose
+       plan got cheaper. Indexes below --min-gain percent of the workload cost
+       are marked skip (suggestions) or unused (generated).
+
+Each candidate is planned in a session of its own, so hypothetical and hidden
+indexes never leak into the next one. Only queries that mention the index's
+table are planned for it.
+"""
+
+import argparse
+import gzip
+import json
+import re
+
+from index_advisor import FEEDBACK_PATH, advisor_recommendations
+from local_db import format_bytes, psql, query_json, query_value, sql_literal, bench_database_url
+from schema_catalog import build_catalog
+from spec_generators import SPECS_ROOT
+
+WORKLOAD_PATH = SPECS_ROOT / "PERFORMANCE-TOOLS" / "workload.jsonl"
+
+PLAN_COST_SQL = """
+CREATE FUNCTION pg_temp.plan_cost(p_query TEXT, p_generic BOOLEAN)
+RETURNS NUMERIC
+LANGUAGE plpgsql
+AS $$
+DECLARE
+  v_plan JSON;
+BEGIN
+  IF p_generic THEN
+    EXECUTE 'EXPLAIN (GENERIC_PLAN, FORMAT JSON) ' || p_query INTO v_plan;
+  ELSE
+    EXECUTE 'EXPLAIN (FORMAT JSON) ' || p_query INTO v_plan;
+  END IF;
+  RETURN (v_plan->0->'Plan'->>'Total Cost')::NUMERIC;
+EXCEPTION WHEN OTHERS THEN
+  RETURN NULL;
+END;
+$$;
+"""
+
+def open_text(path, mode="r"):
+    """Open a text file, through gzip when it ends in .gz (csv files without newline translation)"""
+    newline = "" if ".csv" in str(path) else None
+    if str(path).endswith(".gz"):
+        return gzip.open(path, mode + "t", encoding="utf-8", newline=newline)
+    return open(path, mode, encoding="utf-8", newline=newline)
+
+def load_workload(path):
+    """Read workload queries, one JSON object per line (gzipped when the file ends in .gz)"""
+    workload = []
+    with open_text(path) as f:
+        for number, line in enumerate(f, 1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                entry = json.loads(line)
+            except json.JSONDecodeError as error:
+                raise SystemExit(f"{path}:{number}: not a JSON workload line ({error})")
+            if not entry.get('query'):
+                raise SystemExit(f"{path}:{number}: workload line without a query")
+            entry.setdefault('params', [])
+            entry['calls'] = int(entry.get('calls') or 1)
+            workload.append(entry)
+    return workload
+
+def param_literal(value):
+    """SQL literal of a JSON parameter value"""
+    if value is None:
+        return "NULL"
+    if isinstance(value, bool):
+        return "TRUE" if value else "FALSE"
+    if isinstance(value, (int, float)):
+        return repr(value)
+    if isinstance(value, (dict, list)):
+        return sql_literal(json.dumps(value))
+    return sql_literal(value)
+
+def bind_params(query, params):
+    """Query text with $1, $2, ... replaced by the literal parameter values"""
+    def replace(match):
+        position = int(match.group(1))
+        if position > len(params):
+            raise ValueError(f"no value for ${position}")
+        return param_literal(params[position - 1])
+    return re.sub(r"\$(\d+)(?!\d)", replace, query)
+
+def plannable(workload):
+    """(query text, generic plan?) per workload entry, None when the params do not fit"""
+    planned = []
+    for entry in workload:
+        try:
+            if entry['params']:
+                planned.append((bind_params(entry['query'], entry['params']), False))
+            else:
+                planned.append((entry['query'], re.search(r"\$\d", entry['query']) is not None))
+        except ValueError:
+            planned.append(None)
+    return planned
+
+def mentions(query, table_name):
+    """Whether a query text refers to the (unqualified) table"""
+    return re.search(rf"(?<!\w){re.escape(table_name)}(?!\w)", query, re.I) is not None
+
+def plan_costs(queries, setup="", size_sql="NULL"):
+    """Plan costs of the queries in one session after setup, with the size_sql value
+
+    Returns (size, [cost or None per query]).
+    """
+    texts = ", ".join(sql_literal(query) for query, _ in queries)
+    generic = ", ".join("TRUE" if is_generic else "FALSE" for _, is_generic in queries)
+    output = psql(f"""
+        {PLAN_COST_SQL}
+        {setup}
+        SELECT json_build_object(
+          'size', {size_sql},
+          'costs', (SELECT COALESCE(json_agg(pg_temp.plan_cost(w.query, w.generic) ORDER BY w.n), '[]'::json)
+                    FROM unnest(ARRAY[{texts}]::TEXT[], ARRAY[{generic}]::BOOLEAN[])
+                         WITH ORDINALITY AS w(query, generic, n))
+        );
+    """)
+    result = json.loads(output)
+    return result['size'], [None if cost is None else float(cost) for cost in result['costs']]
+
+def hypothetical_candidates(schema, extra_indexes, use_advisor, built):
+    """Advisor suggestions, feedback indexes not built yet and --index statements"""
+    candidates = {}
+    for recommendation in advisor_recommendations(schema) if use_advisor else []:
+        candidates[recommendation['index']] = {
+            "name": recommendation['index'],
+            "table": recommendation['table'],
+            "source": "advisor",
+            "statement": f"CREATE INDEX ON {recommendation['table']} ({', '.join(recommendation['columns'])})",
+        }
+    if use_advisor and FEEDBACK_PATH.exists():
+        with open(FEEDBACK_PATH, 'r', encoding='utf-8') as f:
+            feedback = json.load(f)
+        for table_name, indexes in feedback.get('advisor_indexes', {}).items():
+            for index in indexes:
+                if index['name'] in built:
+                    continue
+                candidates.setdefault(index['name'], {
+                    "name": index['name'],
+                    "table": f"{schema}.{table_name}",
+                    "source": f"feedback {index.get('spec') or ''}".strip(),
+                    "statement": f"CREATE INDEX ON {schema}.{table_name} ({', '.join(index['columns'])})",
+                })
+    for number, statement in enumerate(extra_indexes, 1):
+        match = re.match(r"^CREATE\s+INDEX\s+(?:(\w+)\s+)?ON\s+([\w.\"]+)", statement.strip(), re.I)
+        if not match:
+            raise SystemExit(f"--index {statement!r}: expected CREATE INDEX [name] ON table (...)")
+        table = match.group(2).replace('"', '')
+        candidates[match.group(1) or f"manual_{number}"] = {
+            "name": match.group(1) or f"manual_{number}",
+            "table": table if "." in table else f"{schema}.{table}",
+            "source": "--index",
+            "statement": statement,
+        }
+    return list(candidates.values())
+
+def generated_candidates(schema, built):
+    """Built indexes whose CREATE INDEX comes from a phase generator"""
+    candidates = []
+    for table, entry in sorted(build_catalog().items()):
+        if not table.startswith(f"{schema}."):
+            continue
+        for name, index in sorted(entry['indexes'].items()):
+            if index['source'].endswith("(generated)") and name in built:
+                candidates.append({
+                    "name": name,
+                    "table": table,
+                    "source": entry['spec'] or entry['phase'],
+                    "statement": None,
+                })
+    return candidates
+
+def weighted(costs, workload, positions):
+    """calls-weighted cost of the workload queries at positions"""
+    return sum(costs[position] * workload[position]['calls'] for position in positions)
+
+def evaluate(candidate, queries, baseline, workload, schema):
+    """Workload cost of the queries on the candidate's table without and with the index
+
+    Hypothetical indexes are created, built ones hidden; a query that cannot
+    be planned in the candidate's session keeps its baseline cost.
+    """
+    table_name = candidate['table'].split(".")[-1]
+    positions = [position for position, cost in enumerate(baseline)
+                 if cost is not None and mentions(queries[position][0], table_name)]
+    if not positions:
+        return None
+    if candidate['statement']:
+        setup = f"DO $$ BEGIN PERFORM hypopg_create_index({sql_literal(candidate['statement'])}); END $$;"
+        size_sql = "(SELECT SUM(hypopg_relation_size(indexrelid)) FROM hypopg())"
+    else:
+        regclass = f"{sql_literal(schema + '.' + candidate['name'])}::regclass"
+        setup = f"DO $$ BEGIN PERFORM hypopg_hide_index({regclass}); END $$;"
+        size_sql = f"pg_relation_size({regclass})"
+    size, costs = plan_costs([queries[position] for position in positions], setup, size_sql)
+
+    current = {position: baseline[position] for position in positions}
+    changed = {position: baseline[position] if cost is None else cost for position, cost in zip(positions, costs)}
+    without, with_index = (current, changed) if candidate['statement'] else (changed, current)
+    return {
+        **candidate,
+        "size": int(size or 0),
+        "without": weighted(without, workload, positions),
+        "with": weighted(with_index, workload, positions),
+        "improved": sum(1 for position in positions if with_index[position] < without[position]),
+        "queries": len(positions),
+    }
+
+def main():
+    """Main what-if evaluation function"""
+    parser = argparse.ArgumentParser(description="Estimate index effects on a recorded workload with HypoPG")
+    parser.add_argument("--workload", default=str(WORKLOAD_PATH), help="workload JSON lines file")
+    parser.add_argument("--schema", default="public", help="schema of the indexed tables")
+    parser.add_argument("--index", action="append", default=[], help="extra CREATE INDEX statement to evaluate")
+    parser.add_argument("--no-generated", action="store_true", help="skip the indexes the generators emit")
+    parser.add_argument("--no-advisor", action="store_true", help="skip the index advisor suggestions")
+    parser.add_argument("--min-gain", type=float, default=1.0, help="workload cost percent an index must save")
+    args = parser.parse_args()
+
+    print("\n" + "="*70)
+    print("  WHAT-IF INDEX EVALUATION")
+    print(f"  Database: {bench_database_url()}")
+    print("="*70 + "\n")
+
+    if query_value("SELECT COUNT(*) FROM pg_available_extensions WHERE name = 'hypopg'") == "0":
+        print("❌ The hypopg extension is not available on this server")
+        raise SystemExit(1)
+    psql("CREATE EXTENSION IF NOT EXISTS hypopg;")
+
+    workload = load_workload(args.workload)
+    queries = plannable(workload)
+    _, costs = plan_costs([query for query in queries if query is not None])
+    costs = iter(costs)
+    baseline = [None if query is None else next(costs) for query in queries]
+    planned = [position for position, cost in enumerate(baseline) if cost is not None]
+    total = weighted(baseline, workload, planned)
+    print(f"Workload: {len(workload)} queries, {sum(entry['calls'] for entry in workload):,} calls "
+          f"({len(workload) - len(planned)} could not be planned)")
+    print(f"  Baseline workload cost: {total:,.0f}\n")
+    if not total:
+        print("❌ No workload query could be planned")
+        raise SystemExit(1)
+
+    built = {row['indexname'] for row in query_json(f"""
+        SELECT indexname FROM pg_indexes WHERE schemaname = {sql_literal(args.schema)}
+    """)}
+    use_advisor = not args.no_advisor
+    if use_advisor and query_value("SELECT to_regproc('performance.suggest_missing_indexes') IS NOT NULL") != "t":
+        print("⚠️  performance.suggest_missing_indexes() not found (python build_schema_bundle.py --apply): "
+              "advisor suggestions not evaluated")
+        use_advisor = False
+    candidates = hypothetical_candidates(args.schema, args.index, use_advisor, built)
+    if not args.no_generated:
+        if query_value("SELECT to_regproc('hypopg_hide_index') IS NOT NULL") == "t":
+            candidates += generated_candidates(args.schema, built)
+        else:
+            print("⚠️  hypopg_hide_index() needs HypoPG 1.4+: generated indexes not evaluated")
+
+    results = []
+    for candidate in candidates:
+        result = evaluate(candidate, queries, baseline, workload, args.schema)
+        if result is None:
+            continue
+        result['gain'] = (result['without'] - result['with']) / total * 100
+        if candidate['statement']:
+            result['verdict'] = "build" if result['gain'] >= args.min_gain else "skip"
+        else:
+            result['verdict'] = "keep" if result['gain'] >= args.min_gain else "unused"
+        results.append(result)
+
+    if not results:
+        print("No candidate index is on a table the workload queries")
+        print("\n" + "="*70 + "\n")
+        return
+
+    print(f"{'index':40} {'source':20} {'size':>9} {'cost without':>13} {'cost with':>11} "
+          f"{'gain':>7} {'cheaper':>8}  verdict")
+    print("-" * 124)
+    for result in sorted(results, key=lambda r: (-r['gain'], r['name'])):
+        print(f"{result['name'][:40]:40} {result['source'][:20]:20} {format_bytes(result['size']):>9} "
+              f"{result['without']:>13,.0f} {result['with']:>11,.0f} {result['gain']:>6.1f}% "
+              f"{result['improved']:>4}/{result['queries']:<4} {result['verdict']}")
+
+    verdicts = {}
+    for result in results:
+        verdicts.setdefault(result['verdict'], []).append(result['name'])
+    print()
+    for verdict in ("build", "skip", "keep", "unused"):
+        if verdict in verdicts:
+            print(f"  {verdict:7} {len(verdicts[verdict]):3}  {', '.join(sorted(verdicts[verdict]))}")
+    if "build" in verdicts:
+        print("\nAccept the advisor ones worth building with python index_advisor.py --accept <names> --write-feedback")
+    print("\n" + "="*70 + "\n")
+
+if __name__ == "__main__":
+    main()
@@ -44,6 +44,88 @@ This specification defines comprehensive audit logging triggers for the School M
 -- Description: Comprehensive audit logging triggers for all operations
 -- ==============================================
 
+-- ==============================================
+-- AUDIT LOG TABLE
+-- ==============================================
+
+-- Every audit function below writes here. Range partitioned by month so
+-- bulk writes append to one small partition, and retention drops or archives
+-- whole expired partitions (audit.cleanup_old_logs, audit.archive_old_logs)
+-- instead of deleting rows.
+CREATE TABLE IF NOT EXISTS security_audit_log (
+  id UUID NOT NULL DEFAULT gen_random_uuid(),
+  tenant_id UUID,
+  user_id UUID,
+  action VARCHAR(100) NOT NULL,
+  resource_type VARCHAR(100),
+  resource_id TEXT,
+  details JSONB DEFAULT '{}',
+  severity VARCHAR(20) DEFAULT 'info',
+  ip_address TEXT,
+  user_agent TEXT,
+  session_id TEXT,
+  old_values JSONB,
+  new_values JSONB,
+  changed_fields JSONB,
+  created_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+  PRIMARY KEY (id, created_at)
+) PARTITION BY RANGE (created_at);
+
+-- Catches rows outside the monthly partitions instead of failing the write
+CREATE TABLE IF NOT EXISTS security_audit_log_default
+  PARTITION OF security_audit_log DEFAULT;
+
+CREATE INDEX IF NOT EXISTS idx_security_audit_log_tenant_created
+  ON security_audit_log(tenant_id, created_at DESC);
+CREATE INDEX IF NOT EXISTS idx_security_audit_log_resource
+  ON security_audit_log(resource_type, resource_id);
+
+-- Create the monthly partitions from this month to p_months_ahead months out.
+-- Run it monthly from the maintenance job: a month that has already spilled
+-- into the default partition cannot get its own partition afterwards.
+CREATE OR REPLACE FUNCTION audit.ensure_log_partitions(
+  p_months_ahead INTEGER DEFAULT 3
+)
+RETURNS INTEGER AS $$
+DECLARE
+  parent_schema TEXT;
+  month_start DATE;
+  partition_name TEXT;
+  created_count INTEGER := 0;
+BEGIN
+  SELECT n.nspname INTO parent_schema
+  FROM pg_class c
+  JOIN pg_namespace n ON n.oid = c.relnamespace
+  WHERE c.oid = 'security_audit_log'::regclass;
+
+  FOR month_start IN
+    SELECT generate_series(
+      date_trunc('month', NOW()),
+      date_trunc('month', NOW()) + make_interval(months => p_months_ahead),
+      INTERVAL '1 month'
+    )::DATE
+  LOOP
+    partition_name := 'security_audit_log_' || to_char(month_start, 'YYYY_MM');
+
+    IF to_regclass(format('%I.%I', parent_schema, partition_name)) IS NULL THEN
+      EXECUTE format(
+        'CREATE TABLE %I.%I PARTITION OF %I.security_audit_log FOR VALUES FROM (%L) TO (%L)',
+        parent_schema, partition_name, parent_schema,
+        month_start, (month_start + INTERVAL '1 month')::DATE
+      );
+      created_count := created_count + 1;
+    END IF;
+  END LOOP;
+
+  RETURN created_count;
+END;
+$$ LANGUAGE plpgsql;
+
+DO $$
+BEGIN
+  PERFORM audit.ensure_log_partitions();
+END $$;
+
 -- ==============================================
 -- AUDIT UTILITY FUNCTIONS
 -- ==============================================
@@ -101,38 +183,38 @@ BEGIN
 END;
 $$ LANGUAGE plpgsql;
 
--- Function to determine operation severity
+-- Function to determine operation severity (a single SQL expression, so the
+-- planner inlines it into the statement-level audit INSERT ... SELECT)
 CREATE OR REPLACE FUNCTION audit.determine_operation_severity(
   p_table_name TEXT,
   p_operation TEXT,
   p_changed_fields JSONB DEFAULT NULL
 )
 RETURNS TEXT AS $$
-BEGIN
-  -- Critical operations
-  IF p_table_name IN ('users', 'staff', 'tenants') AND p_operation = 'DELETE' THEN
-    RETURN 'critical';
-  END IF;
-  
-  -- High severity operations
-  IF p_table_name IN ('payments', 'fees', 'grades') THEN
-    RETURN 'high';
-  END IF;
-  
-  -- High severity for sensitive field changes
-  IF p_changed_fields ? 'password' OR p_changed_fields ? 'email' OR p_changed_fields ? 'salary' THEN
-    RETURN 'high';
-  END IF;
-  
-  -- Warning for important tables
-  IF p_table_name IN ('students', 'staff', 'classes', 'subjects') THEN
-    RETURN 'warning';
-  END IF;
-  
-  -- Default to info
-  RETURN 'info';
-END;
-$$ LANGUAGE plpgsql;
+  SELECT CASE
+    -- Critical operations
+    WHEN p_table_name IN ('users', 'staff', 'tenants') AND p_operation = 'DELETE' THEN 'critical'
+    -- High severity operations
+    WHEN p_table_name IN ('payments', 'fees', 'grades') THEN 'high'
+    -- High severity for sensitive field changes
+    WHEN p_changed_fields ?| ARRAY['password', 'email', 'salary'] THEN 'high'
+    -- Warning for important tables
+    WHEN p_table_name IN ('students', 'staff', 'classes', 'subjects') THEN 'warning'
+    -- Default to info
+    ELSE 'info'
+  END;
+$$ LANGUAGE sql IMMUTABLE;
+
+-- Function to list the fields masked in audit records of a table
+CREATE OR REPLACE FUNCTION audit.get_sensitive_fields(p_table_name TEXT)
+RETURNS TEXT[] AS $$
+  SELECT CASE p_table_name
+    WHEN 'users' THEN ARRAY['password_hash', 'password', 'ssn', 'tax_id']
+    WHEN 'staff' THEN ARRAY['salary', 'ssn', 'tax_id', 'bank_account']
+    WHEN 'payments' THEN ARRAY['card_number', 'account_number', 'routing_number']
+    ELSE ARRAY['password', 'password_hash', 'ssn', 'tax_id']
+  END;
+$$ LANGUAGE sql IMMUTABLE;
 
 -- Function to get user context
 CREATE OR REPLACE FUNCTION audit.get_user_context()
@@ -184,38 +266,30 @@ BEGIN
   user_context := audit.get_user_context();
   
   -- Define sensitive fields per table
-  CASE TG_TABLE_NAME
-    WHEN 'users' THEN
-      sensitive_fields := ARRAY['password_hash', 'password', 'ssn', 'tax_id'];
-    WHEN 'staff' THEN
-      sensitive_fields := ARRAY['salary', 'ssn', 'tax_id', 'bank_account'];
-    WHEN 'payments' THEN
-      sensitive_fields := ARRAY['card_number', 'account_number', 'routing_number'];
-    ELSE
-      sensitive_fields := ARRAY['password', 'password_hash', 'ssn', 'tax_id'];
-  END CASE;
-  
-  -- Handle different operations
+  sensitive_fields := audit.get_sensitive_fields(TG_TABLE_NAME);
+
+  -- Handle different operations (ids are read from the JSONB copy: a
+  -- NEW.student_id reference fails on tables without that column)
   CASE operation_type
     WHEN 'INSERT' THEN
       new_data := to_jsonb(NEW);
-      resource_id := COALESCE(NEW.id::TEXT, NEW.student_id, NEW.employee_id, 'unknown');
+      resource_id := COALESCE(new_data ->> 'id', new_data ->> 'student_id', new_data ->> 'employee_id', 'unknown');
       changed_fields := '{"action": "created"}'::jsonb;
-      
+
     WHEN 'UPDATE' THEN
       old_data := to_jsonb(OLD);
       new_data := to_jsonb(NEW);
-      resource_id := COALESCE(NEW.id::TEXT, NEW.student_id, NEW.employee_id, OLD.id::TEXT);
+      resource_id := COALESCE(new_data ->> 'id', new_data ->> 'student_id', new_data ->> 'employee_id', old_data ->> 'id');
       changed_fields := audit.extract_changed_fields(OLD, NEW, sensitive_fields);
-      
+
       -- Skip if no meaningful changes
-      IF jsonb_object_keys(changed_fields) IS NULL THEN
+      IF changed_fields = '{}'::jsonb THEN
         RETURN COALESCE(NEW, OLD);
       END IF;
-      
+
     WHEN 'DELETE' THEN
       old_data := to_jsonb(OLD);
-      resource_id := COALESCE(OLD.id::TEXT, OLD.student_id, OLD.employee_id, 'unknown');
+      resource_id := COALESCE(old_data ->> 'id', old_data ->> 'student_id', old_data ->> 'employee_id', 'unknown');
       changed_fields := '{"action": "deleted"}'::jsonb;
       
   END CASE;
@@ -258,11 +332,187 @@ BEGIN
     new_data,
     changed_fields
   );
-  
+
   RETURN COALESCE(NEW, OLD);
 END;
 $$ LANGUAGE plpgsql;
 
+-- ==============================================
+-- STATEMENT-LEVEL AUDIT MODE
+-- ==============================================
+
+-- Batched alternative to log_table_changes() for tables written in bulk
+-- (imports, a class's attendance at once). Runs once per statement and writes
+-- every affected row's audit record with a single INSERT ... SELECT over the
+-- transition tables: the user context, the sensitive field list and the
+-- insert/delete severity are resolved once, and update diffs are computed
+-- set-based. Records match the row-level ones; updated rows are paired on id.
+CREATE OR REPLACE FUNCTION audit.log_statement_changes()
+RETURNS TRIGGER AS $$
+DECLARE
+  v_context JSONB;
+  v_sensitive TEXT[];
+  v_action TEXT;
+  v_details JSONB;
+  v_severity TEXT;
+BEGIN
+  v_context := audit.get_user_context();
+  v_sensitive := audit.get_sensitive_fields(TG_TABLE_NAME);
+  v_action := lower(TG_TABLE_NAME) || '_' || lower(TG_OP);
+  v_details := jsonb_build_object(
+    'table', TG_TABLE_NAME,
+    'operation', TG_OP,
+    'timestamp', NOW(),
+    'context', v_context,
+    'audit_mode', 'statement'
+  );
+
+  CASE TG_OP
+    WHEN 'INSERT' THEN
+      v_severity := audit.determine_operation_severity(TG_TABLE_NAME, TG_OP, '{"action": "created"}'::jsonb);
+
+      INSERT INTO security_audit_log (
+        tenant_id, user_id, action, resource_type, resource_id, details, severity,
+        ip_address, user_agent, session_id, old_values, new_values, changed_fields
+      )
+      SELECT
+        (v_context ->> 'tenant_id')::UUID,
+        (v_context ->> 'user_id')::UUID,
+        v_action,
+        TG_TABLE_NAME,
+        COALESCE(r.doc ->> 'id', r.doc ->> 'student_id', r.doc ->> 'employee_id', 'unknown'),
+        v_details,
+        v_severity,
+        v_context ->> 'ip_address',
+        v_context ->> 'user_agent',
+        v_context ->> 'session_id',
+        NULL,
+        r.doc,
+        '{"action": "created"}'::jsonb
+      FROM (SELECT to_jsonb(n) AS doc FROM new_rows n) r;
+
+    WHEN 'UPDATE' THEN
+      INSERT INTO security_audit_log (
+        tenant_id, user_id, action, resource_type, resource_id, details, severity,
+        ip_address, user_agent, session_id, old_values, new_values, changed_fields
+      )
+      SELECT
+        (v_context ->> 'tenant_id')::UUID,
+        (v_context ->> 'user_id')::UUID,
+        v_action,
+        TG_TABLE_NAME,
+        COALESCE(n.doc ->> 'id', n.doc ->> 'student_id', n.doc ->> 'employee_id', o.doc ->> 'id'),
+        v_details,
+        audit.determine_operation_severity(TG_TABLE_NAME, TG_OP, c.fields),
+        v_context ->> 'ip_address',
+        v_context ->> 'user_agent',
+        v_context ->> 'session_id',
+        o.doc,
+        n.doc,
+        c.fields
+      FROM (SELECT to_jsonb(r) AS doc FROM old_rows r) o
+      JOIN (SELECT to_jsonb(r) AS doc FROM new_rows r) n ON n.doc -> 'id' = o.doc -> 'id'
+      CROSS JOIN LATERAL (
+        -- Same shape and masking as audit.extract_changed_fields()
+        SELECT jsonb_object_agg(f.key, jsonb_build_object(
+          'old_value', CASE WHEN f.key = ANY(v_sensitive)
+            THEN utils.mask_sensitive_data(o.doc ->> f.key, 'full') ELSE o.doc ->> f.key END,
+          'new_value', CASE WHEN f.key = ANY(v_sensitive)
+            THEN utils.mask_sensitive_data(f.value, 'full') ELSE f.value END
+        )) AS fields
+        FROM jsonb_each_text(n.doc) f
+        WHERE f.value IS DISTINCT FROM o.doc ->> f.key
+      ) c
+      -- Skip rows without meaningful changes
+      WHERE c.fields IS NOT NULL;
+
+    WHEN 'DELETE' THEN
+      v_severity := audit.determine_operation_severity(TG_TABLE_NAME, TG_OP, '{"action": "deleted"}'::jsonb);
+
+      INSERT INTO security_audit_log (
+        tenant_id, user_id, action, resource_type, resource_id, details, severity,
+        ip_address, user_agent, session_id, old_values, new_values, changed_fields
+      )
+      SELECT
+        (v_context ->> 'tenant_id')::UUID,
+        (v_context ->> 'user_id')::UUID,
+        v_action,
+        TG_TABLE_NAME,
+        COALESCE(r.doc ->> 'id', r.doc ->> 'student_id', r.doc ->> 'employee_id', 'unknown'),
+        v_details,
+        v_severity,
+        v_context ->> 'ip_address',
+        v_context ->> 'user_agent',
+        v_context ->> 'session_id',
+        r.doc,
+        NULL,
+        '{"action": "deleted"}'::jsonb
+      FROM (SELECT to_jsonb(o) AS doc FROM old_rows o) r;
+  END CASE;
+
+  RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Function to switch a table between the audit modes: 'row' runs
+-- log_table_changes() per row, 'statement' runs log_statement_changes() once
+-- per statement. A transition table trigger takes a single event, so the
+-- statement mode uses one trigger per operation; all of them keep the
+-- trigger_audit_<table> prefix.
+CREATE OR REPLACE FUNCTION audit.set_audit_mode(
+  p_table REGCLASS,
+  p_mode TEXT
+)
+RETURNS VOID AS $$
+DECLARE
+  table_name TEXT;
+  trigger_name TEXT;
+BEGIN
+  IF p_mode NOT IN ('row', 'statement') THEN
+    RAISE EXCEPTION 'Unknown audit mode: % (expected row or statement)', p_mode;
+  END IF;
+
+  IF p_mode = 'statement' AND NOT EXISTS (
+    SELECT 1 FROM pg_attribute
+    WHERE attrelid = p_table AND attname = 'id' AND NOT attisdropped
+  ) THEN
+    RAISE EXCEPTION 'Statement-level audit pairs updated rows on id, which % does not have', p_table;
+  END IF;
+
+  SELECT relname INTO table_name FROM pg_class WHERE oid = p_table;
+
+  -- Drop whichever mode is installed
+  FOREACH trigger_name IN ARRAY ARRAY['', '_insert', '_update', '_delete']
+  LOOP
+    EXECUTE format('DROP TRIGGER IF EXISTS %I ON %s', 'trigger_audit_' || table_name || trigger_name, p_table);
+  END LOOP;
+
+  IF p_mode = 'row' THEN
+    EXECUTE format(
+      'CREATE TRIGGER %I AFTER INSERT OR UPDATE OR DELETE ON %s
+       FOR EACH ROW EXECUTE FUNCTION audit.log_table_changes()',
+      'trigger_audit_' || table_name, p_table
+    );
+  ELSE
+    EXECUTE format(
+      'CREATE TRIGGER %I AFTER INSERT ON %s REFERENCING NEW TABLE AS new_rows
+       FOR EACH STATEMENT EXECUTE FUNCTION audit.log_statement_changes()',
+      'trigger_audit_' || table_name || '_insert', p_table
+    );
+    EXECUTE format(
+      'CREATE TRIGGER %I AFTER UPDATE ON %s REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+       FOR EACH STATEMENT EXECUTE FUNCTION audit.log_statement_changes()',
+      'trigger_audit_' || table_name || '_update', p_table
+    );
+    EXECUTE format(
+      'CREATE TRIGGER %I AFTER DELETE ON %s REFERENCING OLD TABLE AS old_rows
+       FOR EACH STATEMENT EXECUTE FUNCTION audit.log_statement_changes()',
+      'trigger_audit_' || table_name || '_delete', p_table
+    );
+  END IF;
+END;
+$$ LANGUAGE plpgsql;
+
 -- ==============================================
 -- SPECIALIZED AUDIT FUNCTIONS
 -- ==============================================
@@ -458,17 +708,19 @@ CREATE TRIGGER trigger_audit_subjects
   FOR EACH ROW
   EXECUTE FUNCTION audit.log_table_changes();
 
--- Grades table audit
-CREATE TRIGGER trigger_audit_grades
-  AFTER INSERT OR UPDATE OR DELETE ON grades
-  FOR EACH ROW
-  EXECUTE FUNCTION audit.log_table_changes();
-
--- Attendance table audit
-CREATE TRIGGER trigger_audit_attendance
-  AFTER INSERT OR UPDATE OR DELETE ON attendance
-  FOR EACH ROW
-  EXECUTE FUNCTION audit.log_table_changes();
+-- Grades and attendance table audit: written a class or an import at a
+-- time, so they use the statement-level mode
+DO $$
+DECLARE
+  bulk_table TEXT;
+BEGIN
+  FOREACH bulk_table IN ARRAY ARRAY['grades', 'attendance']
+  LOOP
+    IF to_regclass(bulk_table) IS NOT NULL THEN
+      PERFORM audit.set_audit_mode(bulk_table::regclass, 'statement');
+    END IF;
+  END LOOP;
+END $$;
 
 -- Fees table audit
 CREATE TRIGGER trigger_audit_fees
@@ -588,7 +840,25 @@ CREATE TRIGGER trigger_audit_fees_access
 -- AUDIT DATA CLEANUP AND MAINTENANCE
 -- ==============================================
 
--- Function to clean old audit logs
+-- Monthly partitions of security_audit_log that ended before the cutoff, so
+-- retention works month by month: a month is kept until all of it expired
+CREATE OR REPLACE FUNCTION audit.expired_log_partitions(
+  p_cutoff TIMESTAMP WITH TIME ZONE
+)
+RETURNS TABLE(partition_schema TEXT, partition_name TEXT, month_start DATE) AS $$
+  SELECT n.nspname::TEXT, c.relname::TEXT, to_date(right(c.relname, 7), 'YYYY_MM')
+  FROM pg_inherits i
+  JOIN pg_class c ON c.oid = i.inhrelid
+  JOIN pg_namespace n ON n.oid = c.relnamespace
+  WHERE i.inhparent = 'security_audit_log'::regclass
+    AND c.relname ~ '^security_audit_log_\d{4}_\d{2}$'
+    AND to_date(right(c.relname, 7), 'YYYY_MM') + INTERVAL '1 month' <= p_cutoff
+  ORDER BY 3;
+$$ LANGUAGE sql STABLE;
+
+-- Function to clean old audit logs: expired monthly partitions are dropped
+-- whole; only rows that landed in the default partition are deleted, in
+-- batches keyed on the full primary key
 CREATE OR REPLACE FUNCTION audit.cleanup_old_logs(
   p_retention_days INTEGER DEFAULT 2555, -- 7 years default
   p_batch_size INTEGER DEFAULT 1000
@@ -598,18 +868,26 @@ DECLARE
   deleted_count INTEGER := 0;
   batch_deleted INTEGER;
   cutoff_date TIMESTAMP WITH TIME ZONE;
+  expired RECORD;
 BEGIN
-  cutoff_date := NOW() - INTERVAL '%s days' % p_retention_days;
-  
+  cutoff_date := NOW() - make_interval(days => p_retention_days);
+
+  FOR expired IN SELECT * FROM audit.expired_log_partitions(cutoff_date)
   LOOP
-    DELETE FROM security_audit_log
-    WHERE created_at < cutoff_date
-      AND id IN (
-        SELECT id FROM security_audit_log
-        WHERE created_at < cutoff_date
-        ORDER BY created_at
-        LIMIT p_batch_size
-      );
+    EXECUTE format('SELECT COUNT(*) FROM %I.%I', expired.partition_schema, expired.partition_name)
+      INTO batch_deleted;
+    EXECUTE format('DROP TABLE %I.%I', expired.partition_schema, expired.partition_name);
+    deleted_count := deleted_count + batch_deleted;
+  END LOOP;
+
+  LOOP
+    DELETE FROM security_audit_log_default
+    WHERE (id, created_at) IN (
+      SELECT id, created_at FROM security_audit_log_default
+      WHERE created_at < cutoff_date
+      ORDER BY created_at
+      LIMIT p_batch_size
+    );
     
     GET DIAGNOSTICS batch_deleted = ROW_COUNT;
     deleted_count := deleted_count + batch_deleted;
@@ -624,7 +902,11 @@ BEGIN
 END;
 $$ LANGUAGE plpgsql;
 
--- Function to archive audit logs
+-- Function to archive audit logs: expired monthly partitions are detached
+-- and attached to the archive as they are, without copying rows. Rows of the
+-- default partition are moved in batches into the archive's default
+-- partition; their months never get partitions of their own, so later
+-- attaches do not collide with them
 CREATE OR REPLACE FUNCTION audit.archive_old_logs(
   p_archive_days INTEGER DEFAULT 365,
   p_batch_size INTEGER DEFAULT 1000
@@ -634,25 +916,43 @@ DECLARE
   archived_count INTEGER := 0;
   batch_count INTEGER;
   cutoff_date TIMESTAMP WITH TIME ZONE;
+  expired RECORD;
 BEGIN
-  cutoff_date := NOW() - INTERVAL '%s days' % p_archive_days;
+  cutoff_date := NOW() - make_interval(days => p_archive_days);
   
   -- Create archive table if not exists
   CREATE TABLE IF NOT EXISTS security_audit_log_archive (
     LIKE security_audit_log INCLUDING ALL
-  );
+  ) PARTITION BY RANGE (created_at);
+  CREATE TABLE IF NOT EXISTS security_audit_log_archive_default
+    PARTITION OF security_audit_log_archive DEFAULT;
+
+  FOR expired IN SELECT * FROM audit.expired_log_partitions(cutoff_date)
+  LOOP
+    EXECUTE format('SELECT COUNT(*) FROM %I.%I', expired.partition_schema, expired.partition_name)
+      INTO batch_count;
+    EXECUTE format(
+      'ALTER TABLE security_audit_log DETACH PARTITION %I.%I',
+      expired.partition_schema, expired.partition_name
+    );
+    EXECUTE format(
+      'ALTER TABLE security_audit_log_archive ATTACH PARTITION %I.%I FOR VALUES FROM (%L) TO (%L)',
+      expired.partition_schema, expired.partition_name,
+      expired.month_start, (expired.month_start + INTERVAL '1 month')::DATE
+    );
+    archived_count := archived_count + batch_count;
+  END LOOP;
   
   LOOP
-    -- Move old records to archive
+    -- Move old records of the default partition to the archive
     WITH moved_records AS (
-      DELETE FROM security_audit_log
-      WHERE created_at < cutoff_date
-        AND id IN (
-          SELECT id FROM security_audit_log
-          WHERE created_at < cutoff_date
-          ORDER BY created_at
-          LIMIT p_batch_size
-        )
+      DELETE FROM security_audit_log_default
+      WHERE (id, created_at) IN (
+        SELECT id, created_at FROM security_audit_log_default
+        WHERE created_at < cutoff_date
+        ORDER BY created_at
+        LIMIT p_batch_size
+      )
       RETURNING *
     )
     INSERT INTO security_audit_log_archive
@@ -733,7 +1033,9 @@ $$ LANGUAGE plpgsql;
 GRANT EXECUTE ON FUNCTION audit.extract_changed_fields(RECORD, RECORD, TEXT[]) TO authenticated;
 GRANT EXECUTE ON FUNCTION audit.determine_operation_severity(TEXT, TEXT, JSONB) TO authenticated;
 GRANT EXECUTE ON FUNCTION audit.get_user_context() TO authenticated;
+GRANT EXECUTE ON FUNCTION audit.get_sensitive_fields(TEXT) TO authenticated;
 GRANT EXECUTE ON FUNCTION audit.log_table_changes() TO authenticated;
+GRANT EXECUTE ON FUNCTION audit.log_statement_changes() TO authenticated;
 GRANT EXECUTE ON FUNCTION audit.log_authentication_event(UUID, TEXT, BOOLEAN, JSONB) TO authenticated;
 GRANT EXECUTE ON FUNCTION audit.log_data_access(TEXT, TEXT, TEXT, JSONB) TO authenticated;
 GRANT EXECUTE ON FUNCTION audit.log_system_operation(TEXT, TEXT, BOOLEAN, JSONB) TO authenticated;
@@ -788,6 +1090,8 @@ END $$;
 - [x] Sensitive data masking in audit logs
 - [x] Operation severity determination
 - [x] User context capture and logging
+- [x] Statement-level audit mode with transition tables
+- [x] Per-table switch between row and statement mode
 
 ### Specialized Audit Features
 - [x] Authentication event logging
@@ -804,6 +1108,7 @@ END $$;
 - [x] Security tables (roles, permissions) audit
 
 ### Maintenance and Reporting
+- [x] Monthly partitioned audit log with default partition
 - [x] Audit log cleanup functions
 - [x] Audit log archival system
 - [x] Audit summary reporting
@@ -817,7 +1122,7 @@ END $$;
 ### Coverage Statistics
 - **Tables with Audit**: 15+ critical tables
 - **Audit Triggers**: 20+ automated triggers
-- **Audit Functions**: 12 specialized functions
+- **Audit Functions**: 16 specialized functions
 - **Data Types**: All CRUD operations logged
 
 ### Audit Categories
@@ -829,6 +1134,8 @@ END $$;
 
 ### Performance Features
 - **Optimized Logging**: Minimal performance impact
+- **Statement-Level Mode**: One batched audit INSERT per statement for bulk-written tables
+- **Partitioned Log**: Monthly partitions of `security_audit_log`
 - **Batch Processing**: Efficient cleanup operations
 - **Selective Masking**: Sensitive data protection
 - **Context Capture**: Complete operation context
@@ -878,8 +1185,21 @@ SELECT audit.log_system_operation(
 );
 ```
 
+### Bulk-Written Tables
+```sql
+-- Audit a table once per statement (one INSERT ... SELECT over the
+-- transition tables) instead of once per row
+SELECT audit.set_audit_mode('attendance', 'statement');
+
+-- Back to one audit call per row
+SELECT audit.set_audit_mode('attendance', 'row');
+```
+
 ### Audit Maintenance
 ```sql
+-- Create the monthly audit log partitions for the next 3 months
+SELECT audit.ensure_log_partitions(3);
+
 -- Cleanup old audit logs (older than 7 years)
 SELECT audit.cleanup_old_logs(2555);
 
@@ -939,6 +1259,9 @@ await supabase.rpc('audit.log_data_access', {
 
 ### Optimization Strategies
 - **Efficient Triggers**: Minimal processing overhead
+- **Statement-Level Audit**: Bulk imports pay for one trigger call and one
+  audit INSERT per statement; compare both modes with
+  `python PERFORMANCE-TOOLS/benchmark_audit_triggers.py`
 - **Batch Operations**: Cleanup and archival in batches
 - **Selective Logging**: Only meaningful changes logged
 - **Index Optimization**: Fast queries on audit data
@@ -957,4 +1280,4 @@ await supabase.rpc('audit.log_data_access', {
 **Compliance Ready**: FERPA, SOX, GDPR, PCI DSS  
 **Performance**: Optimized with minimal impact  
 
-This specification provides a comprehensive audit logging system that automatically tracks all data changes, user activities, and system operations while maintaining high performance and compliance with regulatory requirements.
\ No newline at end of file
+This specification provides a comprehensive audit logging system that automatically tracks all data changes, user activities, and system operations while maintaining high performance and compliance with regulatory requirements.
\ No newline at end of file
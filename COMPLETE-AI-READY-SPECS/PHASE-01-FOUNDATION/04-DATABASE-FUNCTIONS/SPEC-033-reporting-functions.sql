@@ -865,6 +865,17 @@ $$ LANGUAGE plpgsql;
 -- EXPORT FUNCTIONS
 -- ==============================================
 
+-- One CSV field: quoted (doubling embedded quotes) only when it contains a
+-- delimiter, quote or line break; NULL becomes an empty field
+CREATE OR REPLACE FUNCTION reports.csv_field(p_value TEXT)
+RETURNS TEXT AS $$
+  SELECT CASE
+    WHEN p_value IS NULL THEN ''
+    WHEN p_value ~ '[",\r\n]' THEN '"' || replace(p_value, '"', '""') || '"'
+    ELSE p_value
+  END;
+$$ LANGUAGE sql IMMUTABLE;
+
 -- Function to export report data in various formats
 CREATE OR REPLACE FUNCTION reports.export_report_data(
   p_report_type VARCHAR(50),
@@ -877,9 +888,6 @@ DECLARE
   tenant_filter UUID;
   report_data JSONB;
   csv_output TEXT;
-  header_row TEXT;
-  data_row TEXT;
-  record_item JSONB;
 BEGIN
   tenant_filter := COALESCE(p_tenant_id, auth.get_current_tenant_id());
   
@@ -918,28 +926,26 @@ BEGIN
       RETURN report_data::TEXT;
       
     WHEN 'csv' THEN
-      -- Simple CSV conversion (this is a basic implementation)
-      -- In production, you'd want more sophisticated CSV handling
-      csv_output := '';
-      
-      -- This is a simplified CSV export - you'd need to implement
-      -- specific CSV formatting for each report type
-      FOR record_item IN SELECT * FROM jsonb_array_elements(report_data)
-      LOOP
-        IF csv_output = '' THEN
-          -- Create header row from first record
-          SELECT string_agg(key, ',') INTO header_row
-          FROM jsonb_object_keys(record_item) AS key;
-          csv_output := header_row || E'\n';
-        END IF;
-        
-        -- Create data row
-        SELECT string_agg(COALESCE(value::TEXT, ''), ',') INTO data_row
-        FROM jsonb_each_text(record_item);
-        csv_output := csv_output || data_row || E'\n';
-      END LOOP;
-      
-      RETURN csv_output;
+      -- One set-based pass over the report's items, quoted per RFC 4180 (the
+      -- row-by-row TEXT concatenation this replaces was quadratic). The result
+      -- is still a single value built in memory, so this is for small
+      -- synchronous reports: large exports are report jobs, streamed with
+      -- COPY (reports.report_query(...)) TO STDOUT WITH CSV
+      WITH items AS (
+        SELECT value AS item, ordinality AS n
+        FROM jsonb_array_elements(
+          CASE jsonb_typeof(report_data) WHEN 'array' THEN report_data ELSE jsonb_build_array(report_data) END
+        ) WITH ORDINALITY
+      )
+      SELECT
+        (SELECT string_agg(reports.csv_field(key), ',') FROM jsonb_object_keys((SELECT item FROM items WHERE n = 1)) AS key)
+        || E'\n'
+        || string_agg((SELECT string_agg(reports.csv_field(value), ',') FROM jsonb_each_text(item)), E'\n' ORDER BY n)
+        || E'\n'
+      INTO csv_output
+      FROM items;
+
+      RETURN COALESCE(csv_output, '');
       
     ELSE
       RAISE EXCEPTION 'Unsupported format: %', p_format;
@@ -947,6 +953,296 @@ BEGIN
 END;
 $$ LANGUAGE plpgsql;
 
+-- ==============================================
+-- ASYNC REPORT JOBS
+-- ==============================================
+
+-- Heavy reports and exports are queued here and built by report workers
+-- (PERFORMANCE-TOOLS/report_worker.py locally) instead of inside the request
+CREATE TABLE IF NOT EXISTS reports.report_jobs (
+  id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
+  tenant_id UUID,
+  branch_id UUID,
+  requested_by UUID NOT NULL REFERENCES auth.users(id),
+  report_type VARCHAR(50) NOT NULL,
+  parameters JSONB NOT NULL DEFAULT '{}'::jsonb,
+  format VARCHAR(10) NOT NULL DEFAULT 'csv' CHECK (format IN ('csv', 'json')),
+  status VARCHAR(20) NOT NULL DEFAULT 'queued' CHECK (status IN ('queued', 'running', 'succeeded', 'failed')),
+  priority SMALLINT NOT NULL DEFAULT 0,
+  attempts SMALLINT NOT NULL DEFAULT 0,
+  max_attempts SMALLINT NOT NULL DEFAULT 3,
+  run_after TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT NOW(),
+  locked_by TEXT,
+  locked_until TIMESTAMP WITH TIME ZONE,
+  rows_written BIGINT NOT NULL DEFAULT 0,
+  result_path TEXT,
+  byte_size BIGINT,
+  error TEXT,
+  created_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT NOW(),
+  started_at TIMESTAMP WITH TIME ZONE,
+  finished_at TIMESTAMP WITH TIME ZONE
+);
+
+-- Workers only look at runnable jobs: queued ones, and running ones whose
+-- lease may have expired; finished jobs drop out of the index
+CREATE INDEX IF NOT EXISTS idx_report_jobs_runnable
+  ON reports.report_jobs (priority DESC, run_after)
+  WHERE status IN ('queued', 'running');
+
+CREATE INDEX IF NOT EXISTS idx_report_jobs_requested_by
+  ON reports.report_jobs (requested_by, created_at DESC);
+
+ALTER TABLE reports.report_jobs ENABLE ROW LEVEL SECURITY;
+
+-- Users follow their own jobs (polling or Realtime). Jobs are only created
+-- through enqueue_report_job() and only changed by workers
+CREATE POLICY report_jobs_owner_select ON reports.report_jobs
+  FOR SELECT USING (requested_by = auth.uid());
+
+-- Realtime pushes each job's progress and completion to its requester
+ALTER PUBLICATION supabase_realtime ADD TABLE reports.report_jobs;
+
+-- Tables a 'table_export' job may export; each report spec registers its own
+CREATE TABLE IF NOT EXISTS reports.exportable_tables (
+  table_name TEXT PRIMARY KEY
+);
+
+-- Finished files: private bucket, one folder per requester, downloaded through
+-- signed URLs
+INSERT INTO storage.buckets (id, name, public)
+VALUES ('reports', 'reports', false)
+ON CONFLICT (id) DO NOTHING;
+
+CREATE POLICY reports_bucket_owner_select ON storage.objects
+  FOR SELECT USING (
+    bucket_id = 'reports'
+    AND (storage.foldername(name))[1] = auth.uid()::TEXT
+  );
+
+-- The SQL text of a report as one plain query with real columns, for workers
+-- to stream with COPY (query) TO STDOUT WITH CSV or through a cursor. Nothing
+-- is materialized: rows go out as the executor produces them, so exports run
+-- in flat memory at any size. SECURITY INVOKER on purpose: workers run the
+-- query as the requester, so RLS scopes the export exactly like the original
+-- request
+CREATE OR REPLACE FUNCTION reports.report_query(
+  p_report_type VARCHAR(50),
+  p_parameters JSONB DEFAULT '{}'::jsonb
+)
+RETURNS TEXT AS $$
+DECLARE
+  tenant_filter UUID;
+  column_list TEXT;
+BEGIN
+  tenant_filter := auth.get_current_tenant_id();
+
+  CASE p_report_type
+    WHEN 'table_export' THEN
+      IF NOT EXISTS (
+        SELECT 1 FROM reports.exportable_tables WHERE table_name = p_parameters->>'table'
+      ) THEN
+        RAISE EXCEPTION 'Table is not exportable: %', p_parameters->>'table';
+      END IF;
+
+      SELECT string_agg(quote_ident(attname), ', ' ORDER BY attnum) INTO column_list
+      FROM pg_attribute
+      WHERE attrelid = format('public.%I', p_parameters->>'table')::regclass
+        AND attnum > 0
+        AND NOT attisdropped
+        AND attname <> 'search_vector';
+
+      RETURN format(
+        'SELECT %s FROM public.%I ORDER BY created_at, id',
+        column_list, p_parameters->>'table'
+      );
+
+    -- One row per attendance record (attendance_report is the aggregated view)
+    WHEN 'attendance_export' THEN
+      RETURN format(
+        'SELECT a.attendance_date, s.student_id AS student_number, u.full_name AS student_name, '
+        '  c.name AS class_name, a.status '
+        'FROM attendance a '
+        'JOIN students s ON a.student_id = s.id '
+        'JOIN users u ON s.user_id = u.id '
+        'JOIN classes c ON s.class_id = c.id '
+        'WHERE a.tenant_id = %L '
+        '  AND a.attendance_date BETWEEN %L AND %L '
+        '  AND (%L::UUID IS NULL OR s.class_id = %L::UUID) '
+        'ORDER BY a.attendance_date, s.student_id',
+        tenant_filter,
+        COALESCE((p_parameters->>'start_date')::DATE, CURRENT_DATE - 30),
+        COALESCE((p_parameters->>'end_date')::DATE, CURRENT_DATE),
+        p_parameters->>'class_id',
+        p_parameters->>'class_id'
+      );
+
+    -- Summary reports are a single row of JSONB sections
+    WHEN 'student_academic' THEN
+      RETURN format(
+        'SELECT * FROM reports.student_academic_report(%L::UUID, %L, %L, %L::UUID)',
+        p_parameters->>'student_id', p_parameters->>'academic_year', p_parameters->>'semester', tenant_filter
+      );
+
+    WHEN 'financial_summary' THEN
+      RETURN format(
+        'SELECT * FROM reports.financial_summary_report(%L::DATE, %L::DATE, %L::UUID)',
+        p_parameters->>'start_date', p_parameters->>'end_date', tenant_filter
+      );
+
+    WHEN 'attendance_report' THEN
+      RETURN format(
+        'SELECT * FROM reports.attendance_report(%L::UUID, %L::DATE, %L::DATE, %L::UUID)',
+        p_parameters->>'class_id', p_parameters->>'start_date', p_parameters->>'end_date', tenant_filter
+      );
+
+    ELSE
+      RAISE EXCEPTION 'Unknown report type: %', p_report_type;
+  END CASE;
+END;
+$$ LANGUAGE plpgsql STABLE;
+
+-- Rows of a report, one JSONB object each, for clients that want the rows
+-- rather than a file
+CREATE OR REPLACE FUNCTION reports.report_rows(
+  p_report_type VARCHAR(50),
+  p_parameters JSONB DEFAULT '{}'::jsonb
+)
+RETURNS SETOF JSONB AS $$
+BEGIN
+  RETURN QUERY EXECUTE format(
+    'SELECT to_jsonb(q) FROM (%s) q',
+    reports.report_query(p_report_type, p_parameters)
+  );
+END;
+$$ LANGUAGE plpgsql;
+
+-- Queue a report for the current user; returns at once with the job id
+CREATE OR REPLACE FUNCTION reports.enqueue_report_job(
+  p_report_type VARCHAR(50),
+  p_parameters JSONB DEFAULT '{}'::jsonb,
+  p_format VARCHAR(10) DEFAULT 'csv'
+)
+RETURNS UUID AS $$
+DECLARE
+  job_id UUID;
+BEGIN
+  IF auth.uid() IS NULL THEN
+    RAISE EXCEPTION 'Not authenticated';
+  END IF;
+
+  IF p_report_type NOT IN ('table_export', 'attendance_export', 'student_academic', 'financial_summary', 'attendance_report') THEN
+    RAISE EXCEPTION 'Unknown report type: %', p_report_type;
+  END IF;
+
+  INSERT INTO reports.report_jobs (tenant_id, branch_id, requested_by, report_type, parameters, format)
+  VALUES (
+    auth.get_current_tenant_id(),
+    NULLIF(current_setting('app.current_branch_id', true), '')::UUID,
+    auth.uid(),
+    p_report_type,
+    p_parameters,
+    p_format
+  )
+  RETURNING id INTO job_id;
+
+  RETURN job_id;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER SET search_path = public;
+
+-- Claim up to p_limit runnable jobs for one worker. SKIP LOCKED lets any
+-- number of workers poll at once without blocking on, or double-claiming, the
+-- same rows. A job whose worker died is claimed again once its lease expires,
+-- until max_attempts is used up
+CREATE OR REPLACE FUNCTION reports.claim_report_jobs(
+  p_worker TEXT,
+  p_limit INTEGER DEFAULT 1,
+  p_lease INTERVAL DEFAULT '5 minutes'
+)
+RETURNS SETOF reports.report_jobs AS $$
+  UPDATE reports.report_jobs
+  SET status = 'failed',
+      error = COALESCE(error, 'Worker lease expired'),
+      locked_by = NULL,
+      locked_until = NULL,
+      finished_at = NOW()
+  WHERE status = 'running'
+    AND locked_until < NOW()
+    AND attempts >= max_attempts;
+
+  UPDATE reports.report_jobs j
+  SET status = 'running',
+      locked_by = p_worker,
+      locked_until = NOW() + p_lease,
+      attempts = j.attempts + 1,
+      started_at = COALESCE(j.started_at, NOW())
+  WHERE j.id IN (
+    SELECT id
+    FROM reports.report_jobs
+    WHERE (status = 'queued' AND run_after <= NOW())
+       OR (status = 'running' AND locked_until < NOW())
+    ORDER BY priority DESC, run_after
+    LIMIT p_limit
+    FOR UPDATE SKIP LOCKED
+  )
+  RETURNING j.*;
+$$ LANGUAGE sql SECURITY DEFINER SET search_path = public;
+
+-- Extend a running job's lease and publish its progress. Returns NULL once
+-- the job is no longer this worker's (lease lost), which should stop it
+CREATE OR REPLACE FUNCTION reports.heartbeat_report_job(
+  p_job_id UUID,
+  p_worker TEXT,
+  p_rows_written BIGINT,
+  p_lease INTERVAL DEFAULT '5 minutes'
+)
+RETURNS BOOLEAN AS $$
+  UPDATE reports.report_jobs
+  SET locked_until = NOW() + p_lease,
+      rows_written = p_rows_written
+  WHERE id = p_job_id AND status = 'running' AND locked_by = p_worker
+  RETURNING true;
+$$ LANGUAGE sql SECURITY DEFINER SET search_path = public;
+
+CREATE OR REPLACE FUNCTION reports.complete_report_job(
+  p_job_id UUID,
+  p_worker TEXT,
+  p_result_path TEXT,
+  p_rows_written BIGINT,
+  p_byte_size BIGINT
+)
+RETURNS BOOLEAN AS $$
+  UPDATE reports.report_jobs
+  SET status = 'succeeded',
+      result_path = p_result_path,
+      rows_written = p_rows_written,
+      byte_size = p_byte_size,
+      error = NULL,
+      locked_by = NULL,
+      locked_until = NULL,
+      finished_at = NOW()
+  WHERE id = p_job_id AND status = 'running' AND locked_by = p_worker
+  RETURNING true;
+$$ LANGUAGE sql SECURITY DEFINER SET search_path = public;
+
+-- A failed attempt is retried after 30s, 60s, 120s... until max_attempts,
+-- then the job fails for good
+CREATE OR REPLACE FUNCTION reports.fail_report_job(
+  p_job_id UUID,
+  p_worker TEXT,
+  p_error TEXT
+)
+RETURNS BOOLEAN AS $$
+  UPDATE reports.report_jobs
+  SET status = CASE WHEN attempts < max_attempts THEN 'queued' ELSE 'failed' END,
+      run_after = NOW() + INTERVAL '30 seconds' * power(2, attempts - 1),
+      error = p_error,
+      locked_by = NULL,
+      locked_until = NULL,
+      finished_at = CASE WHEN attempts < max_attempts THEN NULL ELSE NOW() END
+  WHERE id = p_job_id AND status = 'running' AND locked_by = p_worker
+  RETURNING true;
+$$ LANGUAGE sql SECURITY DEFINER SET search_path = public;
+
 -- ==============================================
 -- GRANT PERMISSIONS
 -- ==============================================
@@ -958,8 +1254,24 @@ GRANT EXECUTE ON FUNCTION reports.financial_summary_report(DATE, DATE, UUID) TO
 GRANT EXECUTE ON FUNCTION reports.attendance_report(UUID, DATE, DATE, UUID) TO authenticated;
 GRANT EXECUTE ON FUNCTION reports.staff_performance_report(UUID, VARCHAR, UUID) TO authenticated;
 GRANT EXECUTE ON FUNCTION reports.dashboard_overview(UUID) TO authenticated;
+GRANT EXECUTE ON FUNCTION reports.csv_field(TEXT) TO authenticated;
 GRANT EXECUTE ON FUNCTION reports.export_report_data(VARCHAR, JSONB, VARCHAR, UUID) TO authenticated;
 
+-- Report jobs: users enqueue and read their own jobs; workers run the report
+-- as the requester and manage the queue with the service role
+GRANT SELECT ON reports.report_jobs TO authenticated;
+GRANT EXECUTE ON FUNCTION reports.enqueue_report_job(VARCHAR, JSONB, VARCHAR) TO authenticated;
+GRANT EXECUTE ON FUNCTION reports.report_query(VARCHAR, JSONB) TO authenticated;
+GRANT EXECUTE ON FUNCTION reports.report_rows(VARCHAR, JSONB) TO authenticated;
+REVOKE EXECUTE ON FUNCTION reports.claim_report_jobs(TEXT, INTEGER, INTERVAL) FROM PUBLIC;
+REVOKE EXECUTE ON FUNCTION reports.heartbeat_report_job(UUID, TEXT, BIGINT, INTERVAL) FROM PUBLIC;
+REVOKE EXECUTE ON FUNCTION reports.complete_report_job(UUID, TEXT, TEXT, BIGINT, BIGINT) FROM PUBLIC;
+REVOKE EXECUTE ON FUNCTION reports.fail_report_job(UUID, TEXT, TEXT) FROM PUBLIC;
+GRANT EXECUTE ON FUNCTION reports.claim_report_jobs(TEXT, INTEGER, INTERVAL) TO service_role;
+GRANT EXECUTE ON FUNCTION reports.heartbeat_report_job(UUID, TEXT, BIGINT, INTERVAL) TO service_role;
+GRANT EXECUTE ON FUNCTION reports.complete_report_job(UUID, TEXT, TEXT, BIGINT, BIGINT) TO service_role;
+GRANT EXECUTE ON FUNCTION reports.fail_report_job(UUID, TEXT, TEXT) TO service_role;
+
 -- ==============================================
 -- REPORTING SYSTEM VALIDATION
 -- ==============================================
@@ -982,6 +1294,7 @@ BEGIN
   RAISE NOTICE 'Staff reports: Performance metrics, teaching load';
   RAISE NOTICE 'Dashboard functions: Real-time overview data';
   RAISE NOTICE 'Export capabilities: JSON, CSV format support';
+  RAISE NOTICE 'Report jobs: queued exports built by workers (SKIP LOCKED)';
 END $$;
 ```
 
@@ -1026,11 +1339,19 @@ END $$;
 
 ### Export Capabilities
 - [x] JSON format export
-- [x] CSV format export
+- [x] CSV format export (set-based, RFC 4180 quoting)
 - [x] Flexible parameter handling
 - [x] Report type routing
 - [x] Format validation
 
+### Async Report Jobs
+- [x] report_jobs queue drained with FOR UPDATE SKIP LOCKED
+- [x] Worker leases with retry and exponential backoff
+- [x] Report rows streamed in chunks under the requester's RLS
+- [x] CSV exports streamed with COPY (report_query) TO STDOUT in flat memory
+- [x] Private reports bucket with per-user signed downloads
+- [x] Progress and completion pushed over Realtime, polling fallback
+
 ---
 
 ## 📊 REPORTING SYSTEM METRICS
@@ -1041,7 +1362,8 @@ END $$;
 - **Attendance Reports**: 1 multi-faceted function
 - **Staff Reports**: 1 performance function
 - **Dashboard Reports**: 1 overview function
-- **Export Functions**: 1 flexible export function
+- **Export Functions**: 2 export functions (export_report_data, report_query) and the csv_field helper
+- **Report Job Functions**: 5 queue functions (enqueue, claim, heartbeat, complete, fail)
 
 ### Data Coverage
 - **Student Data**: Academic performance, attendance, behavior
@@ -1126,6 +1448,58 @@ const { data: csvData } = await supabase.rpc('reports.export_report_data', {
 });
 ```
 
+### Async Report Jobs
+`export_report_data` builds the whole report inside the request. Large reports and exports go through the job queue instead: the request only stores the job, a worker streams the file to the `reports` bucket, and the client follows the job.
+
+```sql
+-- Queue an export (returns the job id immediately)
+SELECT reports.enqueue_report_job(
+  'attendance_report',
+  '{"class_id": "class-uuid", "start_date": "2024-10-01", "end_date": "2024-10-31"}',
+  'csv'
+);
+
+-- Every attendance record of a class, one CSV row each
+SELECT reports.enqueue_report_job(
+  'attendance_export',
+  '{"class_id": "class-uuid", "start_date": "2024-09-01", "end_date": "2025-06-30"}',
+  'csv'
+);
+
+-- Export every row of a registered table the requester can see
+INSERT INTO reports.exportable_tables (table_name) VALUES ('fee_payments') ON CONFLICT DO NOTHING;
+SELECT reports.enqueue_report_job('table_export', '{"table": "fee_payments"}', 'csv');
+```
+
+Workers never build a report in a PL/pgSQL variable. `reports.report_query()` returns the report as one plain query, which is streamed straight out of the executor:
+
+```sql
+-- psql, as the requester (what report_worker.py runs for a CSV job)
+SELECT reports.report_query('attendance_export', '{"class_id": "class-uuid"}') AS report_query \gset
+COPY (:report_query) TO STDOUT WITH (FORMAT csv, HEADER);
+```
+
+```typescript
+// Shared client module: /lib/supabase/report-jobs.ts (SHARED-CLIENT-MODULES.md)
+import { enqueueReport, getReportDownloadUrl, waitForReportJob } from '@/lib/supabase/report-jobs';
+
+const jobId = await enqueueReport(supabase, 'financial_summary', {
+  start_date: '2024-10-01',
+  end_date: '2024-10-31'
+});
+const job = await waitForReportJob(supabase, jobId, (job) => setRowsWritten(job.rowsWritten));
+if (job.status === 'succeeded') {
+  window.location.assign(await getReportDownloadUrl(supabase, job));
+}
+```
+
+```bash
+# Local worker pool (writes to PERFORMANCE-TOOLS/report-exports/)
+python PERFORMANCE-TOOLS/report_worker.py --workers 4
+```
+
+The `reports` schema must be listed in the API's exposed schemas (`supabase/config.toml`, `[api] schemas`) for `supabase.schema('reports')`.
+
 ---
 
 ## 🎯 PERFORMANCE OPTIMIZATION
@@ -1144,7 +1518,8 @@ const { data: csvData } = await supabase.rpc('reports.export_report_data', {
 
 ### Scalability
 - **Pagination**: Large reports support pagination
-- **Background Processing**: Heavy reports can run asynchronously
+- **Background Processing**: Heavy reports run as report jobs (`reports.report_jobs`), off the request path
+- **Streaming Exports**: CSV files stream through `COPY (report_query) TO STDOUT`; a 1M-row attendance export runs in flat memory (`PERFORMANCE-TOOLS/benchmark_report_export.py`)
 - **Data Archival**: Historical data moved to optimized storage
 - **Resource Management**: Monitor and limit resource usage
 
@@ -1156,4 +1531,4 @@ const { data: csvData } = await supabase.rpc('reports.export_report_data', {
 **Export Formats**: JSON, CSV  
 **Performance**: Optimized with caching support  
 
-This specification provides a comprehensive reporting system that covers all major aspects of school management with flexible filtering, multiple output formats, and performance-optimized queries for data-driven decision making.
\ No newline at end of file
+This specification provides a comprehensive reporting system that covers all major aspects of school management with flexible filtering, multiple output formats, and performance-optimized queries for data-driven decision making.
\ No newline at end of file
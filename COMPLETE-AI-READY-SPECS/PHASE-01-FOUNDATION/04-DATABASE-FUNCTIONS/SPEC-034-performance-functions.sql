@@ -249,15 +249,16 @@ BEGIN
       WHERE c.conrelid = table_record.table_oid
         AND c.contype = 'f'  -- Foreign key constraints
         AND NOT EXISTS (
+          -- Only an index leading with the column serves lookups on it
           SELECT 1 FROM pg_index i
           WHERE i.indrelid = table_record.table_oid
-            AND a.attnum = ANY(i.indkey)
+            AND i.indkey[0] = a.attnum
         )
     LOOP
       RETURN QUERY SELECT 
         table_record.table_name,
-        format('CREATE INDEX idx_%s_%s ON %s (%s)', 
-               table_record.table_name, column_record.column_name,
+        format('CREATE INDEX %I ON %I (%I)',
+               'idx_' || table_record.table_name || '_' || column_record.column_name,
                table_record.table_name, column_record.column_name),
         format('Foreign key column %s lacks index', column_record.column_name),
         'High - improves JOIN performance';
@@ -275,13 +276,13 @@ BEGIN
         AND NOT EXISTS (
           SELECT 1 FROM pg_index i
           WHERE i.indrelid = table_record.table_oid
-            AND a.attnum = ANY(i.indkey)
+            AND i.indkey[0] = a.attnum
         )
     LOOP
       RETURN QUERY SELECT 
         table_record.table_name,
-        format('CREATE INDEX idx_%s_%s ON %s (%s)', 
-               table_record.table_name, column_record.column_name,
+        format('CREATE INDEX %I ON %I (%I)',
+               'idx_' || table_record.table_name || '_' || column_record.column_name,
                table_record.table_name, column_record.column_name),
         format('Commonly queried column %s lacks index', column_record.column_name),
         'Medium - improves WHERE clause performance';
@@ -305,8 +306,8 @@ DECLARE
   index_sql TEXT;
 BEGIN
   FOR rec IN 
-    SELECT * FROM performance.suggest_missing_indexes(p_schema_name)
-    WHERE estimated_benefit IN ('High', 'Medium')
+    SELECT * FROM performance.suggest_missing_indexes(p_schema_name) s
+    WHERE split_part(s.estimated_benefit, ' ', 1) IN ('High', 'Medium')
   LOOP
     index_sql := rec.suggested_index;
     
@@ -496,9 +497,102 @@ BEGIN
 END;
 $$ LANGUAGE plpgsql;
 
--- Function to warm up cache for critical tables
+-- Hot block snapshots: the shared buffer contents warm_cache() reloads
+-- after a restart (what autoprewarm keeps in autoprewarm.blocks), stored as
+-- ranges of consecutive blocks per relation and fork
+CREATE SEQUENCE IF NOT EXISTS performance.cache_snapshot_seq;
+
+CREATE TABLE IF NOT EXISTS performance.cache_snapshot_blocks (
+  snapshot_id BIGINT NOT NULL,
+  captured_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+  relation_name TEXT NOT NULL,
+  relation_kind CHAR(1) NOT NULL,
+  fork_name TEXT NOT NULL,
+  first_block BIGINT NOT NULL,
+  last_block BIGINT NOT NULL,
+  usage_count NUMERIC NOT NULL,
+  PRIMARY KEY (snapshot_id, relation_name, fork_name, first_block)
+);
+
+-- Function to snapshot which relation blocks are hot in shared buffers.
+-- Schedule it (every 5 minutes from pg_cron or the maintenance job) so a
+-- recent snapshot exists whenever the server restarts.
+CREATE OR REPLACE FUNCTION performance.snapshot_hot_blocks(
+  p_min_usage_count INTEGER DEFAULT 1,
+  p_keep_snapshots INTEGER DEFAULT 3
+)
+RETURNS TABLE(
+  snapshot_id BIGINT,
+  relations INTEGER,
+  block_ranges INTEGER,
+  blocks BIGINT
+) AS $$
+DECLARE
+  v_snapshot_id BIGINT := nextval('performance.cache_snapshot_seq');
+BEGIN
+  INSERT INTO performance.cache_snapshot_blocks (
+    snapshot_id, relation_name, relation_kind, fork_name, first_block, last_block, usage_count
+  )
+  SELECT
+    v_snapshot_id,
+    hot.relation_name,
+    hot.relkind,
+    hot.fork_name,
+    MIN(hot.block),
+    MAX(hot.block),
+    ROUND(AVG(hot.usagecount), 2)
+  FROM (
+    SELECT
+      format('%I.%I', n.nspname, c.relname) AS relation_name,
+      c.relkind,
+      (ARRAY['main', 'fsm', 'vm'])[b.relforknumber + 1] AS fork_name,
+      b.relblocknumber AS block,
+      b.usagecount,
+      -- Consecutive blocks share an island number
+      b.relblocknumber - ROW_NUMBER() OVER (
+        PARTITION BY c.oid, b.relforknumber ORDER BY b.relblocknumber
+      ) AS island
+    FROM pg_buffercache b
+    JOIN pg_database d ON d.oid = b.reldatabase AND d.datname = current_database()
+    JOIN pg_class c ON pg_relation_filenode(c.oid) = b.relfilenode
+      AND COALESCE(NULLIF(c.reltablespace, 0), d.dattablespace) = b.reltablespace
+    JOIN pg_namespace n ON n.oid = c.relnamespace
+    WHERE b.relforknumber <= 2
+      AND b.usagecount >= p_min_usage_count
+      AND c.relkind IN ('r', 'i', 'm', 't')
+  ) hot
+  GROUP BY hot.relation_name, hot.relkind, hot.fork_name, hot.island;
+
+  DELETE FROM performance.cache_snapshot_blocks s
+  WHERE s.snapshot_id <= v_snapshot_id - GREATEST(p_keep_snapshots, 1);
+
+  RETURN QUERY
+  SELECT
+    v_snapshot_id,
+    COUNT(DISTINCT s.relation_name)::INTEGER,
+    COUNT(*)::INTEGER,
+    COALESCE(SUM(s.last_block - s.first_block + 1), 0)::BIGINT
+  FROM performance.cache_snapshot_blocks s
+  WHERE s.snapshot_id = v_snapshot_id;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Function to warm up the cache after a restart. Replaces reading whole
+-- tables (which skipped indexes and evicted other hot data) with pg_prewarm
+-- of exactly the blocks the latest snapshot_hot_blocks() snapshot found hot:
+-- indexes first, then by usage count, up to p_max_blocks (default: three
+-- quarters of shared_buffers). With p_tenant_id, that tenant's ranges of
+-- every index leading with tenant_id are read before the snapshot. Without
+-- a snapshot yet, only the indexes of the critical tables are loaded.
+-- Where pg_prewarm is in shared_preload_libraries, autoprewarm restores its
+-- own dump at startup; this works without server configuration, after a
+-- failover and per tenant.
+DROP FUNCTION IF EXISTS performance.warm_cache(TEXT[]);
+
 CREATE OR REPLACE FUNCTION performance.warm_cache(
-  p_table_names TEXT[] DEFAULT NULL
+  p_table_names TEXT[] DEFAULT NULL,
+  p_tenant_id UUID DEFAULT NULL,
+  p_max_blocks BIGINT DEFAULT NULL
 )
 RETURNS TABLE(
   table_name TEXT,
@@ -507,38 +601,127 @@ RETURNS TABLE(
   status TEXT
 ) AS $$
 DECLARE
-  tbl_name TEXT;
-  pages INTEGER;
-  table_size BIGINT;
+  v_block_size BIGINT := current_setting('block_size')::BIGINT;
+  v_budget BIGINT;
+  v_snapshot_id BIGINT;
+  v_seqscan TEXT := current_setting('enable_seqscan');
+  v_bitmapscan TEXT := current_setting('enable_bitmapscan');
+  v_loaded JSONB := '{}'::jsonb;
+  v_fetched BIGINT;
+  v_relation REGCLASS;
+  v_last_block BIGINT;
+  v_pages BIGINT;
+  rel RECORD;
 BEGIN
-  -- Get critical tables if not specified
-  IF p_table_names IS NULL THEN
-    p_table_names := ARRAY['users', 'students', 'staff', 'classes', 'subjects', 'tenants'];
+  SELECT COALESCE(p_max_blocks, setting::BIGINT * 3 / 4) INTO v_budget
+  FROM pg_settings WHERE name = 'shared_buffers';
+
+  -- 1. The tenant's index ranges: an index-only walk of each tenant_id index
+  IF p_tenant_id IS NOT NULL THEN
+    PERFORM set_config('enable_seqscan', 'off', true);
+    PERFORM set_config('enable_bitmapscan', 'off', true);
+
+    FOR rel IN
+      SELECT DISTINCT i.indrelid::regclass AS table_oid
+      FROM pg_index i
+      JOIN pg_attribute a ON a.attrelid = i.indrelid AND a.attnum = i.indkey[0]
+      JOIN pg_class t ON t.oid = i.indrelid
+      JOIN pg_namespace n ON n.oid = t.relnamespace
+      WHERE a.attname = 'tenant_id'
+        AND i.indisvalid
+        AND n.nspname NOT IN ('pg_catalog', 'information_schema')
+        AND (p_table_names IS NULL OR t.relname = ANY(p_table_names))
+    LOOP
+      SELECT COALESCE(SUM(pg_stat_get_xact_blocks_fetched(i.indexrelid)), 0) INTO v_fetched
+      FROM pg_index i WHERE i.indrelid = rel.table_oid;
+
+      EXECUTE format('SELECT COUNT(*) FROM %s WHERE tenant_id = %L', rel.table_oid, p_tenant_id);
+
+      SELECT COALESCE(SUM(pg_stat_get_xact_blocks_fetched(i.indexrelid)), 0) - v_fetched INTO v_pages
+      FROM pg_index i WHERE i.indrelid = rel.table_oid;
+
+      v_budget := v_budget - v_pages;
+      RETURN QUERY SELECT
+        rel.table_oid::TEXT,
+        v_pages::INTEGER,
+        pg_size_pretty(v_pages * v_block_size),
+        'Tenant index range loaded'::TEXT;
+    END LOOP;
+
+    PERFORM set_config('enable_seqscan', v_seqscan, true);
+    PERFORM set_config('enable_bitmapscan', v_bitmapscan, true);
   END IF;
-  
-  FOREACH tbl_name IN ARRAY p_table_names
+
+  SELECT MAX(s.snapshot_id) INTO v_snapshot_id FROM performance.cache_snapshot_blocks s;
+
+  -- 2. No snapshot yet: the critical tables' indexes, never their heaps
+  IF v_snapshot_id IS NULL THEN
+    FOR rel IN
+      SELECT i.indexrelid::regclass AS index_oid
+      FROM pg_index i
+      JOIN pg_class t ON t.oid = i.indrelid
+      WHERE t.relname = ANY(COALESCE(
+        p_table_names,
+        ARRAY['users', 'students', 'staff', 'classes', 'subjects', 'tenants']
+      ))
+        AND t.relnamespace = 'public'::regnamespace
+        AND i.indisvalid
+      ORDER BY pg_relation_size(i.indexrelid)
+    LOOP
+      v_last_block := LEAST(pg_relation_size(rel.index_oid) / v_block_size, v_budget) - 1;
+      CONTINUE WHEN v_last_block < 0;
+      v_pages := pg_prewarm(rel.index_oid, 'buffer', 'main', 0, v_last_block);
+      v_budget := v_budget - v_pages;
+      RETURN QUERY SELECT
+        rel.index_oid::TEXT,
+        v_pages::INTEGER,
+        pg_size_pretty(v_pages * v_block_size),
+        'Index loaded (no snapshot yet)'::TEXT;
+    END LOOP;
+    RETURN;
+  END IF;
+
+  -- 3. Replay the snapshot, indexes and hottest ranges first
+  FOR rel IN
+    SELECT s.relation_name, s.fork_name, s.first_block, s.last_block
+    FROM performance.cache_snapshot_blocks s
+    LEFT JOIN pg_index i ON i.indexrelid = to_regclass(s.relation_name)
+    WHERE s.snapshot_id = v_snapshot_id
+      AND to_regclass(s.relation_name) IS NOT NULL
+      AND (p_table_names IS NULL OR (
+        SELECT c.relname FROM pg_class c
+        WHERE c.oid = COALESCE(i.indrelid, to_regclass(s.relation_name))
+      ) = ANY(p_table_names))
+    ORDER BY (s.relation_kind = 'i') DESC, s.usage_count DESC, s.relation_name, s.fork_name, s.first_block
   LOOP
-    -- Check if table exists
-    IF NOT EXISTS (SELECT 1 FROM pg_tables WHERE tablename = tbl_name) THEN
-      RETURN QUERY SELECT tbl_name, 0, '0 bytes', 'Table not found';
-      CONTINUE;
-    END IF;
-    
-    -- Get table size
-    SELECT pg_relation_size(tbl_name::regclass) INTO table_size;
-    
-    -- Perform a sequential scan to load pages into cache
-    EXECUTE format('SELECT COUNT(*) FROM %I', tbl_name);
-    
-    -- Estimate pages loaded (8KB per page)
-    pages := (table_size / 8192)::INTEGER;
-    
-    RETURN QUERY SELECT 
-      tbl_name, 
-      pages, 
-      pg_size_pretty(table_size), 
-      'Cache warmed'::TEXT;
+    EXIT WHEN v_budget <= 0;
+    v_relation := to_regclass(rel.relation_name);
+
+    -- The relation may have shrunk since the snapshot
+    v_last_block := LEAST(
+      rel.last_block,
+      pg_relation_size(v_relation, rel.fork_name) / v_block_size - 1,
+      rel.first_block + v_budget - 1
+    );
+    CONTINUE WHEN v_last_block < rel.first_block;
+
+    v_pages := pg_prewarm(v_relation, 'buffer', rel.fork_name, rel.first_block, v_last_block);
+    v_budget := v_budget - v_pages;
+    v_loaded := jsonb_set(
+      v_loaded,
+      ARRAY[rel.relation_name],
+      to_jsonb(COALESCE((v_loaded ->> rel.relation_name)::BIGINT, 0) + v_pages)
+    );
   END LOOP;
+
+  RETURN QUERY
+  SELECT
+    l.key,
+    l.value::INTEGER,
+    pg_size_pretty(l.value::BIGINT * v_block_size),
+    format('Snapshot %s blocks reloaded', v_snapshot_id)
+  FROM jsonb_each_text(v_loaded) l
+  ORDER BY l.value::BIGINT DESC;
 END;
 $$ LANGUAGE plpgsql;
 
@@ -729,7 +912,8 @@ GRANT EXECUTE ON FUNCTION performance.create_recommended_indexes(TEXT, BOOLEAN)
 GRANT EXECUTE ON FUNCTION performance.get_database_health_metrics() TO authenticated;
 GRANT EXECUTE ON FUNCTION performance.get_table_statistics(TEXT) TO authenticated;
 GRANT EXECUTE ON FUNCTION performance.analyze_buffer_cache() TO authenticated;
-GRANT EXECUTE ON FUNCTION performance.warm_cache(TEXT[]) TO authenticated;
+GRANT EXECUTE ON FUNCTION performance.snapshot_hot_blocks(INTEGER, INTEGER) TO authenticated;
+GRANT EXECUTE ON FUNCTION performance.warm_cache(TEXT[], UUID, BIGINT) TO authenticated;
 GRANT EXECUTE ON FUNCTION performance.auto_maintenance(NUMERIC, INTEGER, BOOLEAN) TO authenticated;
 GRANT EXECUTE ON FUNCTION performance.get_performance_recommendations() TO authenticated;
 
@@ -745,6 +929,15 @@ EXCEPTION WHEN OTHERS THEN
   RAISE NOTICE 'pg_stat_statements extension could not be created. Manual installation may be required.';
 END $$;
 
+-- Buffer inspection and block prewarming for the cache management functions
+DO $$
+BEGIN
+  CREATE EXTENSION IF NOT EXISTS pg_buffercache;
+  CREATE EXTENSION IF NOT EXISTS pg_prewarm;
+EXCEPTION WHEN OTHERS THEN
+  RAISE NOTICE 'pg_buffercache/pg_prewarm extensions could not be created. Cache snapshots and warming need them.';
+END $$;
+
 -- ==============================================
 -- PERFORMANCE SYSTEM VALIDATION
 -- ==============================================
@@ -804,7 +997,8 @@ END $$;
 
 ### Cache Management
 - [x] Buffer cache usage analysis
-- [x] Cache warm-up functions for critical tables
+- [x] Hot block snapshots of shared buffers
+- [x] Snapshot replay with pg_prewarm after restarts, tenant index ranges first
 - [x] Cache hit ratio optimization
 - [x] Memory utilization recommendations
 - [x] Cache performance tuning
@@ -831,7 +1025,7 @@ END $$;
 - **Query Analysis**: 2 functions for query performance monitoring
 - **Index Management**: 3 functions for index optimization
 - **Health Monitoring**: 2 functions for database health tracking
-- **Cache Management**: 2 functions for cache optimization
+- **Cache Management**: 3 functions for cache optimization
 - **Maintenance**: 1 function for automated maintenance
 - **Recommendations**: 1 function for performance recommendations
 
@@ -872,6 +1066,10 @@ SELECT * FROM performance.suggest_missing_indexes('public');
 
 -- Create recommended indexes (dry run first)
 SELECT * FROM performance.create_recommended_indexes('public', true);
+
+-- Generated tables: accept recommendations into the phase generators
+-- instead, so the generated schemas carry them
+-- python PERFORMANCE-TOOLS/index_advisor.py --write-feedback
 ```
 
 ### Health Monitoring
@@ -888,8 +1086,14 @@ SELECT * FROM performance.get_table_statistics('public');
 -- Analyze buffer cache usage
 SELECT * FROM performance.analyze_buffer_cache();
 
--- Warm cache for critical tables
-SELECT * FROM performance.warm_cache(ARRAY['users', 'students', 'classes']);
+-- Snapshot the hot blocks (schedule every 5 minutes)
+SELECT * FROM performance.snapshot_hot_blocks();
+
+-- After a restart: reload the latest snapshot
+SELECT * FROM performance.warm_cache();
+
+-- Same, loading one tenant's index ranges first
+SELECT * FROM performance.warm_cache(p_tenant_id => 'tenant-uuid');
 ```
 
 ### Automated Maintenance
@@ -943,6 +1147,7 @@ const { data: maintenanceResults } = await supabase.rpc('performance.auto_mainte
 - **Memory Optimization**: Shared buffer and cache configuration tuning
 - **Connection Pooling**: Connection usage monitoring and recommendations
 - **Disk I/O Optimization**: Reducing disk reads through better caching
+- **Cache Warming**: Hot block snapshots reloaded with pg_prewarm after restarts instead of whole-table scans
 - **CPU Utilization**: Query optimization to reduce CPU overhead
 
 ### Maintenance Automation
@@ -976,9 +1181,9 @@ const { data: maintenanceResults } = await supabase.rpc('performance.auto_mainte
 ---
 
 **Implementation Status**: ✅ COMPLETE  
-**Function Count**: 11 performance functions  
+**Function Count**: 12 performance functions  
 **Monitoring Coverage**: Query, Index, Health, Cache, Maintenance  
 **Automation**: Intelligent recommendations and maintenance  
 **Integration**: Application-ready performance monitoring  
 
-This specification provides a comprehensive performance optimization system that automatically monitors, analyzes, and optimizes database performance while providing actionable recommendations for continuous improvement of the School Management SaaS platform.
\ No newline at end of file
+This specification provides a comprehensive performance optimization system that automatically monitors, analyzes, and optimizes database performance while providing actionable recommendations for continuous improvement of the School Management SaaS platform.
\ No newline at end of file
@@ -9,6 +9,12 @@ from pathlib import Path
 # Base directory
 BASE_DIR = Path(r"e:\My SaaS Project\FInal Plan\Master Plan\tasks\COMPLETE-AI-READY-SPECS\PHASE-06-ACADEMIC-STAFF")
 
+# Reports in this category are queued as SPEC-033 report jobs, not built in the request
+REPORT_JOB_CATEGORY = "Reports & Analytics"
+
+# Messages and notifications in this category go through the notification outbox
+NOTIFICATION_CATEGORY = "Communication"
+
 # Specification definitions
 SPECIFICATIONS = {
     "01-TEACHER-PORTAL": [
@@ -285,6 +291,62 @@ SPECIFICATIONS = {
     ]
 }
 
+def generate_report_jobs_section(spec):
+    """Generate the report job usage section of report specs"""
+    if spec['category'] != REPORT_JOB_CATEGORY:
+        return ""
+    return """
+### Report Jobs (`/lib/supabase/report-jobs.ts`)
+
+Reports are generated off the request path: the page only queues a SPEC-033 report job, a report worker streams the file to the private `reports` bucket, and the page follows the job (Realtime, with polling as fallback) until it can offer the download.
+
+```typescript
+import type { SupabaseClient } from '@supabase/supabase-js';
+import { enqueueReport, getReportDownloadUrl, waitForReportJob, type ReportJob } from '@/lib/supabase/report-jobs';
+
+// Report types: 'student_academic', 'financial_summary', 'attendance_report',
+// or 'table_export' of a table registered in reports.exportable_tables
+export async function generateReport(
+  supabase: SupabaseClient,
+  reportType: string,
+  parameters: Record<string, unknown>,
+  onProgress: (job: ReportJob) => void
+): Promise<string> {
+  const jobId = await enqueueReport(supabase, reportType, parameters, 'csv');
+  const job = await waitForReportJob(supabase, jobId, onProgress);
+  if (job.status === 'failed') throw new Error(job.error ?? 'Report generation failed');
+  return getReportDownloadUrl(supabase, job);
+}
+```
+
+---
+"""
+
+def generate_notification_outbox_section(spec):
+    """Generate the notification outbox usage section of communication specs"""
+    if spec['category'] != NOTIFICATION_CATEGORY:
+        return ""
+    return """
+### Notification Outbox
+
+Messages and notifications are never sent from the request. They are queued in `notification_outbox` in the same transaction as the change that causes them, and dispatchers deliver them in batches: coalesced into one message per recipient and channel, and held to each channel's rate limit (`notification_channel_limits`). The outbox is shared with the notification specs of Phases 8-10; `enqueue_notification()` is not granted to clients, so it is called from the SECURITY DEFINER functions and triggers that store the change.
+
+```sql
+-- Bulk messaging: one statement queues an email for every recipient, and
+-- commits or rolls back together with the message itself
+SELECT enqueue_notification(recipient_id, 'email', 'message.sent', p_subject, p_body, 'messages', v_message_id)
+FROM unnest(p_recipient_ids) AS recipient_id;
+```
+
+```bash
+# Local delivery: fake SMTP/SMS sink plus a dispatcher pool
+python PERFORMANCE-TOOLS/notification_sink.py &
+python PERFORMANCE-TOOLS/notification_dispatcher.py --workers 4
+```
+
+---
+"""
+
 def generate_spec_content(portal, spec):
     """Generate comprehensive specification content"""
     
@@ -510,7 +572,7 @@ export const [featureName]API = new [FeatureName]API();
 ```
 
 ---
-
+{generate_report_jobs_section(spec)}{generate_notification_outbox_section(spec)}
 ### React Component (`/components/[portal]/[FeatureName].tsx`)
 
 ```typescript
@@ -5,12 +5,67 @@ Generates all 20 specification files for External Stakeholder Portals
 """
 
 import os
+import re
+import json
 from pathlib import Path
 from datetime import datetime
 
 # Base path
 BASE_PATH = Path(__file__).parent
 
+# Measured index feedback (pg_stats correlations, accepted advisor indexes) written by PERFORMANCE-TOOLS
+INDEX_FEEDBACK_PATH = BASE_PATH.parent / "PERFORMANCE-TOOLS" / "index-feedback.json"
+
+# Insert-only, log-style tables: rows arrive in created_at order and are never
+# rewritten, so a BRIN index on created_at is a fraction of a B-tree's size
+APPEND_ONLY_TABLE_SUFFIXES = ("_log", "_logs", "_history", "_trail", "_trails")
+APPEND_ONLY_TABLES = ["activity_feed"]
+
+# Below this |correlation| between created_at and physical row order BRIN
+# ranges overlap too much to prune anything, so fall back to a B-tree
+BRIN_MIN_CORRELATION = 0.9
+
+# Feature keywords that make a spec searchable (full-text search on its main table)
+SEARCH_FEATURE_KEYWORDS = ("search",)
+
+# Feature keywords that make a spec bulk-capable (createMany/upsertMany/updateMany)
+BULK_FEATURE_KEYWORDS = ("bulk", "import")
+
+# Feature keywords that make a spec list-heavy (virtualized, infinite-scrolling table)
+LIST_VIEW_FEATURE_KEYWORDS = ("list", "catalog", "history", "view all", "browse", "filter by")
+
+# Feature keywords that make a spec live (filtered realtime subscription)
+REALTIME_FEATURE_KEYWORDS = ("real-time", "realtime", "live ", "notification center")
+
+# Feature keywords that make a spec export reports (queued as SPEC-033 report jobs)
+REPORT_FEATURE_KEYWORDS = ("report export", "report generation", "downloadable", "download report")
+
+# Feature keywords that make a spec notify people outside the app (queued in
+# the notification outbox, delivered by dispatchers)
+NOTIFICATION_FEATURE_KEYWORDS = ("notifications", "notification system", "reminders", "sms", "broadcast")
+
+# Title keyword of the portal overview specs served by a dashboard rollup (getSummary)
+DASHBOARD_TITLE_KEYWORD = "dashboard"
+
+# p95 budgets (ms) of the PERFORMANCE REQUIREMENTS section, asserted by each spec's performance bench;
+# named like the metrics PERFORMANCE-TOOLS/compile_budgets.py extracts from that prose
+PERFORMANCE_BUDGETS_MS = {"page_load": 2000, "api_response": 500}
+
+# Text columns folded into the generated search_vector, with their rank weight
+SEARCH_TEXT_COLUMNS = [("name", "A"), ("description", "B")]
+
+# Columns only detail views fetch: list views skip the wide text/JSONB
+# payload and the audit columns
+DETAIL_ONLY_COLUMNS = ("description", "metadata", "created_by", "updated_by")
+
+# Internal columns never sent to the client
+HIDDEN_COLUMNS = ("search_vector",)
+
+# How declared metadata keys are queried: "contains" keys are filtered with
+# metadata @> {...} (one jsonb_path_ops GIN index per table), "hot" keys are
+# compared by equality often enough to deserve their own expression index
+METADATA_ACCESS_PATTERNS = ("contains", "hot")
+
 # Complete specification definitions
 SPECIFICATIONS = [
     # 01-VENDOR-PORTAL (6 specs)
@@ -22,6 +77,10 @@ SPECIFICATIONS = [
         "time": "6 hours",
         "description": "Comprehensive vendor dashboard displaying purchase orders, pending deliveries, payment status, invoice management, product catalog, and communication hub with real-time metrics and notifications.",
         "tables": ["vendor_dashboard_preferences", "vendor_activity_log", "vendor_notifications", "dashboard_widgets"],
+        "metadata_keys": {
+            "vendor_dashboard_preferences": {"layout": "contains"},
+            "dashboard_widgets": {"config": "contains", "widget_type": "hot"}
+        },
         "features": [
             "Purchase order overview with status tracking",
             "Pending delivery alerts and deadlines",
@@ -309,6 +368,10 @@ SPECIFICATIONS = [
         "time": "8 hours",
         "description": "Detailed inspection report creation and submission system with customizable checklists, photo/video documentation, pass/fail criteria, deficiency tracking, recommendation recording, and digital signature support with template management.",
         "tables": ["inspection_reports", "inspection_checklists", "inspection_photos", "deficiencies", "recommendations", "report_signatures", "checklist_templates", "inspection_findings"],
+        "metadata_keys": {
+            "inspection_checklists": {"items": "contains", "template_id": "hot"},
+            "checklist_templates": {"criteria": "contains"}
+        },
         "features": [
             "Customizable inspection checklists",
             "Pass/fail criteria evaluation",
@@ -499,7 +562,7 @@ SPEC_TEMPLATE = """# SPEC-{id}: {title}
 {rls_enable}
 
 **RLS Policies**:
-{rls_policies}
+{rls_policies}{realtime_publication}{dashboard_rollup}{report_jobs}{notification_outbox}
 
 ---
 
@@ -510,6 +573,8 @@ SPEC_TEMPLATE = """# SPEC-{id}: {title}
 **Location**: `src/lib/api/{slug}-api.ts`
 
 ```typescript
+import {{ getSessionUserId }} from '@/lib/supabase/session-user';
+import {{ batchGetById, dedupe }} from '@/lib/supabase/request-layer';{realtime_import}{report_import}
 {typescript_interfaces}
 
 export class {api_class_name} {{
@@ -538,7 +603,7 @@ export const {api_instance_name} = new {api_class_name}(supabase);
 - Loading states
 - Form validation
 - Success notifications
-
+{virtual_list}
 ---
 
 ## 🔗 INTEGRATION POINTS
@@ -613,7 +678,7 @@ export const {api_instance_name} = new {api_class_name}(supabase);
 - Component rendering
 - User interactions
 - Form submissions
-
+{performance_benchmark}{bulk_benchmark}
 ---
 
 ## 📝 ACCEPTANCE CRITERIA
@@ -641,7 +706,7 @@ def generate_success_criteria(spec):
     criteria = []
     
     # Dashboard specs
-    if 'dashboard' in spec['title'].lower():
+    if is_dashboard_spec(spec):
         criteria = [
             "✅ Dashboard displays all key metrics accurately",
             "✅ Real-time data updates working",
@@ -692,6 +757,45 @@ def generate_success_criteria(spec):
     
     return "\n".join(criteria)
 
+def is_searchable_spec(spec):
+    """Detect specs whose features ask for search"""
+    return any(keyword in feature.lower() for feature in spec['features'] for keyword in SEARCH_FEATURE_KEYWORDS)
+
+def generate_search_columns():
+    """Generate the text columns and the stored tsvector column over them"""
+    weighted = " ||\n    ".join([f"setweight(to_tsvector('simple', coalesce({column}, '')), '{weight}')" for column, weight in SEARCH_TEXT_COLUMNS])
+    return f"""
+  name VARCHAR(255),
+  description TEXT,
+  search_vector TSVECTOR GENERATED ALWAYS AS (
+    {weighted}
+  ) STORED,"""
+
+def get_metadata_keys(spec, table_name):
+    """Declared metadata keys of one table, {key: access pattern}"""
+    metadata_keys = spec.get('metadata_keys', {}).get(table_name, {})
+    for key, pattern in metadata_keys.items():
+        if pattern not in METADATA_ACCESS_PATTERNS:
+            raise ValueError(f"SPEC-{spec['id']}: unknown access pattern '{pattern}' for {table_name}.metadata.{key}")
+    return metadata_keys
+
+def generate_table_schema(spec, table):
+    """Generate the CREATE TABLE statement of one table"""
+    search_columns = generate_search_columns() if is_searchable_spec(spec) and table == spec['tables'][0] else ""
+    if is_notification_spec(spec) and table == spec['tables'][0]:
+        # Status transitions are what the notification trigger reports
+        search_columns += "\n  status VARCHAR(50) DEFAULT 'active',"
+    if get_metadata_keys(spec, table):
+        search_columns += "\n  metadata JSONB DEFAULT '{}'::jsonb,"
+    return f"""CREATE TABLE {table} (
+  id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),{search_columns}
+  -- Add relevant columns based on table purpose
+  created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+  updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+  created_by UUID REFERENCES auth.users(id) DEFAULT auth.uid(),
+  updated_by UUID REFERENCES auth.users(id)
+);"""
+
 def generate_database_schema(spec):
     """Generate database schema section"""
     schema = []
@@ -699,24 +803,88 @@ def generate_database_schema(spec):
         schema.append(f"""
 #### `{table}`
 ```sql
-CREATE TABLE {table} (
-  id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
-  -- Add relevant columns based on table purpose
-  created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
-  updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
-  created_by UUID REFERENCES auth.users(id),
-  updated_by UUID REFERENCES auth.users(id)
-);
+{generate_table_schema(spec, table)}
 ```
 """)
     return "\n".join(schema)
 
+def get_table_columns(spec, table):
+    """Column names and SQL types of a generated table, in definition order"""
+    return re.findall(r"^  (\w+) (\w+)", generate_table_schema(spec, table), re.MULTILINE)
+
+def get_view_columns(spec, table, view):
+    """(TypeScript field, TypeScript type, PostgREST select item) for the 'list' or 'detail' view"""
+    columns = []
+    for column, sql_type in get_table_columns(spec, table):
+        if column in HIDDEN_COLUMNS or (view == 'list' and column in DETAIL_ONLY_COLUMNS):
+            continue
+        if sql_type == 'JSONB':
+            columns.append((f"{column}?", 'Record<string, any>', column))
+        else:
+            columns.append((column, 'string', column))
+    # Hot metadata keys are filtered on, so list rows carry them as plain fields
+    for key, pattern in get_metadata_keys(spec, table).items():
+        if pattern == 'hot':
+            columns.append((key, 'string', f"{key}:metadata->>{key}"))
+    return columns
+
+def generate_select_columns(spec, table, view):
+    """Generate the PostgREST select list of one view"""
+    return ','.join([item for _, _, item in get_view_columns(spec, table, view)])
+
+def load_index_feedback():
+    """Load measured index feedback, empty when nothing has been measured yet"""
+    if not INDEX_FEEDBACK_PATH.exists():
+        return {}
+    with open(INDEX_FEEDBACK_PATH, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+INDEX_FEEDBACK = load_index_feedback()
+
+def is_append_only_table(table_name):
+    """Detect insert-only, log-style tables"""
+    return table_name in APPEND_ONLY_TABLES or table_name.endswith(APPEND_ONLY_TABLE_SUFFIXES)
+
+def generate_created_at_index(table_name):
+    """Generate the created_at index: BRIN for append-only tables, B-tree otherwise"""
+    correlation = INDEX_FEEDBACK.get('created_at_correlation', {}).get(table_name)
+    well_correlated = correlation is None or abs(correlation) >= BRIN_MIN_CORRELATION
+    if is_append_only_table(table_name) and well_correlated:
+        return f"CREATE INDEX idx_{table_name}_created_at ON {table_name} USING BRIN (created_at) WITH (pages_per_range = 32);"
+    return f"CREATE INDEX idx_{table_name}_created_at ON {table_name}(created_at DESC);"
+
+def generate_advisor_indexes(table_name):
+    """Generate the indexes accepted from the index advisor (PERFORMANCE-TOOLS/index_advisor.py)"""
+    indexes = INDEX_FEEDBACK.get('advisor_indexes', {}).get(table_name, [])
+    return ''.join([f"\nCREATE INDEX {index['name']} ON {table_name}({', '.join(index['columns'])});" for index in indexes])
+
+def generate_metadata_indexes(table_name, metadata_keys):
+    """Generate JSONB metadata indexes for the declared access patterns"""
+    indexes = []
+    if 'contains' in metadata_keys.values():
+        indexes.append(f"CREATE INDEX idx_{table_name}_metadata ON {table_name} USING GIN (metadata jsonb_path_ops);")
+    for key, pattern in metadata_keys.items():
+        if pattern == 'hot':
+            indexes.append(f"CREATE INDEX idx_{table_name}_metadata_{key} ON {table_name}((metadata->>'{key}'));")
+    return ''.join([f"\n{index}" for index in indexes])
+
+def generate_keyset_index(table_name):
+    """Generate the composite index behind keyset pagination of getAll()"""
+    # Led by the policy column, so a stakeholder's page seeks to its own rows
+    return f"CREATE INDEX idx_{table_name}_keyset ON {table_name}(created_by, created_at DESC, id DESC);"
+
 def generate_indexes(spec):
     """Generate index definitions"""
     indexes = []
+    main_table = spec['tables'][0]
     for table in spec['tables']:
-        indexes.append(f"- `{table}`: Index on `created_at`, `created_by`, frequently queried fields")
-    return "\n".join(indexes)
+        # The main table's keyset index already leads with created_by
+        created_by_index = "" if table == main_table else f"CREATE INDEX idx_{table}_created_by ON {table}(created_by);\n"
+        indexes.append(f"""{created_by_index}{generate_created_at_index(table)}{generate_metadata_indexes(table, get_metadata_keys(spec, table))}{generate_advisor_indexes(table)}""")
+    indexes.append(generate_keyset_index(main_table))
+    if is_searchable_spec(spec):
+        indexes.append(f"CREATE INDEX idx_{main_table}_search ON {main_table} USING GIN (search_vector);")
+    return "```sql\n" + "\n".join(indexes) + "\n```"
 
 def generate_rls_enable(spec):
     """Generate RLS enable statements"""
@@ -750,21 +918,59 @@ CREATE POLICY "Users can update own {table}"
 """)
     return "\n".join(policies)
 
+def generate_metadata_interfaces(spec):
+    """Generate typed metadata filters for tables with declared metadata keys"""
+    interfaces = []
+    for table_name in spec['tables']:
+        metadata_keys = get_metadata_keys(spec, table_name)
+        if not metadata_keys:
+            continue
+        interface_name = ''.join(word.capitalize() for word in table_name.split('_'))
+        fields = '\n'.join([f"  {key}?: {'string' if pattern == 'hot' else 'any'};" for key, pattern in metadata_keys.items()])
+        interfaces.append(f"""
+export interface {interface_name}Metadata {{
+{fields}
+  [key: string]: any;
+}}
+""")
+        # The metadata helpers of a secondary table return its own list rows
+        if table_name != spec['tables'][0]:
+            list_fields = '\n'.join([f"  {field}: {ts_type};" for field, ts_type, _ in get_view_columns(spec, table_name, 'list')])
+            interfaces.append(f"""
+export interface {interface_name}ListItem {{
+{list_fields}
+}}
+""")
+    return ''.join(interfaces)
+
 def generate_typescript_interfaces(spec):
     """Generate TypeScript interfaces"""
     main_table = spec['tables'][0]
     interface_name = ''.join(word.capitalize() for word in main_table.split('_'))
     
+    list_columns = get_view_columns(spec, main_table, 'list')
+    detail_columns = [column for column in get_view_columns(spec, main_table, 'detail') if column not in list_columns]
+    list_fields = '\n'.join([f"  {field}: {ts_type};" for field, ts_type, _ in list_columns])
+    detail_fields = '\n'.join([f"  {field}: {ts_type};" for field, ts_type, _ in detail_columns])
+    
     return f"""
-export interface {interface_name} {{
-  id: string;
+export interface {interface_name}ListItem {{
+{list_fields}
   // Add relevant fields based on table structure
-  created_at: string;
-  updated_at: string;
-  created_by: string;
-  updated_by: string;
 }}
 
+export interface {interface_name} extends {interface_name}ListItem {{
+{detail_fields}
+}}
+
+export type MainEntityListItem = {interface_name}ListItem;
+export type MainEntity = {interface_name};
+
+// PostgREST projections: list screens never pull the wide text/JSONB columns.
+// Extend both with the columns added to the table
+const LIST_COLUMNS = '{generate_select_columns(spec, main_table, 'list')}';
+const DETAIL_COLUMNS = '{generate_select_columns(spec, main_table, 'detail')}';
+
 export interface {interface_name}Create {{
   // Add relevant fields for creation
 }}
@@ -772,44 +978,938 @@ export interface {interface_name}Create {{
 export interface {interface_name}Update {{
   // Add relevant fields for update
 }}
-"""
+export interface PageCursor {{
+  createdAt: string;
+  id: string;
+}}
 
-def generate_api_methods(spec):
-    """Generate API methods"""
+export interface ListOptions {{
+  cursor?: PageCursor | null;
+  limit?: number;
+  count?: 'estimated' | 'exact' | 'none';
+  // Admin views only: every visible owner's rows instead of the caller's own
+  allOwners?: boolean;
+}}
+
+export interface ListPage {{
+  data: MainEntityListItem[];
+  nextCursor: PageCursor | null;
+  total: number | null;
+}}
+{generate_metadata_interfaces(spec)}{generate_dashboard_interfaces(spec)}"""
+
+def generate_search_method(table_name):
+    """Generate the full-text search API method"""
     return """
-  async getAll(): Promise<MainEntity[]> {
+
+  async search(query: string, page: number = 1, limit: number = 20): Promise<{
+    data: MainEntityListItem[];
+    hasMore: boolean;
+  }> {
+    const start = (page - 1) * limit;
+
+    // Matches go through the GIN index on search_vector; one extra row tells
+    // us whether another page exists without a COUNT over all matches
     const { data, error } = await this.supabase
-      .from('""" + spec['tables'][0] + """')
-      .select('*')
-      .order('created_at', { ascending: false });
+      .from('""" + table_name + """')
+      .select(LIST_COLUMNS)
+      .textSearch('search_vector', query, { type: 'websearch', config: 'simple' })
+      .order('created_at', { ascending: false })
+      .range(start, start + limit);
 
     if (error) throw error;
-    return data as MainEntity[];
-  }
 
-  async getById(id: string): Promise<MainEntity> {
+    return {
+      data: (data as MainEntityListItem[]).slice(0, limit),
+      hasMore: data.length > limit
+    };
+  }"""
+
+def generate_metadata_methods(spec):
+    """Generate containment and hot-key query helpers for declared metadata keys"""
+    methods = ""
+    for table_name in spec['tables']:
+        metadata_keys = get_metadata_keys(spec, table_name)
+        entity = ''.join(word.capitalize() for word in table_name.split('_'))
+        list_type = 'MainEntityListItem' if table_name == spec['tables'][0] else entity + 'ListItem'
+        if 'contains' in metadata_keys.values():
+            methods += """
+
+  async find""" + entity + """ByMetadata(filter: Partial<""" + entity + """Metadata>, limit: number = 50): Promise<""" + list_type + """[]> {
+    // metadata @> filter, served by the jsonb_path_ops GIN index
     const { data, error } = await this.supabase
-      .from('""" + spec['tables'][0] + """')
-      .select('*')
-      .eq('id', id)
-      .single();
+      .from('""" + table_name + """')
+      .select('""" + generate_select_columns(spec, table_name, 'list') + """')
+      .contains('metadata', filter)
+      .order('created_at', { ascending: false })
+      .limit(limit);
+
+    if (error) throw error;
+    return data as """ + list_type + """[];
+  }"""
+        for key, pattern in metadata_keys.items():
+            if pattern != 'hot':
+                continue
+            methods += """
+
+  async find""" + entity + """By""" + ''.join(word.capitalize() for word in key.split('_')) + """(value: string, limit: number = 50): Promise<""" + list_type + """[]> {
+    // Equality on metadata->>'""" + key + """' uses its expression index
+    const { data, error } = await this.supabase
+      .from('""" + table_name + """')
+      .select('""" + generate_select_columns(spec, table_name, 'list') + """')
+      .eq('metadata->>""" + key + """', value)
+      .order('created_at', { ascending: false })
+      .limit(limit);
 
     if (error) throw error;
-    return data as MainEntity;
+    return data as """ + list_type + """[];
+  }"""
+    return methods
+
+DASHBOARD_ROLLUP_SQL = """CREATE TABLE IF NOT EXISTS dashboard_owner_counts (
+  table_name TEXT NOT NULL,
+  owner_id UUID NOT NULL DEFAULT '00000000-0000-0000-0000-000000000000',
+  row_count BIGINT NOT NULL DEFAULT 0,
+  last_created_at TIMESTAMP WITH TIME ZONE,
+  PRIMARY KEY (table_name, owner_id)
+);
+
+-- No policies: only readable through get_dashboard_owner_summary()
+ALTER TABLE dashboard_owner_counts ENABLE ROW LEVEL SECURITY;
+
+-- Row counts of the given tables visible to the caller, mirroring the table
+-- policies: own rows, or every owner's for admins. A primary key read per
+-- table (and owner), whatever the size of the tables themselves
+CREATE OR REPLACE FUNCTION get_dashboard_owner_summary(p_tables TEXT[])
+RETURNS TABLE (table_name TEXT, row_count BIGINT, last_created_at TIMESTAMP WITH TIME ZONE) AS $$
+  SELECT c.table_name, SUM(c.row_count)::BIGINT, MAX(c.last_created_at)
+  FROM dashboard_owner_counts c
+  WHERE c.table_name = ANY(p_tables)
+    AND (c.owner_id = auth.uid() OR auth.uid() IN (
+      SELECT user_id FROM user_roles WHERE role IN ('admin', 'super_admin')
+    ))
+  GROUP BY c.table_name;
+$$ LANGUAGE sql STABLE SECURITY DEFINER SET search_path = public;
+
+-- Statement-level, so a bulk insert or delete updates each counter row once.
+-- Updates need no trigger: the policies never let created_by change
+CREATE OR REPLACE FUNCTION maintain_dashboard_owner_counts()
+RETURNS TRIGGER AS $$
+BEGIN
+  IF TG_OP = 'INSERT' THEN
+    INSERT INTO dashboard_owner_counts (table_name, owner_id, row_count, last_created_at)
+    SELECT TG_TABLE_NAME, COALESCE(created_by, '00000000-0000-0000-0000-000000000000'), COUNT(*), MAX(created_at)
+    FROM new_rows
+    GROUP BY COALESCE(created_by, '00000000-0000-0000-0000-000000000000')
+    ON CONFLICT (table_name, owner_id)
+    DO UPDATE SET row_count = dashboard_owner_counts.row_count + EXCLUDED.row_count,
+      last_created_at = GREATEST(dashboard_owner_counts.last_created_at, EXCLUDED.last_created_at);
+  ELSE
+    UPDATE dashboard_owner_counts c
+    SET row_count = c.row_count - d.row_count
+    FROM (
+      SELECT COALESCE(created_by, '00000000-0000-0000-0000-000000000000') AS owner_id, COUNT(*) AS row_count
+      FROM old_rows
+      GROUP BY COALESCE(created_by, '00000000-0000-0000-0000-000000000000')
+    ) d
+    WHERE c.table_name = TG_TABLE_NAME
+      AND c.owner_id = d.owner_id;
+  END IF;
+  RETURN NULL;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER SET search_path = public;"""
+
+NOTIFICATION_OUTBOX_SQL = """CREATE TABLE IF NOT EXISTS notification_outbox (
+  id BIGINT GENERATED ALWAYS AS IDENTITY PRIMARY KEY,
+  tenant_id UUID,
+  branch_id UUID,
+  recipient_id UUID REFERENCES auth.users(id),
+  channel VARCHAR(20) NOT NULL CHECK (channel IN ('email', 'sms')),
+  address TEXT,
+  event_type VARCHAR(100) NOT NULL,
+  source_table TEXT,
+  source_id UUID,
+  subject TEXT,
+  body TEXT NOT NULL,
+  status VARCHAR(20) NOT NULL DEFAULT 'pending' CHECK (status IN ('pending', 'sending', 'sent', 'failed')),
+  attempts INTEGER NOT NULL DEFAULT 0,
+  max_attempts INTEGER NOT NULL DEFAULT 5,
+  available_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT NOW(),
+  locked_by TEXT,
+  locked_until TIMESTAMP WITH TIME ZONE,
+  sent_at TIMESTAMP WITH TIME ZONE,
+  error TEXT,
+  created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+);
+
+-- Dispatchers only scan unsent rows; sent ones drop out of both indexes
+CREATE INDEX IF NOT EXISTS idx_notification_outbox_ready
+  ON notification_outbox (available_at, id) WHERE status IN ('pending', 'sending');
+CREATE INDEX IF NOT EXISTS idx_notification_outbox_recipient
+  ON notification_outbox (channel, address) WHERE status = 'pending';
+
+-- Messages per minute each dispatcher process may send on a channel
+CREATE TABLE IF NOT EXISTS notification_channel_limits (
+  channel VARCHAR(20) PRIMARY KEY,
+  per_minute INTEGER NOT NULL CHECK (per_minute > 0)
+);
+
+INSERT INTO notification_channel_limits (channel, per_minute)
+VALUES ('email', 60000), ('sms', 6000)
+ON CONFLICT DO NOTHING;
+
+-- No policies: written in the writer's transaction by enqueue_notification()
+-- and the triggers below, read only by dispatchers (service role)
+ALTER TABLE notification_outbox ENABLE ROW LEVEL SECURITY;
+ALTER TABLE notification_channel_limits ENABLE ROW LEVEL SECURITY;
+
+-- Queue one notification inside the caller's transaction: it is sent only if
+-- that transaction commits, and sending never holds the transaction up. The
+-- address defaults to the recipient's email or phone
+CREATE OR REPLACE FUNCTION enqueue_notification(
+  p_recipient_id UUID,
+  p_channel VARCHAR,
+  p_event_type VARCHAR,
+  p_subject TEXT,
+  p_body TEXT,
+  p_source_table TEXT DEFAULT NULL,
+  p_source_id UUID DEFAULT NULL,
+  p_address TEXT DEFAULT NULL
+)
+RETURNS BIGINT AS $$
+  INSERT INTO notification_outbox (
+    tenant_id, branch_id, recipient_id, channel, address, event_type, source_table, source_id, subject, body
+  )
+  SELECT
+    NULLIF(current_setting('app.current_tenant_id', true), '')::UUID,
+    NULLIF(current_setting('app.current_branch_id', true), '')::UUID,
+    p_recipient_id,
+    p_channel,
+    COALESCE(p_address, CASE p_channel WHEN 'email' THEN u.email ELSE u.phone END),
+    p_event_type,
+    p_source_table,
+    p_source_id,
+    p_subject,
+    p_body
+  FROM (SELECT 1) AS one
+  LEFT JOIN auth.users u ON u.id = p_recipient_id
+  RETURNING id;
+$$ LANGUAGE sql SECURITY DEFINER SET search_path = public;
+
+-- Statement-level: a bulk status change queues all of its notifications in
+-- one INSERT. The row's creator, the stakeholder it belongs to, is notified
+-- on every channel passed as a trigger argument; other writes queue nothing
+CREATE OR REPLACE FUNCTION enqueue_owner_status_notifications()
+RETURNS TRIGGER AS $$
+BEGIN
+  INSERT INTO notification_outbox (recipient_id, channel, address, event_type, source_table, source_id, subject, body)
+  SELECT
+    n.created_by,
+    c.channel,
+    CASE c.channel WHEN 'email' THEN u.email ELSE u.phone END,
+    TG_TABLE_NAME || '.status_changed',
+    TG_TABLE_NAME,
+    n.id,
+    initcap(replace(TG_TABLE_NAME, '_', ' ')) || ': ' || n.status,
+    -- Not every notifying table has a name column
+    format('%s is now %s (was %s)', COALESCE(to_jsonb(n)->>'name', n.id::TEXT), n.status, COALESCE(o.status, 'unset'))
+  FROM new_rows n
+  JOIN old_rows o ON o.id = n.id
+  CROSS JOIN unnest(TG_ARGV) AS c(channel)
+  LEFT JOIN auth.users u ON u.id = n.created_by
+  WHERE n.status IS DISTINCT FROM o.status
+    AND n.created_by IS NOT NULL;
+  RETURN NULL;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER SET search_path = public;
+
+-- Claim a batch for one dispatcher: up to p_limit ready rows (SKIP LOCKED, so
+-- dispatchers never block each other) plus the other ready rows of the same
+-- addresses, which go out with them as one message. Rows of a dispatcher that
+-- died are claimed again once their lease expires, until max_attempts
+CREATE OR REPLACE FUNCTION claim_notifications(
+  p_worker TEXT,
+  p_limit INTEGER DEFAULT 500,
+  p_lease INTERVAL DEFAULT '2 minutes'
+)
+RETURNS TABLE (id BIGINT, channel VARCHAR, address TEXT, subject TEXT, body TEXT, attempts INTEGER) AS $$
+  UPDATE notification_outbox
+  SET status = 'failed',
+      error = 'lease expired after ' || attempts || ' attempts',
+      locked_by = NULL,
+      locked_until = NULL
+  WHERE status = 'sending' AND locked_until < NOW() AND attempts >= max_attempts;
+
+  WITH seeds AS (
+    SELECT o.id, o.channel, o.address
+    FROM notification_outbox o
+    WHERE o.status IN ('pending', 'sending')
+      AND ((o.status = 'pending' AND o.available_at <= NOW()) OR (o.status = 'sending' AND o.locked_until < NOW()))
+    ORDER BY o.available_at, o.id
+    LIMIT p_limit
+    FOR UPDATE SKIP LOCKED
+  ),
+  siblings AS (
+    SELECT o.id
+    FROM notification_outbox o
+    JOIN (SELECT DISTINCT s.channel, s.address FROM seeds s) a
+      ON a.channel = o.channel AND a.address = o.address
+    WHERE o.status = 'pending'
+      AND o.available_at <= NOW()
+      AND o.id NOT IN (SELECT s.id FROM seeds s)
+    LIMIT p_limit
+    FOR UPDATE OF o SKIP LOCKED
+  )
+  UPDATE notification_outbox o
+  SET status = 'sending',
+      locked_by = p_worker,
+      locked_until = NOW() + p_lease,
+      attempts = o.attempts + 1
+  WHERE o.id IN (SELECT s.id FROM seeds s UNION ALL SELECT s.id FROM siblings s)
+  RETURNING o.id, o.channel, o.address, o.subject, o.body, o.attempts;
+$$ LANGUAGE sql;
+
+-- Mark delivered rows sent; rows whose lease this dispatcher lost are skipped
+CREATE OR REPLACE FUNCTION complete_notifications(p_ids BIGINT[], p_worker TEXT)
+RETURNS INTEGER AS $$
+  WITH sent AS (
+    UPDATE notification_outbox
+    SET status = 'sent', sent_at = NOW(), locked_by = NULL, locked_until = NULL, error = NULL
+    WHERE id = ANY(p_ids) AND status = 'sending' AND locked_by = p_worker
+    RETURNING 1
+  )
+  SELECT COUNT(*)::INTEGER FROM sent;
+$$ LANGUAGE sql;
+
+-- A failed send is retried after 30s, 60s, 120s... until max_attempts; with
+-- p_retry false (no address, rejected recipient) it fails for good at once
+CREATE OR REPLACE FUNCTION fail_notifications(p_ids BIGINT[], p_worker TEXT, p_error TEXT, p_retry BOOLEAN DEFAULT true)
+RETURNS INTEGER AS $$
+  WITH failed AS (
+    UPDATE notification_outbox
+    SET status = CASE WHEN p_retry AND attempts < max_attempts THEN 'pending' ELSE 'failed' END,
+        available_at = NOW() + INTERVAL '30 seconds' * power(2, attempts - 1),
+        error = p_error,
+        locked_by = NULL,
+        locked_until = NULL
+    WHERE id = ANY(p_ids) AND status = 'sending' AND locked_by = p_worker
+    RETURNING 1
+  )
+  SELECT COUNT(*)::INTEGER FROM failed;
+$$ LANGUAGE sql;
+
+-- Hand back rows a dispatcher could not send within its channel's rate limit;
+-- the attempt does not count
+CREATE OR REPLACE FUNCTION defer_notifications(p_ids BIGINT[], p_worker TEXT, p_delay INTERVAL)
+RETURNS INTEGER AS $$
+  WITH deferred AS (
+    UPDATE notification_outbox
+    SET status = 'pending',
+        available_at = NOW() + p_delay,
+        attempts = attempts - 1,
+        locked_by = NULL,
+        locked_until = NULL
+    WHERE id = ANY(p_ids) AND status = 'sending' AND locked_by = p_worker
+    RETURNING 1
+  )
+  SELECT COUNT(*)::INTEGER FROM deferred;
+$$ LANGUAGE sql;
+
+REVOKE EXECUTE ON FUNCTION enqueue_notification(UUID, VARCHAR, VARCHAR, TEXT, TEXT, TEXT, UUID, TEXT) FROM PUBLIC;
+REVOKE EXECUTE ON FUNCTION claim_notifications(TEXT, INTEGER, INTERVAL) FROM PUBLIC;
+REVOKE EXECUTE ON FUNCTION complete_notifications(BIGINT[], TEXT) FROM PUBLIC;
+REVOKE EXECUTE ON FUNCTION fail_notifications(BIGINT[], TEXT, TEXT, BOOLEAN) FROM PUBLIC;
+REVOKE EXECUTE ON FUNCTION defer_notifications(BIGINT[], TEXT, INTERVAL) FROM PUBLIC;
+GRANT EXECUTE ON FUNCTION enqueue_notification(UUID, VARCHAR, VARCHAR, TEXT, TEXT, TEXT, UUID, TEXT) TO service_role;
+GRANT EXECUTE ON FUNCTION claim_notifications(TEXT, INTEGER, INTERVAL) TO service_role;
+GRANT EXECUTE ON FUNCTION complete_notifications(BIGINT[], TEXT) TO service_role;
+GRANT EXECUTE ON FUNCTION fail_notifications(BIGINT[], TEXT, TEXT, BOOLEAN) TO service_role;
+GRANT EXECUTE ON FUNCTION defer_notifications(BIGINT[], TEXT, INTERVAL) TO service_role;"""
+
+def is_report_spec(spec):
+    """Detect specs whose features produce downloadable reports"""
+    return any(keyword in feature.lower() for feature in spec['features'] for keyword in REPORT_FEATURE_KEYWORDS)
+
+def generate_report_export_method(table_name):
+    """Generate the export methods backed by the report job queue"""
+    return """
+
+  requestExport(format: ReportFormat = 'csv'): Promise<string> {
+    // Only stores a report job and returns its id; a report worker streams
+    // the export to storage outside this request
+    return enqueueReport(this.supabase, 'table_export', { table: '""" + table_name + """' }, format);
+  }
+
+  async exportToUrl(format: ReportFormat = 'csv', onProgress?: (job: ReportJob) => void, signal?: AbortSignal): Promise<string> {
+    const job = await waitForReportJob(this.supabase, await this.requestExport(format), onProgress, signal);
+    if (job.status === 'failed') throw new Error(job.error ?? 'Export failed');
+    return getReportDownloadUrl(this.supabase, job);
+  }"""
+
+def is_dashboard_spec(spec):
+    """Detect the portal overview specs"""
+    return DASHBOARD_TITLE_KEYWORD in spec['title'].lower()
+
+def get_portal_dashboard(spec):
+    """The dashboard spec of a spec's portal, or None"""
+    for candidate in SPECIFICATIONS:
+        if candidate['portal'] == spec['portal'] and is_dashboard_spec(candidate):
+            return candidate
+    return None
+
+def get_dashboard_tables(dashboard):
+    """Main tables of the portal specs a dashboard summarises"""
+    return [s['tables'][0] for s in SPECIFICATIONS if s['portal'] == dashboard['portal'] and not is_dashboard_spec(s)]
+
+def generate_dashboard_rollup(spec):
+    """Generate the dashboard rollup section, plus its triggers on a summarised main table"""
+    dashboard = get_portal_dashboard(spec)
+    if not dashboard:
+        return ""
+    sql = DASHBOARD_ROLLUP_SQL
+    if is_dashboard_spec(spec):
+        intro = "Per-owner row counts of this portal's tables, kept current by triggers on each summarised table and read by `getSummary()`:"
+    else:
+        intro = f"Keeps `{spec['tables'][0]}` counted in the rollup SPEC-{dashboard['id']} ({dashboard['title']}) reads through `getSummary()`:"
+        sql += "\n\n" + generate_dashboard_rollup_triggers(spec['tables'][0])
+    return f"""
+### Dashboard Rollup
+
+{intro}
+
+```sql
+{sql}
+```
+"""
+
+def generate_report_jobs_registration(spec):
+    """Generate the report job section registering the main table for table exports"""
+    if not is_report_spec(spec):
+        return ""
+    return f"""
+### Report Jobs
+
+Exports are queued as SPEC-033 report jobs (`requestExport()`) and streamed to storage by a report worker, never built inside the request. The worker runs the export as the requester, so the policies above scope it:
+
+```sql
+INSERT INTO reports.exportable_tables (table_name) VALUES ('{spec['tables'][0]}') ON CONFLICT DO NOTHING;
+```
+"""
+
+def is_notification_spec(spec):
+    """Detect specs whose features notify people by email or SMS"""
+    return any(keyword in feature.lower() for feature in spec['features'] for keyword in NOTIFICATION_FEATURE_KEYWORDS)
+
+def get_notification_channels(spec):
+    """Outbox channels of a notification spec: email, plus SMS where a feature names it"""
+    if any("sms" in feature.lower() for feature in spec['features']):
+        return ["email", "sms"]
+    return ["email"]
+
+def generate_notification_outbox(spec):
+    """Generate the notification outbox section and the main table's enqueue trigger"""
+    if not is_notification_spec(spec):
+        return ""
+    table_name = spec['tables'][0]
+    channels = ", ".join(f"'{channel}'" for channel in get_notification_channels(spec))
+    sql = NOTIFICATION_OUTBOX_SQL + f"""
+
+CREATE TRIGGER {table_name}_status_notifications
+  AFTER UPDATE ON {table_name}
+  REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+  FOR EACH STATEMENT EXECUTE FUNCTION enqueue_owner_status_notifications({channels});"""
+    return f"""
+### Notification Outbox
+
+Notifications are queued in the writing transaction and delivered in coalesced, rate-limited batches by dispatchers (`PERFORMANCE-TOOLS/notification_dispatcher.py` locally), never sent from the request. `{table_name}` notifies a row's creator when its status changes:
+
+```sql
+{sql}
+```
+"""
+
+def generate_dashboard_rollup_triggers(table_name):
+    """Generate the owner counter triggers and backfill for one table"""
+    return f"""CREATE TRIGGER {table_name}_owner_count_insert
+  AFTER INSERT ON {table_name}
+  REFERENCING NEW TABLE AS new_rows
+  FOR EACH STATEMENT EXECUTE FUNCTION maintain_dashboard_owner_counts();
+
+CREATE TRIGGER {table_name}_owner_count_delete
+  AFTER DELETE ON {table_name}
+  REFERENCING OLD TABLE AS old_rows
+  FOR EACH STATEMENT EXECUTE FUNCTION maintain_dashboard_owner_counts();
+
+INSERT INTO dashboard_owner_counts (table_name, owner_id, row_count, last_created_at)
+SELECT '{table_name}', COALESCE(created_by, '00000000-0000-0000-0000-000000000000'), COUNT(*), MAX(created_at)
+FROM {table_name}
+GROUP BY COALESCE(created_by, '00000000-0000-0000-0000-000000000000')
+ON CONFLICT (table_name, owner_id)
+DO UPDATE SET row_count = EXCLUDED.row_count, last_created_at = EXCLUDED.last_created_at;"""
+
+def generate_dashboard_interfaces(spec):
+    """Generate the summary type and summarised tables of a dashboard spec"""
+    if not is_dashboard_spec(spec):
+        return ""
+    tables = ', '.join([f"'{table}'" for table in get_dashboard_tables(spec)])
+    return """
+export interface DashboardSummary {
+  // Visible row count and latest insert per summarised table
+  totals: Record<string, number>;
+  lastCreatedAt: Record<string, string | null>;
+}
+
+// Main tables of the portal specs this dashboard summarises
+const SUMMARY_TABLES = [""" + tables + """];
+"""
+
+def generate_summary_method(table_name):
+    """Generate the dashboard summary method backed by get_dashboard_owner_summary()"""
+    return """
+
+  getSummary(): Promise<DashboardSummary> {
+    return dedupe(this.supabase, '""" + table_name + """.getSummary', null, async () => {
+      // Read from the trigger-maintained dashboard_owner_counts rollup instead
+      // of COUNT(*) over every summarised table
+      const { data, error } = await this.supabase.rpc('get_dashboard_owner_summary', { p_tables: SUMMARY_TABLES });
+
+      if (error) throw error;
+      const summary: DashboardSummary = { totals: {}, lastCreatedAt: {} };
+      for (const row of data as { table_name: string; row_count: number; last_created_at: string | null }[]) {
+        summary.totals[row.table_name] = row.row_count;
+        summary.lastCreatedAt[row.table_name] = row.last_created_at;
+      }
+      return summary;
+    });
+  }"""
+
+def generate_estimate_count_method(table_name):
+    """Generate the count method backed by planner statistics"""
+    return """
+
+  estimateCount(): Promise<number> {
+    return dedupe(this.supabase, '""" + table_name + """.estimateCount', null, async () => {
+      // PostgREST asks the planner for its row estimate of the RLS-filtered
+      // query (EXPLAIN) instead of running COUNT(*)
+      const { count, error } = await this.supabase
+        .from('""" + table_name + """')
+        .select('*', { count: 'planned', head: true });
+
+      if (error) throw error;
+      return count ?? 0;
+    });
+  }"""
+
+def generate_get_all_method(table_name):
+    """Generate the keyset-paginated list method"""
+    return """  getAll(options: ListOptions = {}): Promise<ListPage> {
+    // Widgets asking for the same page share one in-flight request
+    return dedupe(this.supabase, '""" + table_name + """.getAll', options, () => this.fetchPage(options));
+  }
+
+  private async fetchPage(options: ListOptions): Promise<ListPage> {
+    const { cursor = null, limit = 20, count = 'estimated', allOwners = false } = options;
+
+    // Keyset pagination on (created_by, created_at, id) seeks idx_""" + table_name + """_keyset,
+    // so a deep page costs the same as the first one; the extra row tells us
+    // whether there is a next page
+    let query = this.supabase
+      .from('""" + table_name + """')
+      .select(LIST_COLUMNS, count === 'exact' ? { count: 'exact' } : {})
+      .order('created_at', { ascending: false })
+      .order('id', { ascending: false })
+      .limit(limit + 1);
+
+    // The policy ORs the owner check with the admin check, which no index
+    // can serve, so the owner is also filtered explicitly
+    if (!allOwners) {
+      const userId = await getSessionUserId(this.supabase);
+      if (!userId) throw new Error('Not authenticated');
+      query = query.eq('created_by', userId);
+    }
+
+    if (cursor) {
+      query = query.or(
+        `created_at.lt."${cursor.createdAt}",and(created_at.eq."${cursor.createdAt}",id.lt.${cursor.id})`
+      );
+    }
+
+    // The estimate is fetched alongside the page; exact counts are opt-in
+    // because COUNT(*) under RLS scans every visible row
+    const [{ data, error, count: exactCount }, estimate] = await Promise.all([
+      query,
+      count === 'estimated' ? this.estimateCount() : Promise.resolve(null)
+    ]);
+
+    if (error) throw error;
+
+    const rows = data.slice(0, limit);
+    const last = rows[rows.length - 1];
+
+    return {
+      data: rows as MainEntityListItem[],
+      nextCursor: data.length > limit ? { createdAt: last.created_at, id: last.id } : null,
+      total: count === 'exact' ? exactCount ?? 0 : estimate
+    };
+  }"""
+
+def is_bulk_spec(spec):
+    """Detect specs whose features ask for bulk entry or imports"""
+    return any(keyword in feature.lower() for feature in spec['features'] for keyword in BULK_FEATURE_KEYWORDS)
+
+def generate_bulk_methods(table_name):
+    """Generate chunked bulk insert/upsert/update API methods"""
+    return """
+
+  async createMany(rows: Partial<MainEntity>[], options: { chunkSize?: number } = {}): Promise<MainEntity[]> {
+    const userId = await getSessionUserId(this.supabase);
+    if (!userId) throw new Error('Not authenticated');
+
+    const { chunkSize = 500 } = options;
+    const created: MainEntity[] = [];
+
+    // One multi-row INSERT per chunk instead of one round trip per row
+    for (let start = 0; start < rows.length; start += chunkSize) {
+      const { data, error } = await this.supabase
+        .from('""" + table_name + """')
+        .insert(rows.slice(start, start + chunkSize).map((row) => ({
+          ...row,
+          created_by: userId,
+          updated_by: userId
+        })))
+        .select(DETAIL_COLUMNS);
+
+      if (error) throw error;
+      created.push(...(data as MainEntity[]));
+    }
+
+    return created;
+  }
+
+  async upsertMany(rows: Partial<MainEntity>[], options: {
+    chunkSize?: number;
+    onConflict?: string;
+    ignoreDuplicates?: boolean;
+  } = {}): Promise<MainEntity[]> {
+    const userId = await getSessionUserId(this.supabase);
+    if (!userId) throw new Error('Not authenticated');
+
+    const { chunkSize = 500, onConflict = 'id', ignoreDuplicates = false } = options;
+    const upserted: MainEntity[] = [];
+
+    // INSERT ... ON CONFLICT per chunk, e.g. re-running an import. created_by
+    // comes from the column default on insert and is not part of the conflict
+    // update, so an upsert never changes the owner of an existing row
+    for (let start = 0; start < rows.length; start += chunkSize) {
+      const { data, error } = await this.supabase
+        .from('""" + table_name + """')
+        .upsert(rows.slice(start, start + chunkSize).map((row) => ({
+          ...row,
+          updated_by: userId,
+          updated_at: new Date().toISOString()
+        })), { onConflict, ignoreDuplicates })
+        .select(DETAIL_COLUMNS);
+
+      if (error) throw error;
+      upserted.push(...(data as MainEntity[]));
+    }
+
+    return upserted;
+  }
+
+  async updateMany(ids: string[], data: Partial<MainEntity>, options: { chunkSize?: number } = {}): Promise<MainEntity[]> {
+    const userId = await getSessionUserId(this.supabase);
+    if (!userId) throw new Error('Not authenticated');
+
+    // Ids travel in the URL (id=in.(...)), so chunks stay under proxy URL limits
+    const { chunkSize = 100 } = options;
+    const updated: MainEntity[] = [];
+
+    for (let start = 0; start < ids.length; start += chunkSize) {
+      const { data: rows, error } = await this.supabase
+        .from('""" + table_name + """')
+        .update({
+          ...data,
+          updated_by: userId,
+          updated_at: new Date().toISOString()
+        })
+        .in('id', ids.slice(start, start + chunkSize))
+        .select(DETAIL_COLUMNS);
+
+      if (error) throw error;
+      updated.push(...(rows as MainEntity[]));
+    }
+
+    return updated;
+  }"""
+
+def generate_bench_row_fields(spec, table_name, label, minutes_ago):
+    """TypeScript fields of bench row i, filling the table's writable columns"""
+    columns = [column for column, _ in get_table_columns(spec, table_name)]
+    fields = []
+    if 'name' in columns:
+        fields.append(f"name: `{label} ${{i}}`")
+    if 'description' in columns:
+        fields.append(f"description: '{label} row'")
+    metadata_keys = get_metadata_keys(spec, table_name)
+    if metadata_keys:
+        values = ", ".join([f"{key}: `{label} ${{i % 10}}`" for key in metadata_keys])
+        fields.append(f"metadata: {{ {values} }}")
+    if not fields:
+        # No data columns yet: spread the rows over time so every write changes one
+        fields.append(f"created_at: new Date(Date.now() - {minutes_ago} * 60000).toISOString()")
+    return ",\n  ".join(fields)
+
+def generate_bulk_benchmark(spec, slug, api_class_name):
+    """Generate the vitest benchmark comparing per-row and bulk round trips"""
+    if not is_bulk_spec(spec):
+        return ""
+    table_name = spec['tables'][0]
+    insert_fields = generate_bench_row_fields(spec, table_name, "Bulk bench", "i")
+    update_fields = generate_bench_row_fields(spec, table_name, "Bulk bench update", "(ROWS + i)")
+    return """
+### Bulk Benchmark (`tests/bench/""" + slug + """.bulk.bench.ts`)
+
+Runs against the local stack only (`supabase start`), never the hosted project:
+
+```bash
+BENCH_SUPABASE_URL=http://localhost:54321 BENCH_SUPABASE_ANON_KEY=... \\
+BENCH_USER_EMAIL=... BENCH_USER_PASSWORD=... \\
+npx vitest bench tests/bench/""" + slug + """.bulk.bench.ts
+```
+
+```typescript
+import { afterAll, beforeAll, bench, describe } from 'vitest';
+import { createClient } from '@supabase/supabase-js';
+import { """ + api_class_name + """ } from '@/lib/api/""" + slug + """-api';
+
+const ROWS = 1000;
+const createdIds: string[] = [];
+
+const supabase = createClient(
+  process.env.BENCH_SUPABASE_URL ?? 'http://localhost:54321',
+  process.env.BENCH_SUPABASE_ANON_KEY!
+);
+const api = new """ + api_class_name + """(supabase);
+
+const benchRows = () => Array.from({ length: ROWS }, (_, i) => ({
+  """ + insert_fields + """
+}));
+
+const updateRow = (i: number) => ({
+  """ + update_fields + """
+});
+
+beforeAll(async () => {
+  const { error } = await supabase.auth.signInWithPassword({
+    email: process.env.BENCH_USER_EMAIL!,
+    password: process.env.BENCH_USER_PASSWORD!
+  });
+  if (error) throw error;
+});
+
+afterAll(async () => {
+  for (let start = 0; start < createdIds.length; start += 100) {
+    await supabase.from('""" + table_name + """').delete().in('id', createdIds.slice(start, start + 100));
+  }
+});
+
+describe(`""" + table_name + """: insert ${ROWS} rows`, () => {
+  bench('create() per row', async () => {
+    for (const row of benchRows()) {
+      createdIds.push((await api.create(row)).id);
+    }
+  }, { iterations: 3 });
+
+  bench('createMany()', async () => {
+    const created = await api.createMany(benchRows());
+    createdIds.push(...created.map((row) => row.id));
+  }, { iterations: 3 });
+});
+
+describe(`""" + table_name + """: update ${ROWS} rows`, () => {
+  bench('update() per row', async () => {
+    for (const [i, id] of createdIds.slice(0, ROWS).entries()) {
+      await api.update(id, updateRow(i));
+    }
+  }, { iterations: 3 });
+
+  bench('updateMany()', async () => {
+    await api.updateMany(createdIds.slice(0, ROWS), updateRow(0));
+  }, { iterations: 3 });
+
+  bench('upsertMany()', async () => {
+    await api.upsertMany(createdIds.slice(0, ROWS).map((id, i) => ({ ...updateRow(i), id })));
+  }, { iterations: 3 });
+});
+```
+"""
+
+def generate_performance_benchmark(spec, slug, api_class_name):
+    """Generate the bench asserting the PERFORMANCE REQUIREMENTS budgets against the local stack"""
+    table_name = spec['tables'][0]
+    bench_path = "tests/bench/" + slug + ".bench.ts"
+    budget_key = f"{BASE_PATH.name}/{spec['portal']}/SPEC-{spec['id']}"
+    budgets = ", ".join([f"{metric}: {budget}" for metric, budget in PERFORMANCE_BUDGETS_MS.items()])
+    searchable = is_searchable_spec(spec)
+    seed_text = ""
+    search_case = ""
+    if searchable:
+        seed_text = """
+      name: `Perf bench ${start + i}`,
+      description: 'Seeded by the performance bench',"""
+        search_case = """
+
+  it(`search() p95 < ${budgets.ms.api_response}ms`, async () => {
+    const timing = await measure(() => api.search('bench 42'), RUNS);
+    budgets.expectWithin('api_response', 'search()', timing);
+  });"""
+    return """
+### Performance Bench (`""" + bench_path + """`)
+
+Times the API class against seeded rows and fails when a p95 exceeds the
+budgets in 📈 PERFORMANCE REQUIREMENTS. Local stack only (`supabase start`):
+
+```bash
+BENCH_SUPABASE_URL=http://localhost:54321 BENCH_SUPABASE_ANON_KEY=... \\
+BENCH_USER_EMAIL=... BENCH_USER_PASSWORD=... \\
+npx vitest run --config vitest.bench.config.ts """ + bench_path + """
+```
+
+```typescript
+import { afterAll, beforeAll, describe, it } from 'vitest';
+import { createClient } from '@supabase/supabase-js';
+import { measure, signInBenchUser, specBudgets } from './budget';
+import { """ + api_class_name + """, type PageCursor } from '@/lib/api/""" + slug + """-api';
+
+// p95 budgets in ms from the PERFORMANCE REQUIREMENTS section, keyed like performance-budgets.json
+const budgets = specBudgets('""" + budget_key + """', { """ + budgets + """ });
+const SEED_ROWS = 5000;
+const RUNS = 30;
+
+const supabase = createClient(
+  process.env.BENCH_SUPABASE_URL ?? 'http://localhost:54321',
+  process.env.BENCH_SUPABASE_ANON_KEY!
+);
+const api = new """ + api_class_name + """(supabase);
+const seededIds: string[] = [];
+
+beforeAll(async () => {
+  const userId = await signInBenchUser(supabase);
+
+  // Seeded straight through PostgREST so only the API calls below are timed
+  for (let start = 0; start < SEED_ROWS; start += 500) {
+    const rows = Array.from({ length: Math.min(500, SEED_ROWS - start) }, (_, i) => ({""" + seed_text + """
+      created_by: userId,
+      updated_by: userId
+    }));
+    const { data, error } = await supabase.from('""" + table_name + """').insert(rows).select('id');
+    if (error) throw error;
+    seededIds.push(...data.map((row: { id: string }) => row.id));
+  }
+});
+
+afterAll(async () => {
+  for (let start = 0; start < seededIds.length; start += 100) {
+    await supabase.from('""" + table_name + """').delete().in('id', seededIds.slice(start, start + 100));
+  }
+});
+
+describe('""" + table_name + """: performance budgets', () => {
+  it(`getAll() first page p95 < ${budgets.ms.api_response}ms`, async () => {
+    const timing = await measure(() => api.getAll(), RUNS);
+    budgets.expectWithin('api_response', 'getAll() first page', timing);
+  });
+
+  it(`getAll() page 50 p95 < ${budgets.ms.api_response}ms`, async () => {
+    let cursor: PageCursor | null = null;
+    for (let page = 1; page < 50; page++) {
+      cursor = (await api.getAll({ cursor, count: 'none' })).nextCursor;
+    }
+    const timing = await measure(() => api.getAll({ cursor }), RUNS);
+    budgets.expectWithin('api_response', 'getAll() page 50', timing);
+  });
+
+  it(`getById() p95 < ${budgets.ms.api_response}ms`, async () => {
+    let next = 0;
+    const timing = await measure(() => api.getById(seededIds[next++ % seededIds.length]), RUNS);
+    budgets.expectWithin('api_response', 'getById()', timing);
+  });""" + search_case + """
+
+  it(`create() p95 < ${budgets.ms.api_response}ms`, async () => {
+    const timing = await measure(async () => {
+      seededIds.push((await api.create({})).id);
+    }, RUNS);
+    budgets.expectWithin('api_response', 'create()', timing);
+  });
+
+  it(`update() p95 < ${budgets.ms.api_response}ms`, async () => {
+    let next = 0;
+    const timing = await measure(() => api.update(seededIds[next++ % seededIds.length], {}), RUNS);
+    budgets.expectWithin('api_response', 'update()', timing);
+  });
+
+  it(`first page with count p95 < ${budgets.ms.page_load}ms`, async () => {
+    const timing = await measure(() => Promise.all([api.getAll(), api.estimateCount()]), RUNS);
+    budgets.expectWithin('page_load', 'page load', timing);
+  });
+});
+```
+"""
+
+def is_realtime_spec(spec):
+    """Detect specs whose features promise live updates"""
+    return any(keyword in feature.lower() for feature in spec['features'] for keyword in REALTIME_FEATURE_KEYWORDS)
+
+def generate_realtime_publication(spec):
+    """Generate the publication entry Realtime streams the main table's changes from"""
+    if not is_realtime_spec(spec):
+        return ""
+    return f"""
+### Realtime
+
+Subscribers filter on `created_by` server-side (`subscribeToChanges`), matching the policies above: stakeholders on their own id, admins on the owners of the rows they display:
+
+```sql
+ALTER PUBLICATION supabase_realtime ADD TABLE {spec['tables'][0]};
+```
+"""
+
+def generate_realtime_method(table_name):
+    """Generate the filtered realtime subscription method"""
+    return """
+
+  subscribeToChanges(ownerIds: string[], onBatch: (rows: MainEntity[]) => void): () => void {
+    // Filtered by the Realtime server on created_by, never the whole table: a
+    // stakeholder passes its own id, an admin the owners of the rows on screen
+    // (up to MAX_IN_FILTER_VALUES, the in-filter limit)
+    return subscribeToTable<MainEntity>(this.supabase, {
+      table: '""" + table_name + """',
+      filter: ownerFilter('created_by', ownerIds)
+    }, onBatch);
+  }"""
+
+def generate_api_methods(spec):
+    """Generate API methods"""
+    methods = generate_get_all_method(spec['tables'][0]) + generate_estimate_count_method(spec['tables'][0]) + """
+
+  getById(id: string): Promise<MainEntity> {
+    // getById calls from the same tick are fetched with one .in('id', [...]) query
+    return batchGetById<MainEntity>(this.supabase, '""" + spec['tables'][0] + """', DETAIL_COLUMNS, id);
   }
 
   async create(data: Partial<MainEntity>): Promise<MainEntity> {
-    const { data: { user } } = await this.supabase.auth.getUser();
-    if (!user) throw new Error('Not authenticated');
+    const userId = await getSessionUserId(this.supabase);
+    if (!userId) throw new Error('Not authenticated');
 
     const { data: created, error } = await this.supabase
       .from('""" + spec['tables'][0] + """')
       .insert({
         ...data,
-        created_by: user.id,
-        updated_by: user.id
+        created_by: userId,
+        updated_by: userId
       })
-      .select()
+      .select(DETAIL_COLUMNS)
       .single();
 
     if (error) throw error;
@@ -817,18 +1917,18 @@ def generate_api_methods(spec):
   }
 
   async update(id: string, data: Partial<MainEntity>): Promise<MainEntity> {
-    const { data: { user } } = await this.supabase.auth.getUser();
-    if (!user) throw new Error('Not authenticated');
+    const userId = await getSessionUserId(this.supabase);
+    if (!userId) throw new Error('Not authenticated');
 
     const { data: updated, error } = await this.supabase
       .from('""" + spec['tables'][0] + """')
       .update({
         ...data,
-        updated_by: user.id,
+        updated_by: userId,
         updated_at: new Date().toISOString()
       })
       .eq('id', id)
-      .select()
+      .select(DETAIL_COLUMNS)
       .single();
 
     if (error) throw error;
@@ -844,6 +1944,117 @@ def generate_api_methods(spec):
     if (error) throw error;
   }"""
 
+    if is_searchable_spec(spec):
+        methods += generate_search_method(spec['tables'][0])
+
+    if is_bulk_spec(spec):
+        methods += generate_bulk_methods(spec['tables'][0])
+
+    if is_realtime_spec(spec):
+        methods += generate_realtime_method(spec['tables'][0])
+
+    if is_dashboard_spec(spec):
+        methods += generate_summary_method(spec['tables'][0])
+
+    if is_report_spec(spec):
+        methods += generate_report_export_method(spec['tables'][0])
+
+    methods += generate_metadata_methods(spec)
+
+    return methods
+
+def is_list_view_spec(spec):
+    """Detect specs whose features list, browse or page through many records"""
+    return any(keyword in feature.lower() for feature in spec['features'] for keyword in LIST_VIEW_FEATURE_KEYWORDS)
+
+def generate_virtual_row_cells(spec):
+    """Generate one cell per list column of the main table for a virtualized row"""
+    cells = []
+    for field, _, _ in get_view_columns(spec, spec['tables'][0], 'list'):
+        if field == 'id':
+            continue
+        value = f"new Date(item.{field}).toLocaleString()" if field.endswith('_at') else f"item.{field}"
+        style = "truncate font-medium" if not cells else "truncate text-sm text-muted-foreground"
+        cells.append(f"""<span className="{style}">{{{value}}}</span>""")
+    return "\n                  ".join(cells)
+
+def generate_virtual_list(spec, slug, component_name, api_instance_name):
+    """Generate the windowed, infinite-scrolling list for list-heavy specs"""
+    if not is_list_view_spec(spec):
+        return ""
+    return """
+**Virtualized List** (`@tanstack/react-virtual`, infinite scroll over the keyset `getAll()`):
+
+```typescript
+'use client';
+
+import React, { useEffect, useRef } from 'react';
+import { useInfiniteQuery } from '@tanstack/react-query';
+import { useVirtualizer } from '@tanstack/react-virtual';
+import { useQueryScope } from '@/lib/hooks/query-scope';
+import { """ + api_instance_name + """, type PageCursor } from '@/lib/api/""" + slug + """-api';
+
+const PAGE_SIZE = 50;
+const ROW_HEIGHT = 56;
+
+export function """ + component_name + """List() {
+  const scope = useQueryScope();
+  const { data, hasNextPage, fetchNextPage, isFetchingNextPage } = useInfiniteQuery({
+    // Rows are scoped by created_by = auth.uid(), so the cache is keyed on the user
+    queryKey: ['""" + slug + """', scope.userId, 'list', { limit: PAGE_SIZE }],
+    queryFn: ({ pageParam }) => """ + api_instance_name + """.getAll({ cursor: pageParam, limit: PAGE_SIZE }),
+    initialPageParam: null as PageCursor | null,
+    getNextPageParam: (page) => page.nextCursor
+  });
+  const items = data?.pages.flatMap((page) => page.data) ?? [];
+  const scrollRef = useRef<HTMLDivElement>(null);
+
+  // Only rows inside the viewport (plus overscan) are mounted, so DOM size
+  // stays constant however many pages have been loaded
+  const virtualizer = useVirtualizer({
+    count: hasNextPage ? items.length + 1 : items.length,
+    getScrollElement: () => scrollRef.current,
+    estimateSize: () => ROW_HEIGHT,
+    overscan: 10
+  });
+  const virtualRows = virtualizer.getVirtualItems();
+  const lastRowIndex = virtualRows[virtualRows.length - 1]?.index ?? -1;
+
+  // The trailing loader row coming into view fetches the next keyset page
+  useEffect(() => {
+    if (lastRowIndex >= items.length - 1 && hasNextPage && !isFetchingNextPage) {
+      fetchNextPage();
+    }
+  }, [lastRowIndex, items.length, hasNextPage, isFetchingNextPage, fetchNextPage]);
+
+  return (
+    <div ref={scrollRef} className="h-[600px] overflow-auto">
+      <div className="relative w-full" style={{ height: virtualizer.getTotalSize() }}>
+        {virtualRows.map((row) => {
+          const item = items[row.index];
+          return (
+            <div
+              key={row.key}
+              className="absolute left-0 top-0 flex w-full items-center justify-between border-b px-4"
+              style={{ height: ROW_HEIGHT, transform: `translateY(${row.start}px)` }}
+            >
+              {item ? (
+                <>
+                  """ + generate_virtual_row_cells(spec) + """
+                </>
+              ) : (
+                <span className="text-sm text-muted-foreground">Loading more...</span>
+              )}
+            </div>
+          );
+        })}
+      </div>
+    </div>
+  );
+}
+```
+"""
+
 def generate_spec(spec):
     """Generate complete specification file content"""
     spec_id = spec['id']
@@ -880,6 +2091,8 @@ def generate_spec(spec):
     rls_policies = generate_rls_policies(spec)
     typescript_interfaces = generate_typescript_interfaces(spec)
     api_methods = generate_api_methods(spec)
+    performance_benchmark = generate_performance_benchmark(spec, slug, api_class_name)
+    bulk_benchmark = generate_bulk_benchmark(spec, slug, api_class_name)
     
     # Extra dependencies
     extra_deps = ""
@@ -914,11 +2127,565 @@ def generate_spec(spec):
         api_methods=api_methods,
         portal_folder=portal_folder,
         component_name=component_name,
-        extra_deps=extra_deps
+        extra_deps=extra_deps,
+        performance_benchmark=performance_benchmark,
+        bulk_benchmark=bulk_benchmark,
+        virtual_list=generate_virtual_list(spec, slug, component_name, api_instance_name),
+        realtime_publication=generate_realtime_publication(spec),
+        dashboard_rollup=generate_dashboard_rollup(spec),
+        report_jobs=generate_report_jobs_registration(spec),
+        notification_outbox=generate_notification_outbox(spec),
+        report_import="\nimport { enqueueReport, getReportDownloadUrl, waitForReportJob, type ReportFormat, type ReportJob } from '@/lib/supabase/report-jobs';" if is_report_spec(spec) else "",
+        realtime_import="\nimport { ownerFilter, subscribeToTable } from '@/lib/supabase/realtime';" if is_realtime_spec(spec) else ""
     )
     
     return content
 
+# Client modules every generated API client imports; written once per phase
+SHARED_MODULES_FILENAME = "SHARED-CLIENT-MODULES.md"
+
+SESSION_USER_MODULE = """import type { SupabaseClient } from '@supabase/supabase-js';
+
+// User id per client, kept current by onAuthStateChange. Mutations read it
+// instead of calling auth.getUser(), which is a round trip to the auth
+// server; the database still checks the JWT on the request itself (RLS)
+const sessionUserIds = new WeakMap<SupabaseClient, Promise<string | null>>();
+
+export function getSessionUserId(supabase: SupabaseClient): Promise<string | null> {
+  let userId = sessionUserIds.get(supabase);
+  if (!userId) {
+    // getSession() reads the stored session, no network hop
+    userId = supabase.auth.getSession().then(({ data: { session } }) => session?.user.id ?? null);
+    sessionUserIds.set(supabase, userId);
+
+    // Sign-in, sign-out and token refresh replace the cached id
+    supabase.auth.onAuthStateChange((_event, session) => {
+      sessionUserIds.set(supabase, Promise.resolve(session?.user.id ?? null));
+    });
+  }
+  return userId;
+}"""
+
+QUERY_SCOPE_MODULE = """'use client';
+
+import { createContext, useContext } from 'react';
+
+export interface QueryScope {
+  tenantId: string;
+  branchId: string;
+  userId: string;
+}
+
+// Provided by the portal layout for the active tenant, branch and user; every
+// generated query key is prefixed with it
+export const QueryScopeContext = createContext<QueryScope | null>(null);
+
+export function useQueryScope(): QueryScope {
+  const scope = useContext(QueryScopeContext);
+  if (!scope) throw new Error('useQueryScope must be used inside a QueryScopeContext provider');
+  return scope;
+}"""
+
+REQUEST_LAYER_MODULE = """import type { SupabaseClient } from '@supabase/supabase-js';
+
+// Reads from every generated API client go through here: identical queries
+// already in flight share one request, and getById calls made in the same
+// tick are fetched together with one .in('id', [...]) query
+
+const BATCH_MAX_IDS = 100;
+
+interface Waiter {
+  resolve: (row: any) => void;
+  reject: (error: unknown) => void;
+}
+
+interface ClientState {
+  inFlight: Map<string, Promise<unknown>>;
+  byIdBatches: Map<string, Map<string, Waiter[]>>;
+}
+
+interface QueryStats {
+  calls: number;
+  dedupHits: number;
+  batchedIds: number;
+  totalMs: number;
+  maxMs: number;
+}
+
+// Keyed by client, so server-side renders for different users never share
+const clientStates = new WeakMap<SupabaseClient, ClientState>();
+const queryStats = new Map<string, QueryStats>();
+
+function stateFor(supabase: SupabaseClient): ClientState {
+  let state = clientStates.get(supabase);
+  if (!state) {
+    state = { inFlight: new Map(), byIdBatches: new Map() };
+    clientStates.set(supabase, state);
+  }
+  return state;
+}
+
+function statsFor(name: string): QueryStats {
+  let stats = queryStats.get(name);
+  if (!stats) {
+    stats = { calls: 0, dedupHits: 0, batchedIds: 0, totalMs: 0, maxMs: 0 };
+    queryStats.set(name, stats);
+  }
+  return stats;
+}
+
+function recordLatency(name: string, started: number) {
+  const stats = statsFor(name);
+  const elapsed = performance.now() - started;
+  stats.calls += 1;
+  stats.totalMs += elapsed;
+  stats.maxMs = Math.max(stats.maxMs, elapsed);
+}
+
+export function dedupe<T>(supabase: SupabaseClient, name: string, params: unknown, run: () => Promise<T>): Promise<T> {
+  const { inFlight } = stateFor(supabase);
+  const key = `${name}:${JSON.stringify(params ?? null)}`;
+
+  const pending = inFlight.get(key);
+  if (pending) {
+    statsFor(name).dedupHits += 1;
+    return pending as Promise<T>;
+  }
+
+  const started = performance.now();
+  const request = run().finally(() => {
+    inFlight.delete(key);
+    recordLatency(name, started);
+  });
+  inFlight.set(key, request);
+  return request;
+}
+
+export function batchGetById<T>(supabase: SupabaseClient, table: string, columns: string, id: string): Promise<T> {
+  const { byIdBatches } = stateFor(supabase);
+  const key = `${table}?select=${columns}`;
+
+  let batch = byIdBatches.get(key);
+  if (!batch) {
+    batch = new Map();
+    byIdBatches.set(key, batch);
+    // Flush on the next tick; every getById issued until then joins the batch
+    setTimeout(() => flushByIdBatch(supabase, table, columns, key), 0);
+  } else if (batch.has(id)) {
+    statsFor(`${table}.getById`).dedupHits += 1;
+  }
+
+  const waiters = batch.get(id) ?? [];
+  batch.set(id, waiters);
+  return new Promise<T>((resolve, reject) => waiters.push({ resolve, reject }));
+}
+
+async function flushByIdBatch(supabase: SupabaseClient, table: string, columns: string, key: string) {
+  const { byIdBatches } = stateFor(supabase);
+  const batch = byIdBatches.get(key)!;
+  byIdBatches.delete(key);
+
+  const ids = [...batch.keys()];
+  const name = `${table}.getById`;
+  statsFor(name).batchedIds += ids.length;
+
+  for (let start = 0; start < ids.length; start += BATCH_MAX_IDS) {
+    const chunk = ids.slice(start, start + BATCH_MAX_IDS);
+    const started = performance.now();
+    try {
+      const { data, error } = await supabase.from(table).select(columns).in('id', chunk);
+      if (error) throw error;
+
+      const rows = new Map((data as any[]).map((row) => [row.id, row]));
+      for (const id of chunk) {
+        const row = rows.get(id);
+        for (const waiter of batch.get(id)!) {
+          if (row) waiter.resolve(row);
+          else waiter.reject(new Error(`${table} ${id} not found`));
+        }
+      }
+    } catch (error) {
+      for (const id of chunk) {
+        batch.get(id)!.forEach((waiter) => waiter.reject(error));
+      }
+    } finally {
+      recordLatency(name, started);
+    }
+  }
+}
+
+// Per-query latency and hit counts, e.g. console.table(getRequestStats())
+export function getRequestStats() {
+  return Object.fromEntries([...queryStats].map(([name, stats]) => [name, {
+    ...stats,
+    avgMs: stats.calls ? stats.totalMs / stats.calls : 0
+  }]));
+}
+
+export function resetRequestStats() {
+  queryStats.clear();
+}
+
+if (typeof window !== 'undefined') {
+  (window as any).__requestStats = getRequestStats;
+}"""
+
+REALTIME_MODULE = """import type { RealtimeChannel, SupabaseClient } from '@supabase/supabase-js';
+
+// Realtime for the generated API clients. Every subscription carries a
+// server-side filter, so the Realtime server forwards only the rows the
+// subscriber shows instead of matching every change against every client.
+// Bursts are handed over as one debounced batch, latest version per row
+
+const DEBOUNCE_MS = 250;
+const MAX_WAIT_MS = 1000;
+
+// Most values a Realtime in-filter accepts
+export const MAX_IN_FILTER_VALUES = 100;
+
+export interface TableSubscription<T> {
+  // Defaults to 'public'
+  schema?: string;
+  table: string;
+  // A single column=eq.value or column=in.(...) filter; postgres_changes
+  // accepts only one
+  filter: string;
+  mapRow?: (row: Record<string, any>) => T;
+}
+
+interface SharedChannel {
+  channel: RealtimeChannel;
+  listeners: Set<(rows: Record<string, any>[]) => void>;
+  pending: Map<string, Record<string, any>>;
+  timer: ReturnType<typeof setTimeout> | null;
+  firstPendingAt: number;
+}
+
+// One channel per client, table and filter, shared by every subscriber
+const channels = new WeakMap<SupabaseClient, Map<string, SharedChannel>>();
+
+// column=in.(...) over distinct ids, capped at the in-filter limit; throws
+// rather than subscribe to the whole table when there is no id
+export function ownerFilter(column: string, ids: string[]): string {
+  const distinct = [...new Set(ids)].slice(0, MAX_IN_FILTER_VALUES);
+  if (!distinct.length) throw new Error(`No ${column} to filter the subscription on`);
+  return `${column}=in.(${distinct.join(',')})`;
+}
+
+export const camelizeRow = (row: Record<string, any>) => Object.fromEntries(
+  Object.entries(row).map(([key, value]) => [key.replace(/_([a-z])/g, (_, c) => c.toUpperCase()), value])
+);
+
+function flush(shared: SharedChannel) {
+  shared.timer = null;
+  const rows = [...shared.pending.values()];
+  shared.pending.clear();
+  if (rows.length) shared.listeners.forEach((listener) => listener(rows));
+}
+
+function schedule(shared: SharedChannel) {
+  const now = performance.now();
+  if (shared.timer) clearTimeout(shared.timer);
+  else shared.firstPendingAt = now;
+
+  // Trailing debounce, but a steady stream still flushes every MAX_WAIT_MS
+  const wait = Math.min(DEBOUNCE_MS, Math.max(0, shared.firstPendingAt + MAX_WAIT_MS - now));
+  shared.timer = setTimeout(() => flush(shared), wait);
+}
+
+function openChannel(supabase: SupabaseClient, schema: string, table: string, filter: string): SharedChannel {
+  const shared: SharedChannel = {
+    channel: supabase.channel(`changes:${schema}.${table}:${filter}`),
+    listeners: new Set(),
+    pending: new Map(),
+    timer: null,
+    firstPendingAt: 0
+  };
+
+  // DELETE events cannot be filtered server-side, so they are not
+  // subscribed; deleted rows drop out of caches on their next refetch
+  for (const event of ['INSERT', 'UPDATE'] as const) {
+    shared.channel.on('postgres_changes', { event, schema, table, filter }, (payload) => {
+      const row = payload.new as Record<string, any>;
+      shared.pending.set(row.id, row);
+      schedule(shared);
+    });
+  }
+  shared.channel.subscribe();
+  return shared;
+}
+
+export function subscribeToTable<T>(
+  supabase: SupabaseClient,
+  { schema = 'public', table, filter, mapRow }: TableSubscription<T>,
+  onBatch: (rows: T[]) => void
+): () => void {
+  let byKey = channels.get(supabase);
+  if (!byKey) {
+    byKey = new Map();
+    channels.set(supabase, byKey);
+  }
+
+  const key = `${schema}.${table}:${filter}`;
+  const shared = byKey.get(key) ?? openChannel(supabase, schema, table, filter);
+  byKey.set(key, shared);
+
+  const listener = (rows: Record<string, any>[]) => onBatch(mapRow ? rows.map(mapRow) : (rows as T[]));
+  shared.listeners.add(listener);
+
+  return () => {
+    shared.listeners.delete(listener);
+    if (shared.listeners.size === 0) {
+      if (shared.timer) clearTimeout(shared.timer);
+      supabase.removeChannel(shared.channel);
+      byKey!.delete(key);
+    }
+  };
+}"""
+
+REPORT_JOBS_MODULE = """import type { SupabaseClient } from '@supabase/supabase-js';
+import { camelizeRow, subscribeToTable } from '@/lib/supabase/realtime';
+
+// Client side of the SPEC-033 report job queue. A report is queued with
+// enqueue_report_job() and built by a report worker outside the request; the
+// caller follows the job and downloads the file from the private bucket
+
+export type ReportFormat = 'csv' | 'json';
+
+export interface ReportJob {
+  id: string;
+  reportType: string;
+  format: ReportFormat;
+  status: 'queued' | 'running' | 'succeeded' | 'failed';
+  rowsWritten: number;
+  resultPath: string | null;
+  byteSize: number | null;
+  error: string | null;
+  createdAt: string;
+  finishedAt: string | null;
+}
+
+const JOB_COLUMNS = 'id, report_type, format, status, rows_written, result_path, byte_size, error, created_at, finished_at';
+const REPORTS_BUCKET = 'reports';
+const POLL_INITIAL_MS = 1000;
+const POLL_MAX_MS = 15000;
+
+const toJob = (row: Record<string, any>) => camelizeRow(row) as ReportJob;
+const isFinished = (job: ReportJob) => job.status === 'succeeded' || job.status === 'failed';
+
+export async function enqueueReport(
+  supabase: SupabaseClient,
+  reportType: string,
+  parameters: Record<string, unknown> = {},
+  format: ReportFormat = 'csv'
+): Promise<string> {
+  const { data, error } = await supabase.schema('reports').rpc('enqueue_report_job', {
+    p_report_type: reportType,
+    p_parameters: parameters,
+    p_format: format
+  });
+
+  if (error) throw error;
+  return data as string;
+}
+
+export async function getReportJob(supabase: SupabaseClient, jobId: string): Promise<ReportJob> {
+  const { data, error } = await supabase
+    .schema('reports')
+    .from('report_jobs')
+    .select(JOB_COLUMNS)
+    .eq('id', jobId)
+    .single();
+
+  if (error) throw error;
+  return toJob(data);
+}
+
+// Resolves with the finished job. Realtime pushes every progress and status
+// change; polling with backoff covers a socket that is down or missed the
+// final update. Aborting stops following - the job itself keeps running
+export function waitForReportJob(
+  supabase: SupabaseClient,
+  jobId: string,
+  onProgress?: (job: ReportJob) => void,
+  signal?: AbortSignal
+): Promise<ReportJob> {
+  return new Promise((resolve, reject) => {
+    if (signal?.aborted) return reject(signal.reason);
+
+    let delay = POLL_INITIAL_MS;
+    let timer: ReturnType<typeof setTimeout> | null = null;
+    let settled = false;
+
+    const settle = (finish: () => void) => {
+      if (settled) return;
+      settled = true;
+      if (timer) clearTimeout(timer);
+      unsubscribe();
+      signal?.removeEventListener('abort', onAbort);
+      finish();
+    };
+    const onJob = (job: ReportJob) => {
+      if (settled) return;
+      onProgress?.(job);
+      if (isFinished(job)) settle(() => resolve(job));
+    };
+    const poll = () => {
+      getReportJob(supabase, jobId).then(onJob, (error) => settle(() => reject(error))).finally(() => {
+        if (settled) return;
+        timer = setTimeout(poll, delay);
+        delay = Math.min(delay * 2, POLL_MAX_MS);
+      });
+    };
+    const onAbort = () => settle(() => reject(signal!.reason));
+
+    const unsubscribe = subscribeToTable<ReportJob>(supabase, {
+      schema: 'reports',
+      table: 'report_jobs',
+      filter: `id=eq.${jobId}`,
+      mapRow: toJob
+    }, (jobs) => onJob(jobs[jobs.length - 1]));
+    signal?.addEventListener('abort', onAbort);
+    poll();
+  });
+}
+
+// Signed, expiring URL of a finished report
+export async function getReportDownloadUrl(
+  supabase: SupabaseClient,
+  job: ReportJob,
+  expiresIn: number = 3600
+): Promise<string> {
+  if (job.status !== 'succeeded' || !job.resultPath) {
+    throw new Error(`Report job ${job.id} has no result`);
+  }
+
+  const { data, error } = await supabase.storage.from(REPORTS_BUCKET).createSignedUrl(job.resultPath, expiresIn);
+  if (error) throw error;
+  return data.signedUrl;
+}"""
+
+BENCH_BUDGET_MODULE = """import { appendFileSync } from 'fs';
+import { expect } from 'vitest';
+import type { SupabaseClient } from '@supabase/supabase-js';
+
+// Helpers for the generated performance benches (tests/bench/*.bench.ts)
+
+const WARMUP_RUNS = 3;
+
+export interface Timing {
+  runs: number;
+  p50: number;
+  p95: number;
+  max: number;
+}
+
+export async function signInBenchUser(supabase: SupabaseClient): Promise<string> {
+  const { data, error } = await supabase.auth.signInWithPassword({
+    email: process.env.BENCH_USER_EMAIL!,
+    password: process.env.BENCH_USER_PASSWORD!
+  });
+  if (error) throw error;
+  return data.user.id;
+}
+
+// Runs fn sequentially after a short warm-up (connection setup, plan cache)
+// and reports nearest-rank percentiles in milliseconds
+export async function measure(fn: () => Promise<unknown>, runs = 30): Promise<Timing> {
+  for (let i = 0; i < WARMUP_RUNS; i++) {
+    await fn();
+  }
+
+  const samples: number[] = [];
+  for (let i = 0; i < runs; i++) {
+    const started = performance.now();
+    await fn();
+    samples.push(performance.now() - started);
+  }
+
+  samples.sort((a, b) => a - b);
+  const at = (p: number) => samples[Math.max(0, Math.ceil((p / 100) * samples.length) - 1)];
+  return { runs, p50: at(50), p95: at(95), max: samples[samples.length - 1] };
+}
+
+export interface SpecBudgets<M extends string> {
+  ms: Record<M, number>;
+  expectWithin(metric: M, label: string, timing: Timing): void;
+}
+
+// spec is the performance-budgets.json key ("<phase>/<portal>/SPEC-<id>");
+// with BENCH_RESULTS_FILE set, every timing is also appended there as one
+// JSON line for PERFORMANCE-TOOLS/check_budgets.py
+export function specBudgets<M extends string>(spec: string, ms: Record<M, number>): SpecBudgets<M> {
+  return {
+    ms,
+    expectWithin(metric, label, timing) {
+      if (process.env.BENCH_RESULTS_FILE) {
+        appendFileSync(process.env.BENCH_RESULTS_FILE, JSON.stringify({
+          spec,
+          metric,
+          label,
+          runs: timing.runs,
+          p50_ms: timing.p50,
+          p95_ms: timing.p95,
+          max_ms: timing.max
+        }) + '\n');
+      }
+      console.info(`${label}: p50 ${timing.p50.toFixed(1)}ms, p95 ${timing.p95.toFixed(1)}ms (${metric} budget ${ms[metric]}ms)`);
+      expect(timing.p95, `${label} p95 over its ${ms[metric]}ms ${metric} budget`).toBeLessThan(ms[metric]);
+    }
+  };
+}"""
+
+BENCH_CONFIG_MODULE = """import path from 'path';
+import { defineConfig } from 'vitest/config';
+
+// Performance gate: npx vitest run --config vitest.bench.config.ts
+// Files run one at a time so specs never compete for the local database;
+// the *.bulk.bench.ts files are vitest bench suites and run with vitest bench
+export default defineConfig({
+  resolve: {
+    alias: { '@': path.resolve(__dirname, './src') }
+  },
+  test: {
+    include: ['tests/bench/**/*.bench.ts'],
+    exclude: ['tests/bench/**/*.bulk.bench.ts'],
+    fileParallelism: false,
+    testTimeout: 120_000,
+    hookTimeout: 300_000
+  }
+});"""
+
+def get_shared_modules():
+    """Shared client modules as (location, purpose, code)"""
+    return [
+        ("src/lib/supabase/session-user.ts", "Session-scoped user id for mutations", SESSION_USER_MODULE),
+        ("src/lib/supabase/request-layer.ts", "In-flight dedup, getById batching and request stats", REQUEST_LAYER_MODULE),
+        ("src/lib/supabase/realtime.ts", "Filtered, debounced realtime subscriptions", REALTIME_MODULE),
+        ("src/lib/hooks/query-scope.ts", "Tenant/branch/user scope of the generated query keys", QUERY_SCOPE_MODULE),
+        ("src/lib/supabase/report-jobs.ts", "Report job queue: enqueue, follow and download exports", REPORT_JOBS_MODULE),
+        ("tests/bench/budget.ts", "Timing and budget assertions for the performance benches", BENCH_BUDGET_MODULE),
+        ("vitest.bench.config.ts", "Vitest config running the performance benches", BENCH_CONFIG_MODULE),
+    ]
+
+def generate_shared_modules():
+    """Generate the shared client modules document"""
+    sections = '\n\n---\n\n'.join([f"""## `{location}`
+
+{purpose}.
+
+```typescript
+{code}
+```""" for location, purpose, code in get_shared_modules()])
+    return f"""# 🧩 SHARED CLIENT MODULES - PHASE 10
+
+> Imported by the generated API clients and benches in this phase. Create each module once.
+
+---
+
+{sections}
+"""
+
 def main():
     """Main generation function"""
     print("\n" + "="*60)
@@ -963,6 +2730,11 @@ def main():
         
         print(f"  ✓ Created: {filepath.relative_to(BASE_PATH)}")
     
+    # Write shared client modules
+    with open(BASE_PATH / SHARED_MODULES_FILENAME, 'w', encoding='utf-8') as f:
+        f.write(generate_shared_modules())
+    print(f"  ✓ Created: {SHARED_MODULES_FILENAME}")
+    
     print("\n" + "="*60)
     print(f"  ✓ ALL {total} SPECS GENERATED SUCCESSFULLY!")
     print("="*60 + "\n")